@@ -0,0 +1,142 @@
+"""
+Async serving mode for the FAQ bot.
+
+Exposes the same endpoints as main_bot.py on aiohttp, backed by FAQBot.aanswer_question, so
+a single process can hold hundreds of Gemini calls in flight instead of one per worker thread.
+
+Run with:
+    python async_app.py
+or under gunicorn:
+    gunicorn async_app:create_app --bind 0.0.0.0:8000 --worker-class aiohttp.GunicornWebWorker
+"""
+import json
+import logging
+import os
+from aiohttp import web
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from dotenv import load_dotenv
+from faq_logic import FAQBot
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BOT_KEY = web.AppKey("faq_bot", FAQBot)
+
+
+async def _read_question(request: web.Request) -> str:
+    if request.content_type == 'application/json':
+        try:
+            data = await request.json()
+        except json.JSONDecodeError:
+            return ''
+        return str((data or {}).get('question', '')).strip()
+    form = await request.post()
+    return str(form.get('question', '')).strip()
+
+
+async def index(request: web.Request) -> web.Response:
+    """Render the main FAQ interface"""
+    env = request.app["templates"]
+    html = env.get_template('index.html').render(
+        url_for=lambda endpoint, filename: f"/static/{filename}"
+    )
+    return web.Response(text=html, content_type='text/html')
+
+
+async def ask(request: web.Request) -> web.Response:
+    try:
+        user_question = await _read_question(request)
+        result = await request.app[BOT_KEY].aanswer_question(user_question)
+        return web.json_response(result)
+    except Exception as e:
+        logger.error(f"Error in /ask endpoint: {e}")
+        return web.json_response({
+            "error": "An error occurred processing your request.",
+            "response": "Sorry, I encountered an error. Please try again.",
+            "related_questions": []
+        }, status=500)
+
+
+async def ask_stream(request: web.Request) -> web.StreamResponse:
+    user_question = await _read_question(request)
+    response = web.StreamResponse(headers={
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+    await response.prepare(request)
+    try:
+        async for event in request.app[BOT_KEY].astream_answer(user_question):
+            payload = json.dumps(event["data"], ensure_ascii=False)
+            await response.write(f"event: {event['event']}\ndata: {payload}\n\n".encode('utf-8'))
+    except Exception as e:
+        logger.error(f"Error in /ask/stream endpoint: {e}")
+        error = json.dumps({"error": "An error occurred processing your request."})
+        await response.write(f"event: error\ndata: {error}\n\n".encode('utf-8'))
+    await response.write_eof()
+    return response
+
+
+async def api_ask(request: web.Request) -> web.Response:
+    try:
+        data = await request.json()
+    except json.JSONDecodeError:
+        data = None
+    if not data or 'question' not in data:
+        return web.json_response({"error": "Question is required"}, status=400)
+    try:
+        categories = request.app[BOT_KEY].parse_categories(data.get('category'))
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+
+    try:
+        result = await request.app[BOT_KEY].aanswer_question(str(data['question']).strip(), categories)
+        return web.json_response(result)
+    except Exception as e:
+        logger.error(f"Error in API endpoint: {e}")
+        return web.json_response({"error": "Internal server error"}, status=500)
+
+
+async def health_check(request: web.Request) -> web.Response:
+    faq_bot = request.app[BOT_KEY]
+    readiness = faq_bot.get_readiness()
+    status = {"ready": "healthy", "loading": "starting", "degraded": "degraded"}.get(readiness["status"], "unhealthy")
+    return web.json_response({
+        "status": status,
+        "ready": readiness["status"] == "ready",
+        "components": readiness["components"],
+        "error": readiness["error"],
+        "faq_count": len(faq_bot.faq_records),
+        "service": "Jupiter FAQ Bot"
+    }, status=503 if status == "unhealthy" else 200)
+
+
+async def _shutdown_executor(app: web.Application):
+    app[BOT_KEY].cpu_executor.shutdown(wait=False)
+
+
+def create_app(faq_bot: FAQBot = None) -> web.Application:
+    app = web.Application()
+    if faq_bot is None:
+        faq_bot = FAQBot(lazy=True)
+        faq_bot.start_background_load()
+    app[BOT_KEY] = faq_bot
+    app["templates"] = Environment(
+        loader=FileSystemLoader(os.path.join(BASE_DIR, 'templates')),
+        autoescape=select_autoescape(['html'])
+    )
+    app.router.add_get('/', index)
+    app.router.add_post('/ask', ask)
+    app.router.add_post('/ask/stream', ask_stream)
+    app.router.add_post('/api/ask', api_ask)
+    app.router.add_get('/health', health_check)
+    app.router.add_static('/static', os.path.join(BASE_DIR, 'static'))
+    app.on_cleanup.append(_shutdown_executor)
+    return app
+
+
+if __name__ == "__main__":
+    port = int(os.environ.get('PORT', 5000))
+    web.run_app(create_app(), host="0.0.0.0", port=port)
@@ -0,0 +1,95 @@
+"""
+Load test: synchronous thread-per-request serving vs. FAQBot.aanswer_question.
+
+Both modes answer the same questions with a StubLLM whose latency models the Gemini round
+trip. The questions are perturbed FAQ questions (see ``benchmarks.common.perturb``), and the
+exact-match fast path and the answer cache are switched off, so requests go through embedding,
+search and the LLM instead of being answered from a stored entry; the share that reached the
+LLM is reported. The sync mode is limited to --threads requests in flight (like Flask/gunicorn
+worker threads); the async mode keeps up to --concurrency in flight on one event loop while
+embedding and search are confined to the bounded CPU executor.
+
+Usage (from the repository root):
+    python -m benchmarks.async_load [--requests 400] [--threads 16] [--concurrency 200] [--llm-latency 0.5]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from benchmarks.common import percentiles, perturb
+from benchmarks.stub_llm import StubLLM
+from faq_logic import FAQBot
+
+
+def load_questions(faq_file: str, n: int, seed: int = 0) -> List[str]:
+    with open(faq_file, encoding="utf-8") as f:
+        questions = [item["question"] for item in json.load(f) if item.get("question")]
+    rng = random.Random(seed)
+    return [perturb(questions[i % len(questions)], rng) for i in range(n)]
+
+
+def run_sync(bot: FAQBot, questions: List[str], threads: int) -> Dict:
+    latencies, generations = [], []
+
+    def timed(question: str):
+        t0 = time.perf_counter()
+        generations.append(bot.answer_question(question).get("generation"))
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(timed, questions))
+    elapsed = time.perf_counter() - t0
+    return {"mode": f"sync ({threads} threads)", "elapsed_s": elapsed, "throughput_rps": len(questions) / elapsed,
+            "llm_share": generations.count("live") / len(questions), **percentiles(latencies)}
+
+
+async def run_async(bot: FAQBot, questions: List[str], concurrency: int) -> Dict:
+    latencies, generations = [], []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(question: str):
+        async with semaphore:
+            t0 = time.perf_counter()
+            generations.append((await bot.aanswer_question(question)).get("generation"))
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(timed(q) for q in questions))
+    elapsed = time.perf_counter() - t0
+    return {"mode": f"async ({concurrency} in flight)", "elapsed_s": elapsed, "throughput_rps": len(questions) / elapsed,
+            "llm_share": generations.count("live") / len(questions), **percentiles(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faq-file", default="cleaned_faq.json")
+    parser.add_argument("--backend", default="numpy", choices=["chroma", "numpy"])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="stub LLM latency in seconds")
+    args = parser.parse_args()
+
+    bot = FAQBot(args.faq_file, vector_backend=args.backend, llm=StubLLM(latency=args.llm_latency),
+                 answer_mode="live")
+    # Every request must exercise the LLM: no answers from the stored entry or the answer cache
+    bot.fast_path_answer = lambda question, categories=None: None
+    bot.response_cache = None
+    questions = load_questions(args.faq_file, args.requests)
+    bot.answer_question(questions[0])  # warm-up
+
+    rows = [run_sync(bot, questions, args.threads), asyncio.run(run_async(bot, questions, args.concurrency))]
+    print(f"\n{args.requests} requests, stub LLM latency {args.llm_latency * 1000:.0f} ms")
+    print(f"{'mode':<24} {'elapsed s':>9} {'req/s':>8} {'via LLM':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for row in rows:
+        print(f"{row['mode']:<24} {row['elapsed_s']:>9.2f} {row['throughput_rps']:>8.1f} {row['llm_share']:>8.0%} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
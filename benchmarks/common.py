@@ -0,0 +1,50 @@
+"""Helpers shared by the benchmark scripts."""
+import random
+from typing import Dict, List
+
+import numpy as np
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB."""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 and mean of latency samples given in milliseconds."""
+    arr = np.asarray(samples_ms, dtype=np.float64)
+    if not len(arr):
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0}
+    return {
+        "p50_ms": float(np.percentile(arr, 50)),
+        "p95_ms": float(np.percentile(arr, 95)),
+        "p99_ms": float(np.percentile(arr, 99)),
+        "mean_ms": float(arr.mean()),
+    }
+
+
+_QUERY_PREFIXES = ("", "", "how do i ", "can you tell me ", "i want to know ", "please explain ")
+
+
+def perturb(question: str, rng: random.Random) -> str:
+    """A paraphrase-like variant of a question: lowercased, a prefix, and a dropped, swapped or misspelled word."""
+    words = question.lower().rstrip("?").split()
+    if len(words) > 3:
+        i = rng.randrange(len(words))
+        edit = rng.choice(("drop", "swap", "typo"))
+        if edit == "drop":
+            del words[i]
+        elif edit == "swap" and i + 1 < len(words):
+            words[i], words[i + 1] = words[i + 1], words[i]
+        elif len(words[i]) > 3:
+            j = rng.randrange(1, len(words[i]) - 1)
+            words[i] = words[i][:j] + words[i][j + 1] + words[i][j] + words[i][j + 2:]
+    return rng.choice(_QUERY_PREFIXES) + " ".join(words)
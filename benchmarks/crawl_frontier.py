@@ -0,0 +1,184 @@
+"""
+Crawler bookkeeping cost: FAQ dedup, queue growth, visited-set memory and checkpointed resume.
+
+1. FAQ dedup: adds ``--faqs`` extracted FAQs (a quarter of them repeats, as when the same FAQ
+   appears on many pages) with the previous linear ``any()`` scan over all stored FAQs and
+   with the FAQ-key index.
+2. Queue growth: BFS over a synthetic site of ``--pages`` pages, each linking to
+   ``--links-per-page`` random pages plus the same ``--nav-links`` navigation pages. Compares
+   the previous deque, which only checked links against visited URLs, with ``CrawlFrontier``
+   (peak queue length and total enqueues; both must visit the same pages in the same order).
+3. Visited-set memory: ``--urls`` URLs in a set versus a Bloom filter, and the Bloom filter's
+   measured false-positive rate on as many URLs never added.
+4. Resume: the crash test of ``benchmarks.faq_sink`` with frontier checkpoints every
+   ``--checkpoint-every`` pages, with the exact set and with the Bloom filter. Checks that the
+   resumed crawl starts from a checkpoint and that every FAQ ends up in the output once.
+
+Usage (from the repository root):
+    python -m benchmarks.crawl_frontier [--faqs 10000] [--pages 20000] [--urls 200000]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+
+from benchmarks.faq_sink import crash_and_resume
+from crawl_frontier import BloomFilter, CrawlFrontier
+from crawler import FAQCrawler
+
+
+def faq_dedup(count: int) -> dict:
+    unique = count * 3 // 4
+    faqs = [{"question": f"How does feature {i % unique} work?", "answer": "Like this.", "source_url": "x"}
+            for i in range(count)]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        crawler = FAQCrawler("https://example.com", os.path.join(tmp, "faqs.json"))
+        logging.getLogger("crawler").setLevel(logging.WARNING)
+
+        stored = []
+        t0 = time.perf_counter()
+        for faq in faqs:
+            # The previous add_page_faqs
+            if not any(existing['question'].lower().strip() == faq['question'].lower().strip()
+                       for existing in stored):
+                stored.append(faq)
+        results["linear_scan"] = {"seconds": time.perf_counter() - t0, "stored": len(stored)}
+
+        t0 = time.perf_counter()
+        for start in range(0, count, 10):
+            crawler.add_page_faqs(faqs[start:start + 10])
+        results["key_index"] = {"seconds": time.perf_counter() - t0, "stored": len(crawler.faqs)}
+        crawler.sink.close()
+    return results
+
+
+def site_links(pages: int, links_per_page: int, nav_links: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    nav = [f"https://example.com/{i}" for i in range(nav_links)]
+    return [nav + [f"https://example.com/{rng.randrange(pages)}" for _ in range(links_per_page)]
+            for _ in range(pages)]
+
+
+def queue_growth(pages: int, links_per_page: int, nav_links: int) -> dict:
+    links = site_links(pages, links_per_page, nav_links)
+
+    def page_links(url):
+        return links[int(url.rsplit("/", 1)[1])]
+
+    # The previous loop: links checked against visited URLs only
+    t0 = time.perf_counter()
+    to_visit, visited, order, enqueued, peak = deque(["https://example.com/0"]), set(), [], 1, 1
+    while to_visit:
+        url = to_visit.popleft()
+        if url in visited:
+            continue
+        visited.add(url)
+        order.append(url)
+        for link in page_links(url):
+            if link not in visited:
+                to_visit.append(link)
+                enqueued += 1
+        peak = max(peak, len(to_visit))
+    previous = {"seconds": time.perf_counter() - t0, "visited": len(order), "enqueued": enqueued, "peak_queue": peak}
+
+    t0 = time.perf_counter()
+    frontier, frontier_order, peak = CrawlFrontier(), [], 1
+    frontier.push("https://example.com/0")
+    while len(frontier):
+        url = frontier.pop()
+        frontier_order.append(url)
+        frontier.extend(page_links(url))
+        frontier.done(url)
+        peak = max(peak, len(frontier))
+    current = {"seconds": time.perf_counter() - t0, "visited": len(frontier_order),
+               "enqueued": len(frontier.seen), "peak_queue": peak}
+    return {"deque": previous, "frontier": current, "same_order": order == frontier_order}
+
+
+def visited_memory(count: int) -> dict:
+    urls = [f"https://example.com/help/articles/{i}-how-do-i-update-my-details" for i in range(count)]
+    tracemalloc.start()
+    seen = set(urls)
+    set_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del seen
+
+    bloom = BloomFilter(count, 1e-4)
+    t0 = time.perf_counter()
+    for url in urls:
+        bloom.add(url)
+    add_seconds = time.perf_counter() - t0
+    missing = all(url in bloom for url in urls[:10000])
+    false_positives = sum(f"https://example.com/other/{i}" in bloom for i in range(count))
+    return {
+        "set_mb": (set_bytes + sum(len(url) + 49 for url in urls)) / 1e6,  # strings are shared with the list
+        "bloom_mb": len(bloom.bits) / 1e6,
+        "bloom_hashes": bloom.hashes,
+        "bloom_add_us": add_seconds / count * 1e6,
+        "bloom_false_positive_rate": false_positives / count,
+        "no_false_negatives": missing,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faqs", type=int, default=10000)
+    parser.add_argument("--pages", type=int, default=20000)
+    parser.add_argument("--links-per-page", type=int, default=20)
+    parser.add_argument("--nav-links", type=int, default=30)
+    parser.add_argument("--urls", type=int, default=200000)
+    parser.add_argument("--site-pages", type=int, default=120, help="Fixture site size for the resume test")
+    parser.add_argument("--crash-after", type=int, default=60, help="Requests served before the crawl is killed")
+    parser.add_argument("--checkpoint-every", type=int, default=10)
+    args = parser.parse_args()
+
+    dedup = faq_dedup(args.faqs)
+    print(f"FAQ dedup of {args.faqs} FAQs:")
+    for name, stats in dedup.items():
+        print(f"  {name:<12} {stats['seconds']:>8.3f} s  {stats['stored']} stored")
+
+    growth = queue_growth(args.pages, args.links_per_page, args.nav_links)
+    print(f"BFS over {args.pages} pages ({'same' if growth['same_order'] else 'DIFFERENT'} visit order):")
+    for name in ("deque", "frontier"):
+        stats = growth[name]
+        print(f"  {name:<12} {stats['seconds']:>8.3f} s  {stats['enqueued']:>9} enqueued  "
+              f"peak queue {stats['peak_queue']}")
+
+    memory = visited_memory(args.urls)
+    print(f"{args.urls} visited URLs: set {memory['set_mb']:.1f} MB, Bloom filter {memory['bloom_mb']:.2f} MB "
+          f"({memory['bloom_hashes']} hashes, {memory['bloom_add_us']:.1f} us/add, "
+          f"false positives {memory['bloom_false_positive_rate']:.5f})")
+
+    resume = {}
+    for name, options in (("set", {}), ("bloom", {"bloom_filter": True, "expected_urls": 10000})):
+        result = asyncio.run(crash_and_resume(args, checkpoint_every=args.checkpoint_every, **options))
+        result["checks"]["resumed_from_checkpoint"] = result["pages_in_frontier_checkpoint"] > 0
+        resume[name] = result
+        failed = [check for check, ok in result["checks"].items() if not ok]
+        print(f"Resume ({name}): {result['pages_replayed_from_log']} pages logged, "
+              f"{result['pages_in_frontier_checkpoint']} in the checkpoint, "
+              f"{result['pages_fetched_after_resume']} fetched after resuming, {result['faqs']} FAQs; "
+              f"checks {'ok' if not failed else 'FAILED: ' + ', '.join(failed)}")
+
+    checks = {
+        "dedup_equivalent": dedup["linear_scan"]["stored"] == dedup["key_index"]["stored"],
+        "same_visit_order": growth["same_order"],
+        "bloom_no_false_negatives": memory["no_false_negatives"],
+        "bloom_error_rate": memory["bloom_false_positive_rate"] <= 1e-3,
+        **{f"resume_{name}": all(result["checks"].values()) for name, result in resume.items()},
+    }
+    print(json.dumps({"faq_dedup": dedup, "queue_growth": growth, "visited_memory": memory,
+                      "resume": resume, "checks": checks}, indent=2))
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Crawl throughput and politeness against a local fixture site.
+
+Serves a generated site from an in-process aiohttp server:
+  - ``--pages`` FAQ pages in a binary tree, each with two FAQ items and links to its children
+    and back to the home page;
+  - a robots.txt that disallows ``/private`` (which the home page links to) and optionally
+    sets a crawl-delay;
+  - ``--latency`` seconds of server-side delay per page, and a 503 with ``Retry-After: 0`` on
+    the first request for every ``--flaky-every``-th page.
+
+Each run crawls the whole site at one concurrency level and checks the results: every page
+was crawled, every FAQ was extracted, ``/private`` was never requested, every flaky page
+succeeded on retry, and the peak request rate stayed within the configured per-host rate.
+
+With ``--recrawl N`` each run keeps a crawl-state store, edits the answers on N pages after
+the first crawl and crawls again. Pages carry ETags (or, with ``--no-validators``, nothing, so
+unchanged pages are recognized by content hash). The second crawl is checked to parse only
+the edited pages and report exactly their FAQs as changed, and its bytes transferred and
+pages parsed are compared with the first.
+
+Usage (from the repository root):
+    python -m benchmarks.crawler [--pages 60] [--concurrency 1 8] [--rate 20] [--crawl-delay 0]
+    python -m benchmarks.crawler --recrawl 5 [--no-validators]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+from fractions import Fraction
+
+from aiohttp import web
+
+from crawler import FAQCrawler
+
+FAQS_PER_PAGE = 2
+
+
+def page_html(i: int, pages: int, version: int = 0) -> str:
+    links = "".join(f'<a href="/faq/{child}">FAQ {child}</a>' for child in (2 * i + 1, 2 * i + 2) if child < pages)
+    items = "".join(
+        f'<div class="faq-item"><div class="faq-header"><span>How does feature {i}-{j} work?</span></div>'
+        f'<div class="faq-answer"><p>Feature {i}-{j} works exactly as described in answer v{version}.</p></div></div>'
+        for j in range(FAQS_PER_PAGE)
+    )
+    home = '<a href="/">Home</a><a href="/private/account">Account</a>' if i == 0 else '<a href="/">Home</a>'
+    return f"<html><body>{home}{links}{items}</body></html>"
+
+
+class FixtureSite:
+    def __init__(self, pages: int, latency: float, flaky_every: int, crawl_delay: float, validators: bool = True):
+        self.pages = pages
+        self.latency = latency
+        self.flaky_every = flaky_every
+        self.crawl_delay = crawl_delay
+        self.validators = validators
+        self.versions = Counter()
+        self.reset()
+
+    def reset(self):
+        self.requests = Counter()
+        self.timestamps = []
+        self.bytes_sent = 0
+        self.not_modified = 0
+
+    async def robots(self, request: web.Request) -> web.Response:
+        rules = "User-agent: *\nDisallow: /private\n"
+        if self.crawl_delay and float(self.crawl_delay).is_integer():
+            rules += f"Crawl-delay: {self.crawl_delay:g}\n"
+        elif self.crawl_delay:
+            # The standard robots.txt parser ignores a fractional Crawl-delay; state it as a rate
+            rate = Fraction(self.crawl_delay).limit_denominator(1000)
+            rules += f"Request-rate: {rate.denominator}/{rate.numerator}\n"
+        return web.Response(text=rules)
+
+    async def page(self, request: web.Request) -> web.Response:
+        self.timestamps.append(time.monotonic())
+        i = int(request.match_info.get("i", 0))
+        self.requests[request.path] += 1
+        await asyncio.sleep(self.latency)
+        if self.flaky_every and i % self.flaky_every == self.flaky_every - 1 and self.requests[request.path] == 1:
+            return web.Response(status=503, headers={"Retry-After": "0"})
+        if i >= self.pages:
+            raise web.HTTPNotFound()
+        headers = {}
+        if self.validators:
+            headers["ETag"] = f'"{i}-{self.versions[i]}"'
+            if request.headers.get("If-None-Match") == headers["ETag"]:
+                self.not_modified += 1
+                return web.Response(status=304, headers=headers)
+        body = page_html(i, self.pages, self.versions[i])
+        self.bytes_sent += len(body.encode("utf-8"))
+        return web.Response(text=body, content_type="text/html", headers=headers)
+
+    async def private(self, request: web.Request) -> web.Response:
+        self.requests[request.path] += 1
+        return web.Response(text="<html></html>", content_type="text/html")
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/robots.txt", self.robots)
+        app.router.add_get("/", self.page)
+        app.router.add_get("/faq/{i}", self.page)
+        app.router.add_get("/private/{rest:.*}", self.private)
+        return app
+
+    def peak_rate(self) -> float:
+        """Most requests that started within any one-second window."""
+        stamps, peak, start = sorted(self.timestamps), 0, 0
+        for end, stamp in enumerate(stamps):
+            while stamp - stamps[start] >= 1.0:
+                start += 1
+            peak = max(peak, end - start + 1)
+        return float(peak)
+
+
+async def crawl_once(args, concurrency: int) -> dict:
+    site = FixtureSite(args.pages, args.latency, args.flaky_every, args.crawl_delay)
+    runner = web.AppRunner(site.app(), access_log=None)
+    await runner.setup()
+    tcp = web.TCPSite(runner, "127.0.0.1", 0)
+    await tcp.start()
+    port = tcp._server.sockets[0].getsockname()[1]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            crawler = FAQCrawler(f"http://127.0.0.1:{port}", os.path.join(tmp, "faqs.json"), args.pages + 10,
+                                 concurrency=concurrency, requests_per_second=args.rate, backoff=0.05)
+            logging.getLogger("crawler").setLevel(logging.WARNING)
+            t0 = time.perf_counter()
+            await crawler.crawl_all_pages_async()
+            elapsed = time.perf_counter() - t0
+    finally:
+        await runner.cleanup()
+
+    flaky = [i for i in range(args.pages) if args.flaky_every and i % args.flaky_every == args.flaky_every - 1]
+    pages_served = sum(1 for path in site.requests if path == "/" or path.startswith("/faq/"))
+    expected_rate = min(args.rate, 1 / args.crawl_delay) if args.crawl_delay else args.rate
+    burst = 1 if args.crawl_delay else concurrency
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "pages_per_s": pages_served / elapsed,
+        "pages_crawled": pages_served,
+        "faqs": len(crawler.faqs),
+        "retried_pages": len(flaky),
+        "peak_requests_per_s": site.peak_rate(),
+        "checks": {
+            "all_pages": pages_served == args.pages,
+            "all_faqs": len(crawler.faqs) == args.pages * FAQS_PER_PAGE,
+            "robots_respected": not any(path.startswith("/private") for path in site.requests),
+            "retries_succeeded": all(site.requests[f"/faq/{i}" if i else "/"] == 2 for i in flaky),
+            # The token bucket allows one burst on top of the sustained rate.
+            "rate_respected": site.peak_rate() <= expected_rate + burst,
+        },
+    }
+
+
+async def recrawl(args, concurrency: int) -> dict:
+    """Full crawl into a crawl-state store, then an incremental one after editing ``args.recrawl`` pages."""
+    site = FixtureSite(args.pages, args.latency, 0, 0, validators=not args.no_validators)
+    runner = web.AppRunner(site.app(), access_log=None)
+    await runner.setup()
+    tcp = web.TCPSite(runner, "127.0.0.1", 0)
+    await tcp.start()
+    port = tcp._server.sockets[0].getsockname()[1]
+    runs = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            edited = list(range(1, args.pages, max(args.pages // args.recrawl, 1)))[:args.recrawl]
+            for run in ("full", "incremental"):
+                if run == "incremental":
+                    site.versions.update(edited)
+                site.reset()
+                crawler = FAQCrawler(f"http://127.0.0.1:{port}", os.path.join(tmp, "faqs.json"), args.pages + 10,
+                                     concurrency=concurrency, requests_per_second=args.rate,
+                                     state_file=os.path.join(tmp, "state.sqlite3"),
+                                     changes_file=os.path.join(tmp, "changes.json"))
+                logging.getLogger("crawler").setLevel(logging.WARNING)
+                parsed = Counter()
+                parse_page = crawler.parse_page
+                crawler.parse_page = lambda content, url: parsed.update([url]) or parse_page(content, url)
+                t0 = time.perf_counter()
+                await crawler.crawl_all_pages_async()
+                runs.append({
+                    "run": run,
+                    "elapsed_s": time.perf_counter() - t0,
+                    "bytes_sent": site.bytes_sent,
+                    "not_modified": site.not_modified,
+                    "pages_parsed": sum(parsed.values()),
+                    "faqs_new": len(crawler.changes["new"]),
+                    "faqs_changed": len(crawler.changes["changed"]),
+                    "faqs_total": len(crawler.faqs),
+                    "edited_answers_saved": sum(f"answer v1" in faq["answer"] for faq in crawler.faqs),
+                })
+    finally:
+        await runner.cleanup()
+
+    full, incremental = runs
+    return {
+        "concurrency": concurrency,
+        "validators": not args.no_validators,
+        "runs": runs,
+        "checks": {
+            "full_crawl_parsed_all": full["pages_parsed"] == args.pages,
+            "only_edited_parsed": incremental["pages_parsed"] == len(edited),
+            "only_edited_emitted": incremental["faqs_changed"] == len(edited) * FAQS_PER_PAGE
+                                   and incremental["faqs_new"] == 0,
+            "edits_saved": incremental["edited_answers_saved"] == len(edited) * FAQS_PER_PAGE,
+            "no_faqs_lost": incremental["faqs_total"] == args.pages * FAQS_PER_PAGE,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--rate", type=float, default=20.0, help="Per-host requests per second")
+    parser.add_argument("--crawl-delay", type=float, default=0,
+                        help="robots.txt crawl delay in seconds (a fraction is served as a Request-rate)")
+    parser.add_argument("--latency", type=float, default=0.1, help="Server-side delay per page in seconds")
+    parser.add_argument("--flaky-every", type=int, default=10, help="Every n-th page fails once with 503 (0: none)")
+    parser.add_argument("--recrawl", type=int, default=0, help="Edit this many pages and measure an incremental re-crawl")
+    parser.add_argument("--no-validators", action="store_true", help="Serve pages without ETags in --recrawl mode")
+    args = parser.parse_args()
+
+    if args.recrawl:
+        results = [asyncio.run(recrawl(args, concurrency)) for concurrency in args.concurrency]
+        print(f"{'workers':>7} {'run':<12} {'seconds':>8} {'KB sent':>8} {'304s':>5} {'parsed':>7} "
+              f"{'new':>5} {'changed':>8}")
+        for result in results:
+            for run in result["runs"]:
+                print(f"{result['concurrency']:>7} {run['run']:<12} {run['elapsed_s']:>8.2f} "
+                      f"{run['bytes_sent'] / 1024:>8.1f} {run['not_modified']:>5} {run['pages_parsed']:>7} "
+                      f"{run['faqs_new']:>5} {run['faqs_changed']:>8}")
+            failed = [name for name, ok in result["checks"].items() if not ok]
+            print(f"{'':>7} checks: {'ok' if not failed else 'FAILED: ' + ', '.join(failed)}")
+        print(json.dumps(results, indent=2))
+        if any(not all(result["checks"].values()) for result in results):
+            raise SystemExit(1)
+        return
+
+    results = [asyncio.run(crawl_once(args, concurrency)) for concurrency in args.concurrency]
+    print(f"{'workers':>7} {'seconds':>8} {'pages/s':>8} {'pages':>6} {'faqs':>5} {'peak req/s':>10}  checks")
+    for result in results:
+        failed = [name for name, ok in result["checks"].items() if not ok]
+        print(f"{result['concurrency']:>7} {result['elapsed_s']:>8.2f} {result['pages_per_s']:>8.1f} "
+              f"{result['pages_crawled']:>6} {result['faqs']:>5} {result['peak_requests_per_s']:>10.0f}  "
+              f"{'ok' if not failed else 'FAILED: ' + ', '.join(failed)}")
+    print(json.dumps(results, indent=2))
+    if any(not all(result["checks"].values()) for result in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
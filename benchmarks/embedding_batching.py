@@ -0,0 +1,67 @@
+"""
+Throughput of query embedding with and without the EmbeddingBatcher micro-batching scheduler.
+
+For each client count, that many threads each embed --queries-per-client FAQ questions back to
+back, first calling the embedding model directly and then through an EmbeddingBatcher.
+Reports queries/sec, latency percentiles and the batcher's batch-size and queueing-delay metrics.
+
+Usage (from the repository root):
+    python -m benchmarks.embedding_batching [--clients 8 32 128] [--queries-per-client 20] [--max-wait-ms 3]
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from benchmarks.common import percentiles
+from faq_logic import EmbeddingBatcher, FAQBot
+
+
+def run(embedder, questions: List[str], clients: int, per_client: int) -> Dict:
+    latencies = []
+
+    def client(offset: int):
+        for i in range(per_client):
+            t0 = time.perf_counter()
+            embedder.embed_query(questions[(offset * per_client + i) % len(questions)])
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, range(clients)))
+    elapsed = time.perf_counter() - t0
+    return {"qps": clients * per_client / elapsed, **percentiles(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faq-file", default="cleaned_faq.json")
+    parser.add_argument("--clients", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--queries-per-client", type=int, default=20)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=3.0)
+    args = parser.parse_args()
+
+    with open(args.faq_file, encoding="utf-8") as f:
+        questions = [item["question"] for item in json.load(f) if item.get("question")]
+    model = FAQBot._initialize_embeddings()
+    model.embed_query(questions[0])  # warm-up
+
+    print(f"{'clients':>7} {'mode':<9} {'qps':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'mean batch':>10} {'queue p50 ms':>12} {'queue p95 ms':>12}")
+    for clients in args.clients:
+        direct = run(model, questions, clients, args.queries_per_client)
+        print(f"{clients:>7} {'direct':<9} {direct['qps']:>8.1f} {direct['p50_ms']:>8.2f} {direct['p95_ms']:>8.2f}")
+
+        batcher = EmbeddingBatcher(model, args.max_batch_size, args.max_wait_ms)
+        batched = run(batcher, questions, clients, args.queries_per_client)
+        stats = batcher.get_stats()
+        batcher.close()
+        print(f"{clients:>7} {'batched':<9} {batched['qps']:>8.1f} {batched['p50_ms']:>8.2f} "
+              f"{batched['p95_ms']:>8.2f} {stats['mean_batch_size']:>10.1f} "
+              f"{stats['queue_delay_p50_ms']:>12.2f} {stats['queue_delay_p95_ms']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Crawl output cost and crash recovery of the append-only FAQ log.
+
+1. Write cost: emits ``--pages`` pages of ``--faqs-per-page`` FAQs and compares rewriting the
+   whole JSON file after every page (the previous save_faqs) with appending each FAQ to the
+   JSONL log and compacting once at the end. Reports time and bytes written for both.
+2. Crash and resume: crawls the local fixture site from ``benchmarks.crawler``, kills the
+   crawl after ``--crash-after`` pages (dropping whatever the log had not flushed, and leaving
+   a torn last line), then starts a new crawler on the same files. Checks that it resumes
+   instead of starting over, that every FAQ ends up in the compacted JSON exactly once, and
+   that the log is empty afterwards.
+
+Usage (from the repository root):
+    python -m benchmarks.faq_sink [--pages 500] [--faqs-per-page 10] [--crash-after 25]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+
+from aiohttp import web
+
+from benchmarks.crawler import FAQS_PER_PAGE, FixtureSite
+from crawl_frontier import read_checkpoint
+from crawler import FAQCrawler
+from faq_sink import FAQSink, compact
+
+
+def write_cost(pages: int, faqs_per_page: int) -> dict:
+    page_faqs = [
+        [{"question": f"How does feature {page}-{j} work?", "answer": f"Feature {page}-{j} works like this. " * 5,
+          "source_url": f"https://example.com/faq/{page}"} for j in range(faqs_per_page)]
+        for page in range(pages)
+    ]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "faqs.json")
+        faqs, written = [], 0
+        t0 = time.perf_counter()
+        for batch in page_faqs:
+            faqs.extend(batch)
+            with open(output, "w", encoding="utf-8") as f:
+                json.dump(faqs, f, indent=2, ensure_ascii=False)
+            written += os.path.getsize(output)
+        results["rewrite_per_page"] = {"seconds": time.perf_counter() - t0, "mb_written": written / 1e6}
+
+        os.remove(output)
+        log = os.path.join(tmp, "faqs.jsonl")
+        t0 = time.perf_counter()
+        sink = FAQSink(log)
+        for page, batch in enumerate(page_faqs):
+            for faq in batch:
+                sink.add_faq(faq, added=True)
+            sink.page_done(f"https://example.com/faq/{page}", [])
+        sink.close()
+        log_bytes = os.path.getsize(log)
+        compact(log, output)
+        results["append_and_compact"] = {"seconds": time.perf_counter() - t0,
+                                         "mb_written": (log_bytes + os.path.getsize(output)) / 1e6}
+    return results
+
+
+async def crash_and_resume(args, **crawler_options) -> dict:
+    """Crawl, kill the crawl after ``args.crash_after`` requests, resume and check the output."""
+    site = FixtureSite(args.site_pages, 0.01, 0, 0)
+    runner = web.AppRunner(site.app(), access_log=None)
+    await runner.setup()
+    tcp = web.TCPSite(runner, "127.0.0.1", 0)
+    await tcp.start()
+    base_url = f"http://127.0.0.1:{tcp._server.sockets[0].getsockname()[1]}"
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "faqs.json")
+
+            crawler = FAQCrawler(base_url, output, args.site_pages + 10, concurrency=4, requests_per_second=200,
+                                 **crawler_options)
+            logging.getLogger("crawler").setLevel(logging.WARNING)
+            task = asyncio.create_task(crawler.crawl_all_pages_async())
+            while sum(site.requests.values()) < args.crash_after and not task.done():
+                await asyncio.sleep(0.005)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            # Simulate the process dying: unflushed log data is lost and the last line is torn.
+            log_file, fd = crawler.log_file, crawler.sink._file.fileno()
+            os.close(fd)
+            try:
+                crawler.sink._file.close()
+            except OSError:
+                pass
+            with open(log_file, "a", encoding="utf-8") as f:
+                f.write('{"type": "faq", "faq": {"question": "torn')
+            fetched_before = sum(site.requests.values())
+
+            resumed = FAQCrawler(base_url, output, args.site_pages + 10, concurrency=4, requests_per_second=200,
+                                 **crawler_options)
+            replayed = len([r for r in resumed.sink.records if r["type"] == "page"])
+            checkpoint = read_checkpoint(resumed.frontier_file)
+            await resumed.crawl_all_pages_async()
+            fetched_after = sum(site.requests.values()) - fetched_before
+
+            with open(output, encoding="utf-8") as f:
+                faqs = json.load(f)
+            log_size = os.path.getsize(log_file)
+    finally:
+        await runner.cleanup()
+
+    questions = [faq["question"] for faq in faqs]
+    return {
+        "pages_fetched_before_crash": fetched_before,
+        "pages_replayed_from_log": replayed,
+        "pages_in_frontier_checkpoint": checkpoint["pages_logged"] if checkpoint else 0,
+        "pages_fetched_after_resume": fetched_after,
+        "faqs": len(faqs),
+        "checks": {
+            "resumed": replayed > 0 and fetched_after < args.site_pages,
+            "all_faqs_once": len(faqs) == args.site_pages * FAQS_PER_PAGE and len(set(questions)) == len(questions),
+            "log_compacted": log_size == 0,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--faqs-per-page", type=int, default=10)
+    parser.add_argument("--site-pages", type=int, default=80, help="Fixture site size for the crash test")
+    parser.add_argument("--crash-after", type=int, default=25, help="Requests served before the crawl is killed")
+    args = parser.parse_args()
+
+    cost = write_cost(args.pages, args.faqs_per_page)
+    print(f"Writing {args.pages * args.faqs_per_page} FAQs over {args.pages} pages:")
+    for name, stats in cost.items():
+        print(f"  {name:<20} {stats['seconds']:>8.2f} s {stats['mb_written']:>10.1f} MB written")
+
+    recovery = asyncio.run(crash_and_resume(args))
+    failed = [name for name, ok in recovery["checks"].items() if not ok]
+    print(f"Crash after {recovery['pages_fetched_before_crash']} requests: "
+          f"{recovery['pages_replayed_from_log']} pages replayed from the log, "
+          f"{recovery['pages_fetched_after_resume']} fetched after resuming, {recovery['faqs']} FAQs; "
+          f"checks {'ok' if not failed else 'FAILED: ' + ', '.join(failed)}")
+    print(json.dumps({"write_cost": cost, "crash_and_resume": recovery}, indent=2))
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+FAQ and link extraction speed over saved HTML pages, per parser backend and extraction mode.
+
+Runs ``FAQCrawler.parse_page`` on every ``*.html`` file in ``--fixtures`` (by default the saved
+pages in ``benchmarks/fixtures/html``: one per extraction strategy, plus a page without FAQs
+on which all five strategies run) with each installed BeautifulSoup parser, both with one
+tree search per strategy (``single_pass=False``, the previous behaviour) and with the
+single-traversal ``PageScan``. Reports pages per second and the time split between parsing
+and extraction.
+
+Equivalence: for every parser, the single-pass FAQs and links must equal the per-strategy
+ones on every page (ignoring the ``extracted_at`` timestamp); a difference fails the run.
+Parsers can build different trees from malformed markup, so differences from
+``html.parser`` are reported per page but do not fail the run.
+
+Usage (from the repository root):
+    python -m benchmarks.html_extraction [--fixtures DIR] [--repeat 5]
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import tempfile
+import time
+from importlib.util import find_spec
+
+from bs4 import BeautifulSoup
+
+from crawler import FAQCrawler, PageScan
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+PARSERS = [("html.parser", None), ("lxml", "lxml"), ("html5lib", "html5lib")]
+
+
+def comparable(result: tuple) -> tuple:
+    faqs, links = result
+    return [{k: v for k, v in faq.items() if k != "extracted_at"} for faq in faqs], links
+
+
+def run(crawler: FAQCrawler, pages: dict, parser: str, single_pass: bool, repeat: int) -> dict:
+    crawler.html_parser, crawler.single_pass = parser, single_pass
+    parse_s = extract_s = 0.0
+    results = {}
+    for _ in range(repeat):
+        for name, (url, content) in pages.items():
+            t0 = time.perf_counter()
+            soup = BeautifulSoup(content, parser)
+            t1 = time.perf_counter()
+            scan = PageScan(soup) if single_pass else None
+            results[name] = comparable((crawler.extract_faqs_from_page(soup, url, scan),
+                                        crawler.get_all_links(soup, url, skip_visited=False, scan=scan)))
+            t2 = time.perf_counter()
+            parse_s += t1 - t0
+            extract_s += t2 - t1
+    # The timed split above must add up to what the crawler does
+    assert all(comparable(crawler.parse_page(content, url)) == results[name]
+               for name, (url, content) in pages.items())
+    count = repeat * len(pages)
+    return {
+        "parser": parser,
+        "mode": "single_pass" if single_pass else "per_strategy",
+        "pages_per_s": count / (parse_s + extract_s),
+        "parse_ms": parse_s / count * 1000,
+        "extract_ms": extract_s / count * 1000,
+        "faqs": {name: len(result[0]) for name, result in results.items()},
+        "links": {name: len(result[1]) for name, result in results.items()},
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=FIXTURES, help="Directory of saved .html pages")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(args.fixtures, "*.html"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(path, "rb") as f:
+            pages[name] = (f"https://example.com/{name}", f.read())
+    if not pages:
+        raise SystemExit(f"No .html files in {args.fixtures}")
+    parsers = [name for name, module in PARSERS if module is None or find_spec(module)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        crawler = FAQCrawler("https://example.com", os.path.join(tmp, "faqs.json"))
+        logging.getLogger("crawler").setLevel(logging.WARNING)
+        runs = [run(crawler, pages, name, single_pass, args.repeat)
+                for name in parsers for single_pass in (False, True)]
+        crawler.sink.close()
+
+    reference = runs[0]["results"]
+    checks, differences = {}, {}
+    for per_strategy, single_pass in zip(runs[::2], runs[1::2]):
+        name = per_strategy["parser"]
+        checks[f"{name}_single_pass_equivalent"] = per_strategy["results"] == single_pass["results"]
+        differences[name] = sorted(page for page in pages if per_strategy["results"][page] != reference[page])
+
+    print(f"{len(pages)} pages x {args.repeat}: " + ", ".join(
+        f"{name} ({len(runs[0]['results'][name][0])} FAQs, {len(runs[0]['results'][name][1])} links)"
+        for name in pages))
+    print(f"{'parser':<12} {'mode':<13} {'pages/s':>8} {'parse ms':>9} {'extract ms':>11}")
+    for result in runs:
+        print(f"{result['parser']:<12} {result['mode']:<13} {result['pages_per_s']:>8.1f} "
+              f"{result['parse_ms']:>9.2f} {result['extract_ms']:>11.2f}")
+    for name, pages_differing in differences.items():
+        if name != "html.parser":
+            print(f"{name} vs html.parser: "
+                  f"{'same results on every page' if not pages_differing else 'differs on ' + ', '.join(pages_differing)}")
+    failed = [name for name, ok in checks.items() if not ok]
+    print(f"checks: {'ok' if not failed else 'FAILED: ' + ', '.join(failed)}")
+
+    for result in runs:
+        del result["results"]
+    print(json.dumps({"runs": runs, "differences_from_html_parser": differences, "checks": checks}, indent=2))
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+BM25 index cost and dense-only vs hybrid (BM25 + dense, RRF-fused) retrieval on keyword queries.
+
+Builds the BM25 index from the FAQ file and reports build time and per-query latency. Then, for
+every FAQ entry, forms a short keyword query from its highest-idf question terms (the way users
+type "UPI Lite" or "NACH mandate") and compares top-1 accuracy and fallback rate of the
+dense-only and hybrid retrievers against that entry.
+
+Usage (from the repository root):
+    python -m benchmarks.hybrid_retrieval [--terms 2] [--queries 1000]
+"""
+import argparse
+import json
+import time
+from typing import Dict, List, Tuple
+
+from benchmarks.common import percentiles
+from benchmarks.stub_llm import StubLLM
+from faq_logic import FAQBot
+from lexical_index import terms
+
+
+def keyword_queries(bot: FAQBot, n_terms: int) -> List[Tuple[str, str]]:
+    """(query, expected faq_id) pairs made of each question's n highest-idf terms, in question order."""
+    ids, texts, _ = bot._index_records()
+    idf = bot.lexical_index.idf
+    queries = []
+    for faq_id, text in zip(ids, texts):
+        question_terms = list(dict.fromkeys(terms(text)))
+        keep = set(sorted(question_terms, key=lambda term: idf.get(term, 0.0), reverse=True)[:n_terms])
+        query = " ".join(term for term in question_terms if term in keep)
+        if query:
+            queries.append((query, faq_id))
+    return queries
+
+
+def evaluate(bot: FAQBot, queries: List[Tuple[str, str]]) -> Dict:
+    correct = fallbacks = 0
+    latencies = []
+    for query, faq_id in queries:
+        t0 = time.perf_counter()
+        result = bot.retrieve(query)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if not result.is_confident:
+            fallbacks += 1
+        elif result.best.faq_id == faq_id:
+            correct += 1
+    return {
+        "top1_accuracy": correct / len(queries),
+        "fallback_rate": fallbacks / len(queries),
+        **percentiles(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faq-file", default="cleaned_faq.json")
+    parser.add_argument("--terms", type=int, default=2, help="Keywords per generated query")
+    parser.add_argument("--queries", type=int, default=1000, help="BM25 latency samples")
+    args = parser.parse_args()
+
+    hybrid = FAQBot(args.faq_file, llm=StubLLM(), hybrid=True)
+    dense = FAQBot(args.faq_file, llm=StubLLM(), hybrid=False)
+
+    t0 = time.perf_counter()
+    hybrid._build_lexical_index()
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    queries = keyword_queries(hybrid, args.terms)
+    lexical_latencies = []
+    for i in range(args.queries):
+        t0 = time.perf_counter()
+        hybrid.lexical_index.search(queries[i % len(queries)][0], hybrid.related_top_k + 4)
+        lexical_latencies.append((time.perf_counter() - t0) * 1000)
+    bm25 = percentiles(lexical_latencies)
+
+    print(f"BM25 index: {len(hybrid.lexical_index)} docs, {len(hybrid.lexical_index.postings)} terms, "
+          f"built in {build_ms:.1f} ms; query p50 {bm25['p50_ms'] * 1000:.1f} us, "
+          f"p95 {bm25['p95_ms'] * 1000:.1f} us")
+
+    results = {"bm25": {"build_ms": build_ms, **bm25}}
+    print(f"{'retriever':<10} {'top-1 acc':>9} {'fallback':>9} {'p50 ms':>8} {'p95 ms':>8}   ({len(queries)} queries)")
+    for name, bot in (("dense", dense), ("hybrid", hybrid)):
+        stats = evaluate(bot, queries)
+        results[name] = stats
+        print(f"{name:<10} {stats['top1_accuracy']:>9.1%} {stats['fallback_rate']:>9.1%} "
+              f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f}")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Compare the Chroma and NumPy vector-index backends on build/load time, query latency and RSS.
+
+Question embeddings are computed once with the production embedding model and replayed into
+each backend, so the numbers measure the index layer only. Every backend runs in its own
+subprocess so its resident memory is not polluted by the other one.
+
+Usage (from the repository root):
+    python -m benchmarks.index_backends [--faq-file cleaned_faq.json] [--queries 2000] [--k 7]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.common import percentiles, rss_mb
+
+BACKENDS = ("chroma", "numpy")
+
+
+class PrecomputedEmbeddings:
+    """Embedding function that replays vectors computed up front, keyed by text."""
+
+    def __init__(self, texts: List[str], vectors: np.ndarray):
+        self.lookup = {text: vector.tolist() for text, vector in zip(texts, vectors)}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.lookup[text] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.lookup[text]
+
+
+def run_backend(backend: str, workdir: str, n_queries: int, k: int) -> Dict:
+    from vector_index import ChromaVectorIndex, NumpyVectorIndex
+
+    vectors = np.load(os.path.join(workdir, "vectors.npy"))
+    with open(os.path.join(workdir, "records.json"), encoding="utf-8") as f:
+        records = json.load(f)
+    texts, metadatas = records["texts"], records["metadatas"]
+    embeddings = PrecomputedEmbeddings(texts, vectors)
+    persist_dir = os.path.join(workdir, f"{backend}_index")
+
+    rss_before = rss_mb()
+    t0 = time.perf_counter()
+    if backend == "chroma":
+        ChromaVectorIndex.from_texts(texts, metadatas, embeddings, persist_dir)
+    else:
+        NumpyVectorIndex.from_texts(texts, metadatas, embeddings).save(persist_dir)
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    if backend == "chroma":
+        index = ChromaVectorIndex.load(embeddings, persist_dir)
+    else:
+        index = NumpyVectorIndex.load(persist_dir)
+    load_s = time.perf_counter() - t0
+
+    rng = np.random.default_rng(0)
+    queries = vectors[rng.integers(0, len(vectors), n_queries)]
+    queries = queries + rng.normal(0, 0.02, queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    index.search(queries[0], k)  # warm-up
+    latencies = []
+    t_total = time.perf_counter()
+    for query in queries:
+        t0 = time.perf_counter()
+        index.search(query, k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    total_s = time.perf_counter() - t_total
+
+    return {
+        "backend": backend,
+        "documents": len(texts),
+        "build_s": build_s,
+        "load_s": load_s,
+        "queries": n_queries,
+        "qps": n_queries / total_s,
+        **percentiles(latencies),
+        "rss_delta_mb": rss_mb() - rss_before,
+    }
+
+
+def prepare(workdir: str, faq_file: str):
+    from faq_logic import FAQBot
+
+    with open(faq_file, encoding="utf-8") as f:
+        faq_data = json.load(f)
+    texts = [item['question'] for item in faq_data if item.get('question')]
+    metadatas = [
+        {
+            "answer": item.get('answer', ''),
+            "source_url": item.get('source_url', ''),
+            "category": item.get('category', 'General')
+        }
+        for item in faq_data if item.get('question')
+    ]
+    model = FAQBot._initialize_embeddings()
+    vectors = np.asarray(model.embed_documents(texts), dtype=np.float32)
+    np.save(os.path.join(workdir, "vectors.npy"), vectors)
+    with open(os.path.join(workdir, "records.json"), "w", encoding="utf-8") as f:
+        json.dump({"texts": texts, "metadatas": metadatas}, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faq-file", default="cleaned_faq.json")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=7)
+    parser.add_argument("--child", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.child, args.workdir, args.queries, args.k)))
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        prepare(workdir, args.faq_file)
+        rows = []
+        for backend in BACKENDS:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.index_backends", "--child", backend,
+                 "--workdir", workdir, "--queries", str(args.queries), "--k", str(args.k)],
+                check=True, capture_output=True, text=True
+            )
+            rows.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'backend':<8} {'docs':>6} {'build s':>8} {'load s':>7} {'p50 ms':>7} "
+          f"{'p95 ms':>7} {'p99 ms':>7} {'qps':>9} {'RSS +MB':>8}")
+    for row in rows:
+        print(f"{row['backend']:<8} {row['documents']:>6} {row['build_s']:>8.3f} {row['load_s']:>7.3f} "
+              f"{row['p50_ms']:>7.3f} {row['p95_ms']:>7.3f} {row['p99_ms']:>7.3f} "
+              f"{row['qps']:>9.0f} {row['rss_delta_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
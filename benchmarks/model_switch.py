@@ -0,0 +1,145 @@
+"""
+Persisted indexes after an embedding model switch: rebuilt when the model changes, reused when not.
+
+Starts ``FAQBot`` three times per vector backend, with passage retrieval on, over the first
+``--faqs`` entries of the FAQ file, in a scratch directory: with a 128-dimensional model,
+then with a 64-dimensional one, then with the 64-dimensional one again, and then with the
+same model behind ``USE_ONNX=true`` and ``ONNX_QUANTIZE=true``, whose vectors have the same
+dimension but are not interchangeable. The models are hashed bag-of-words embeddings, so no
+download is needed, and the embedding cache is disabled so every vector the bot needs
+reaches the model. Checks, per backend:
+
+- the switch re-embeds every entry and passage, and both the index and the passage index hold
+  64-dimensional vectors recorded under the new model key;
+- questions are answered from the knowledge base after the switch (not ``source: "error"``);
+- the restart with an unchanged model embeds nothing and reuses the index;
+- each engine switch re-embeds everything, although the dimension does not change.
+
+Usage (from the repository root):
+    python -m benchmarks.model_switch [--faq-file cleaned_faq.json] [--faqs 60]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import List
+
+import numpy as np
+
+import faq_logic
+from benchmarks.stub_llm import StubLLM
+from faq_logic import FAQBot
+
+BACKENDS = ("numpy", "chroma")
+
+
+class HashedEmbeddings:
+    """Bag-of-words embeddings hashed into ``dimension`` buckets; counts the texts it embeds."""
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.embedded = 0
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for word in text.lower().split():
+            digest = hashlib.blake2b(word.strip("?.,!").encode("utf-8"), digest_size=8).digest()
+            vector[int.from_bytes(digest, "little") % self.dimension] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.embedded += len(texts)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+# (name, model dimension, USE_ONNX, ONNX_QUANTIZE) of each start
+STARTS = (("build", 128, False, False), ("switch", 64, False, False), ("restart", 64, False, False),
+          ("onnx", 64, True, False), ("onnx_int8", 64, True, True))
+
+
+def start(backend: str, faq_file: str, dimension: int, onnx: bool, quantize: bool, questions: List[str]) -> dict:
+    """Start a bot with a ``dimension``-sized model on the given engine and ask it every question."""
+    model = HashedEmbeddings(dimension)
+    faq_logic.EMBEDDING_MODEL = f"hashed-bow-{dimension}"
+    faq_logic.USE_ONNX, faq_logic.ONNX_QUANTIZE = onnx, quantize
+    FAQBot._initialize_embeddings = staticmethod(lambda: model)
+    bot = FAQBot(faq_file, vector_backend=backend, llm=StubLLM(latency=0), extra_sources=[], passages=True)
+    vectors, _ = bot.vector_index.vectors()
+    answers = [bot.answer_question(question) for question in questions]
+    return {
+        "model_key": bot._embedding_model_key(),
+        "index_model_key": bot.vector_index.model_key,
+        "passage_model_key": bot.passage_index.index.model_key,
+        "dimension": int(vectors.shape[1]),
+        "passage_dimension": int(bot.passage_index.index.embeddings.shape[1]),
+        "passages": len(bot.passage_index),
+        "embedded": model.embedded,
+        "sources": sorted({answer["source"] for answer in answers}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faq-file", default="cleaned_faq.json")
+    parser.add_argument("--faqs", type=int, default=60)
+    args = parser.parse_args()
+
+    with open(args.faq_file, encoding="utf-8") as f:
+        faqs = json.load(f)[:args.faqs]
+    # Paraphrases, so answers come from retrieval rather than the exact-match fast path
+    questions = [f"please tell me {faq['question'].lower().rstrip('?')}" for faq in faqs[:10]]
+    faq_logic.EMBEDDING_CACHE_PATH = None
+    logging.getLogger("faq_logic").setLevel(logging.WARNING)
+
+    results, checks = {}, {}
+    cwd = os.getcwd()
+    for backend in BACKENDS:
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            try:
+                with open("faqs.json", "w", encoding="utf-8") as f:
+                    json.dump(faqs, f)
+                runs = {name: start(backend, "faqs.json", dimension, onnx, quantize, questions)
+                        for name, dimension, onnx, quantize in STARTS}
+            finally:
+                os.chdir(cwd)
+        results[backend] = runs
+        built, switched, restarted = runs["build"], runs["switch"], runs["restart"]
+        checks[f"{backend}_rebuilt_on_switch"] = (
+            switched["embedded"] == built["embedded"] == len(faqs) + built["passages"]
+            and switched["dimension"] == switched["passage_dimension"] == 64
+            and switched["index_model_key"] == switched["passage_model_key"] == switched["model_key"]
+            and switched["model_key"] != built["model_key"]
+        )
+        checks[f"{backend}_answers_after_switch"] = "error" not in switched["sources"]
+        checks[f"{backend}_reused_without_switch"] = (
+            restarted["embedded"] == 0
+            and restarted["index_model_key"] == restarted["passage_model_key"] == restarted["model_key"]
+        )
+        checks[f"{backend}_rebuilt_on_engine_switch"] = all(
+            runs[name]["embedded"] == built["embedded"]
+            and runs[name]["index_model_key"] == runs[name]["passage_model_key"] == runs[name]["model_key"]
+            and "error" not in runs[name]["sources"]
+            for name in ("onnx", "onnx_int8")
+        )
+
+    print(f"{'backend':<8} {'start':<10} {'model':<24} {'dim':>4} {'embedded':>9}  sources")
+    for backend, runs in results.items():
+        for name, run in runs.items():
+            print(f"{backend:<8} {name:<10} {run['model_key']:<24} {run['dimension']:>4} "
+                  f"{run['embedded']:>9}  {', '.join(run['sources'])}")
+    failed = [name for name, ok in checks.items() if not ok]
+    print(f"checks: {'ok' if not failed else 'FAILED: ' + ', '.join(failed)}")
+    print(json.dumps({"runs": results, "checks": checks}, indent=2))
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Parity and performance check of the ONNX Runtime embedding engine against the PyTorch model.
+
+Encodes the FAQ questions (plus a few edge cases: empty-ish, very long, non-ASCII) with
+HuggingFaceEmbeddings and with OnnxEmbeddings in fp32 and int8, then reports per-text cosine
+parity, single-query latency percentiles, batch throughput and the RSS growth of loading each
+engine. Exits non-zero if parity falls below --min-cosine-fp32 / --min-cosine-int8, so it can
+gate a deployment that flips USE_ONNX or ONNX_QUANTIZE.
+
+Usage (from the repository root):
+    python -m benchmarks.onnx_parity [--queries 200] [--threads 1]
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.common import percentiles, rss_mb
+
+EDGE_CASES = [
+    "?",
+    "KYC",
+    "Edge+ RuPay UPI Lite NACH",
+    "मेरा केवाईसी कैसे पूरा करें?",
+    "How do I close my account " * 60,
+]
+
+
+def profile(name: str, factory, texts: List[str], n_queries: int) -> Dict:
+    rss_before = rss_mb()
+    t0 = time.perf_counter()
+    engine = factory()
+    load_s = time.perf_counter() - t0
+    engine.embed_query(texts[0])  # warm-up
+    rss_delta = rss_mb() - rss_before
+
+    latencies = []
+    for text in texts[:n_queries]:
+        t0 = time.perf_counter()
+        engine.embed_query(text)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    vectors = np.asarray(engine.embed_documents(texts), dtype=np.float32)
+    batch_s = time.perf_counter() - t0
+    return {
+        "engine": name,
+        "load_s": load_s,
+        "rss_delta_mb": rss_delta,
+        "batch_texts_per_s": len(texts) / batch_s,
+        "vectors": vectors,
+        **percentiles(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faq-file", default="cleaned_faq.json")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=0, help="ONNX intra-op threads (0 = runtime default)")
+    parser.add_argument("--min-cosine-fp32", type=float, default=0.9999)
+    parser.add_argument("--min-cosine-int8", type=float, default=0.98)
+    args = parser.parse_args()
+
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    from onnx_embeddings import OnnxEmbeddings
+
+    with open(args.faq_file, encoding="utf-8") as f:
+        texts = [item["question"] for item in json.load(f) if item.get("question")] + EDGE_CASES
+    threads = args.threads or None
+
+    engines = [
+        ("pytorch", lambda: HuggingFaceEmbeddings(model_name=args.model, model_kwargs={'device': 'cpu'},
+                                                  encode_kwargs={'normalize_embeddings': True})),
+        ("onnx-fp32", lambda: OnnxEmbeddings(args.model, intra_op_threads=threads)),
+        ("onnx-int8", lambda: OnnxEmbeddings(args.model, quantize=True, intra_op_threads=threads)),
+    ]
+    results = [profile(name, factory, texts, args.queries) for name, factory in engines]
+    reference = results[0]["vectors"]
+
+    print(f"{'engine':<10} {'min cos':>8} {'mean cos':>8} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'batch/s':>8} {'load s':>7} {'RSS +MB':>8}")
+    failed = False
+    for row in results:
+        cosines = np.sum(row["vectors"] * reference, axis=1)
+        row["min_cosine"], row["mean_cosine"] = float(cosines.min()), float(cosines.mean())
+        print(f"{row['engine']:<10} {row['min_cosine']:>8.5f} {row['mean_cosine']:>8.5f} "
+              f"{row['p50_ms']:>7.2f} {row['p95_ms']:>7.2f} {row['batch_texts_per_s']:>8.0f} "
+              f"{row['load_s']:>7.2f} {row['rss_delta_mb']:>8.1f}")
+        threshold = {"onnx-fp32": args.min_cosine_fp32, "onnx-int8": args.min_cosine_int8}.get(row["engine"])
+        if threshold is not None and row["min_cosine"] < threshold:
+            print(f"  PARITY FAILURE: {row['engine']} min cosine {row['min_cosine']:.5f} < {threshold}")
+            failed = True
+
+    # Rankings matter more than raw vectors: check top-1 neighbours agree on the FAQ set.
+    n = len(texts) - len(EDGE_CASES)
+    reference_top = np.argsort(-(reference[:n] @ reference[:n].T), axis=1)[:, 1]
+    for row in results[1:]:
+        vectors = row["vectors"][:n]
+        agreement = float(np.mean(np.argsort(-(vectors @ vectors.T), axis=1)[:, 1] == reference_top))
+        print(f"{row['engine']:<10} nearest-neighbour agreement with pytorch: {agreement:.3f}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
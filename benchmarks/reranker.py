@@ -0,0 +1,109 @@
+"""
+Accuracy and added latency of the cross-encoder re-ranking stage.
+
+For a seeded sample of FAQ entries, builds perturbed versions of their questions (lowercased,
+a conversational prefix, one dropped, swapped or misspelled word) and retrieves each one with
+the configured retriever. The same candidates are then re-ranked by the cross-encoder, and
+top-1 accuracy, fallback rate and latency are compared with and without that stage. A second
+pass over the same queries measures the re-rank score cache.
+
+Usage (from the repository root):
+    python -m benchmarks.reranker [--queries 300] [--model cross-encoder/ms-marco-MiniLM-L-6-v2]
+"""
+import argparse
+import json
+import random
+import time
+from typing import Dict, List, Tuple
+
+import faq_logic
+from benchmarks.common import percentiles, perturb
+from benchmarks.stub_llm import StubLLM
+from faq_logic import FAQBot, RetrievalResult
+from reranker import CrossEncoderReranker
+
+
+def perturbed_queries(bot: FAQBot, n: int, seed: int) -> List[Tuple[str, str]]:
+    """(query, expected faq_id) pairs for a seeded sample of FAQ entries."""
+    rng = random.Random(seed)
+    ids, questions, _ = bot._index_records()
+    sample = rng.sample(range(len(ids)), min(n, len(ids)))
+    return [(perturb(questions[i], rng), ids[i]) for i in sample]
+
+
+def outcome(result: RetrievalResult, faq_id: str) -> str:
+    if not result.is_confident:
+        return "fallback"
+    return "correct" if result.best.faq_id == faq_id else "wrong"
+
+
+def summarize(outcomes: List[str], latencies: List[float]) -> Dict:
+    return {
+        "top1_accuracy": outcomes.count("correct") / len(outcomes),
+        "fallback_rate": outcomes.count("fallback") / len(outcomes),
+        **percentiles(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faq-file", default="cleaned_faq.json")
+    parser.add_argument("--model", default=faq_logic.RERANKER_MODEL)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--threshold", type=float, default=faq_logic.RERANK_THRESHOLD)
+    args = parser.parse_args()
+
+    # Score every query: the per-request budget is what serving enforces, not what is measured here.
+    faq_logic.RERANK_BUDGET_MS = float("inf")
+    faq_logic.RERANK_THRESHOLD = args.threshold
+    t0 = time.perf_counter()
+    reranker = CrossEncoderReranker(args.model)
+    reranker.warm_up()
+    load_ms = (time.perf_counter() - t0) * 1000
+    bot = FAQBot(args.faq_file, llm=StubLLM(), reranker=reranker)
+    bot.response_cache = None
+
+    queries = perturbed_queries(bot, args.queries, args.seed)
+    base_outcomes, base_latencies = [], []
+    reranked_outcomes, rerank_latencies, cached_latencies = [], [], []
+    for query, faq_id in queries:
+        t0 = time.perf_counter()
+        result = bot.retrieve(query)
+        base_latencies.append((time.perf_counter() - t0) * 1000)
+        base_outcomes.append(outcome(result, faq_id))
+
+        t0 = time.perf_counter()
+        bot.rerank(result)
+        rerank_latencies.append((time.perf_counter() - t0) * 1000)
+        reranked_outcomes.append(outcome(result, faq_id))
+    for query, _ in queries:
+        result = bot.retrieve(query)
+        t0 = time.perf_counter()
+        bot.rerank(result)
+        cached_latencies.append((time.perf_counter() - t0) * 1000)
+
+    results = {
+        "model": args.model,
+        "model_load_ms": load_ms,
+        "queries": len(queries),
+        "candidates": faq_logic.RERANK_TOP_K,
+        "retrieval": summarize(base_outcomes, base_latencies),
+        "retrieval+rerank": summarize(reranked_outcomes, [a + b for a, b in zip(base_latencies, rerank_latencies)]),
+        "rerank_added": percentiles(rerank_latencies),
+        "rerank_added_cached": percentiles(cached_latencies),
+        "reranker": reranker.get_stats(),
+    }
+    print(f"{'stage':<18} {'top-1 acc':>9} {'fallback':>9} {'p50 ms':>8} {'p95 ms':>8}   "
+          f"({len(queries)} queries, top {faq_logic.RERANK_TOP_K} re-ranked)")
+    for name in ("retrieval", "retrieval+rerank"):
+        stats = results[name]
+        print(f"{name:<18} {stats['top1_accuracy']:>9.1%} {stats['fallback_rate']:>9.1%} "
+              f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f}")
+    print(f"re-rank adds p50 {results['rerank_added']['p50_ms']:.2f} ms, p95 {results['rerank_added']['p95_ms']:.2f} ms "
+          f"(cached: p50 {results['rerank_added_cached']['p50_ms']:.3f} ms)")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
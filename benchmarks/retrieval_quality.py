@@ -0,0 +1,206 @@
+"""
+Offline retrieval benchmark: recall@k, MRR, fallback rates per threshold, and per-stage latency.
+
+Queries are generated from the FAQ file with a fixed seed: every sampled entry contributes its
+original question and ``--variants`` perturbed versions of it (lowercased, a conversational
+prefix, one dropped, swapped or misspelled word), each labelled with the entry it came from.
+All queries are encoded up front in batches; retrieval, the optional re-ranking stage and answer
+generation (with the stub LLM) then run query by query and are timed separately.
+
+Reported per query kind and overall:
+  - recall@1, recall@5 and MRR over the fused ranking;
+  - for each similarity threshold, the false-fallback rate (the query falls back although its
+    entry is in the candidates) and the wrong-answer rate (a confident hit on another entry);
+  - p50/p95/p99 latency and throughput of each stage.
+
+Results are written as JSON. With ``--baseline`` the run is compared against an earlier results
+file and the script exits non-zero on a recall/MRR drop or a p95 latency increase beyond the
+given tolerances, so it can gate changes in CI.
+
+Usage (from the repository root):
+    python -m benchmarks.retrieval_quality [--limit 500] [--variants 2] [--output retrieval_benchmark.json]
+                                           [--baseline old.json] [--rerank]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import faq_logic
+from benchmarks.common import percentiles, perturb
+from benchmarks.stub_llm import StubLLM
+from faq_logic import FAQBot, PendingAnswer, QueryContext, RetrievalResult
+
+RECALL_AT = (1, 5)
+DEFAULT_THRESHOLDS = (0.5, 0.6, 0.7, 0.8)
+
+
+def generate_queries(bot: FAQBot, limit: Optional[int], variants: int, seed: int) -> List[Tuple[str, str, str]]:
+    """(query, expected faq_id, kind) triples, identical for the same FAQ file, limit, variants and seed."""
+    rng = random.Random(seed)
+    ids, questions, _ = bot._index_records()
+    entries = list(range(len(ids)))
+    if limit is not None and limit < len(entries):
+        entries = sorted(rng.sample(entries, limit))
+    queries = []
+    for i in entries:
+        queries.append((questions[i], ids[i], "original"))
+        for _ in range(variants):
+            queries.append((perturb(questions[i], rng), ids[i], "perturbed"))
+    return queries
+
+
+def stage_stats(samples_ms: List[float], items: Optional[int] = None) -> Dict[str, float]:
+    """Latency percentiles plus throughput; ``items`` counts the queries covered when samples are batches."""
+    total_s = sum(samples_ms) / 1000
+    return {**percentiles(samples_ms), "throughput_qps": (items or len(samples_ms)) / total_s if total_s else 0.0}
+
+
+def quality(results: List[RetrievalResult], expected: List[str], thresholds: List[float]) -> Dict:
+    """Ranking metrics and, per threshold, how often the bot would fall back or answer from the wrong entry."""
+    ranks = []
+    for result, faq_id in zip(results, expected):
+        ranked_ids = [hit.faq_id for hit in result.hits]
+        ranks.append(ranked_ids.index(faq_id) + 1 if faq_id in ranked_ids else None)
+    n = len(ranks)
+    metrics = {f"recall@{k}": sum(1 for rank in ranks if rank is not None and rank <= k) / n for k in RECALL_AT}
+    metrics["mrr"] = sum(1.0 / rank for rank in ranks if rank is not None) / n
+
+    by_threshold = {}
+    for threshold in thresholds:
+        false_fallbacks = wrong = 0
+        for result, faq_id, rank in zip(results, expected, ranks):
+            # A re-ranked result is judged by the cross-encoder score, so that is the threshold swept.
+            if result.rerank_threshold is not None:
+                result.rerank_threshold = threshold
+            else:
+                result.similarity_threshold = threshold
+            # The bot falls back unless the result is confident; best is then only the top hit
+            if not result.is_confident:
+                false_fallbacks += rank is not None
+            elif result.best.faq_id != faq_id:
+                wrong += 1
+        by_threshold[f"{threshold:g}"] = {"false_fallback_rate": false_fallbacks / n, "wrong_answer_rate": wrong / n}
+    metrics["thresholds"] = by_threshold
+    return metrics
+
+
+def run(bot: FAQBot, queries: List[Tuple[str, str, str]], thresholds: List[float],
+        batch_size: int, top_n: int, rerank: bool) -> Dict:
+    texts = [query for query, _, _ in queries]
+    embed_ms, vectors = [], []
+    for start in range(0, len(texts), batch_size):
+        t0 = time.perf_counter()
+        vectors.extend(bot.embedding_model.embed_documents(texts[start:start + batch_size]))
+        embed_ms.append((time.perf_counter() - t0) * 1000)
+
+    retrieve_ms, rerank_ms, generate_ms, results = [], [], [], []
+    for (query, _, _), vector in zip(queries, vectors):
+        context = QueryContext(query, np.asarray(vector, dtype=np.float32))
+        t0 = time.perf_counter()
+        result = bot.retrieve(query, top_n=top_n, context=context)
+        retrieve_ms.append((time.perf_counter() - t0) * 1000)
+        if rerank:
+            t0 = time.perf_counter()
+            bot.rerank(result)
+            rerank_ms.append((time.perf_counter() - t0) * 1000)
+        if result.is_confident:
+            t0 = time.perf_counter()
+            bot.chain.invoke(PendingAnswer(query, result.best, context).inputs)
+            generate_ms.append((time.perf_counter() - t0) * 1000)
+        results.append(result)
+
+    stages = {
+        "embed_batch": stage_stats(embed_ms, len(texts)),
+        "retrieve": stage_stats(retrieve_ms),
+        "generate": stage_stats(generate_ms),
+    }
+    if rerank:
+        stages["rerank"] = stage_stats(rerank_ms)
+
+    report = {"overall": quality(results, [faq_id for _, faq_id, _ in queries], thresholds), "by_kind": {}}
+    for kind in sorted({kind for _, _, kind in queries}):
+        members = [i for i, (_, _, query_kind) in enumerate(queries) if query_kind == kind]
+        report["by_kind"][kind] = quality([results[i] for i in members], [queries[i][1] for i in members], thresholds)
+    report["stages"] = stages
+    return report
+
+
+def regressions(current: Dict, baseline: Dict, max_quality_drop: float, max_latency_ratio: float) -> List[str]:
+    """Human-readable descriptions of every metric that got worse than the tolerances allow."""
+    found = []
+    for metric in [f"recall@{k}" for k in RECALL_AT] + ["mrr"]:
+        old, new = baseline["overall"].get(metric), current["overall"][metric]
+        if old is not None and new < old - max_quality_drop:
+            found.append(f"{metric} dropped from {old:.4f} to {new:.4f}")
+    for stage, stats in current["stages"].items():
+        old = baseline.get("stages", {}).get(stage, {}).get("p95_ms")
+        if old and stats["p95_ms"] > old * max_latency_ratio:
+            found.append(f"{stage} p95 rose from {old:.2f} ms to {stats['p95_ms']:.2f} ms")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faq-file", default="cleaned_faq.json")
+    parser.add_argument("--limit", type=int, default=None, help="FAQ entries to sample (default: all)")
+    parser.add_argument("--variants", type=int, default=2, help="Perturbed queries per entry")
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=list(DEFAULT_THRESHOLDS))
+    parser.add_argument("--batch-size", type=int, default=64, help="Query encoding batch size")
+    parser.add_argument("--top-n", type=int, default=10, help="Candidates retrieved per query")
+    parser.add_argument("--rerank", action="store_true", help="Include the cross-encoder re-ranking stage")
+    parser.add_argument("--output", default="retrieval_benchmark.json")
+    parser.add_argument("--baseline", help="Earlier results file to check for regressions")
+    parser.add_argument("--max-quality-drop", type=float, default=0.01)
+    parser.add_argument("--max-latency-ratio", type=float, default=1.5)
+    args = parser.parse_args()
+
+    reranker = None
+    if args.rerank:
+        from reranker import CrossEncoderReranker
+        # Measure the model's cost on every query rather than skipping it under the serving budget.
+        faq_logic.RERANK_BUDGET_MS = float("inf")
+        reranker = CrossEncoderReranker(faq_logic.RERANKER_MODEL)
+        reranker.warm_up()
+    bot = FAQBot(args.faq_file, llm=StubLLM(latency=0.0), reranker=reranker)
+    bot.response_cache = None
+
+    queries = generate_queries(bot, args.limit, args.variants, args.seed)
+    report = run(bot, queries, args.thresholds, args.batch_size, args.top_n, args.rerank)
+    report["config"] = {
+        "faq_file": args.faq_file, "queries": len(queries), "limit": args.limit, "variants": args.variants,
+        "seed": args.seed, "vector_backend": bot.vector_backend, "hybrid": bot.hybrid,
+        "passages": bot.passage_index is not None, "rerank": args.rerank, "top_n": args.top_n,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    overall = report["overall"]
+    print(f"{len(queries)} queries: recall@1 {overall['recall@1']:.1%}, recall@5 {overall['recall@5']:.1%}, "
+          f"MRR {overall['mrr']:.3f}")
+    print(f"{'threshold':>9} {'false fallback':>15} {'wrong answer':>13}")
+    for threshold, rates in overall["thresholds"].items():
+        print(f"{threshold:>9} {rates['false_fallback_rate']:>15.1%} {rates['wrong_answer_rate']:>13.1%}")
+    print(f"{'stage':<12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'q/s':>10}")
+    for stage, stats in report["stages"].items():
+        print(f"{stage:<12} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} "
+              f"{stats['throughput_qps']:>10.1f}")
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            found = regressions(report, json.load(f), args.max_quality_drop, args.max_latency_ratio)
+        for regression in found:
+            print(f"REGRESSION: {regression}")
+        if found:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Startup-time benchmark: eager vs. lazy (background) FAQBot initialization.
+
+Launches main_bot.py as a subprocess for each mode and polls /health, recording the time until
+the server first answers (time to bind) and the time until every component reports ready.
+Requires the same environment as the app itself (GOOGLE_API_KEY, FAQ file, model cache).
+
+Usage (from the repository root):
+    python -m benchmarks.startup [--runs 3] [--timeout 300]
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, Optional
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def poll_health(port: int) -> Optional[Dict]:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return json.loads(e.read())
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None
+
+
+def measure(lazy: bool, timeout: float) -> Dict[str, float]:
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), LAZY_INIT="true" if lazy else "false")
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "main_bot.py"], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    first_response = ready = None
+    try:
+        while time.perf_counter() - t0 < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"main_bot.py exited with code {proc.returncode}")
+            health = poll_health(port)
+            if health is not None and first_response is None:
+                first_response = time.perf_counter() - t0
+            if health is not None and health.get("ready"):
+                ready = time.perf_counter() - t0
+                break
+            time.sleep(0.05)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return {"time_to_bind_s": first_response, "time_to_ready_s": ready}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'run':>3} {'bind s':>8} {'ready s':>8}")
+    for lazy in (False, True):
+        for run in range(args.runs):
+            result = measure(lazy, args.timeout)
+            bind = result["time_to_bind_s"]
+            ready = result["time_to_ready_s"]
+            print(f"{'lazy' if lazy else 'eager':<6} {run + 1:>3} "
+                  f"{bind if bind is not None else float('nan'):>8.2f} "
+                  f"{ready if ready is not None else float('nan'):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Offline stand-in for the Gemini LLM, with configurable latency, for benchmarks and load tests."""
+import asyncio
+import re
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+_RETRIEVED_ANSWER = re.compile(r'Retrieved Answer: "(.*?)"\s*\n', re.DOTALL)
+
+
+class StubLLM(LLM):
+    """
+    Echoes the retrieved answer from the FAQ prompt after sleeping for ``latency`` seconds.
+
+    Sync calls block with time.sleep and async calls await asyncio.sleep, so the stub models a
+    remote API whose cost is waiting rather than CPU. Streaming spreads the latency over
+    ``chunk_size``-character chunks.
+    """
+
+    latency: float = 0.5
+    chunk_size: int = 16
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _respond(self, prompt: str) -> str:
+        match = _RETRIEVED_ANSWER.search(prompt)
+        return match.group(1) if match else "Please contact Jupiter support for help with this."
+
+    def _chunks(self, text: str) -> List[str]:
+        return [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)] or [""]
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        time.sleep(self.latency)
+        return self._respond(prompt)
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                     **kwargs: Any) -> str:
+        await asyncio.sleep(self.latency)
+        return self._respond(prompt)
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                **kwargs: Any) -> Iterator[GenerationChunk]:
+        chunks = self._chunks(self._respond(prompt))
+        for chunk in chunks:
+            time.sleep(self.latency / len(chunks))
+            yield GenerationChunk(text=chunk)
+
+    async def _astream(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                       **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        chunks = self._chunks(self._respond(prompt))
+        for chunk in chunks:
+            await asyncio.sleep(self.latency / len(chunks))
+            yield GenerationChunk(text=chunk)
@@ -0,0 +1,170 @@
+"""
+Crawl frontier: the queue of URLs still to crawl, the set of URLs already queued, and
+checkpoints of both.
+
+The crawler checkpoints its frontier next to the crawl log (see ``faq_sink``) every few
+pages. A checkpoint records how many page records the log held when it was taken, so
+resuming loads the checkpoint and replays only the page records logged after it.
+"""
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+from faq_sink import write_json_atomic
+
+
+logger = logging.getLogger(__name__)
+
+
+def read_checkpoint(path: str) -> Optional[Dict]:
+    """A saved frontier checkpoint, or None if there is none or it cannot be read."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable frontier checkpoint {path}: {e}")
+        return None
+
+
+class BloomFilter:
+    """
+    Fixed-size set membership with no false negatives and a tunable false-positive rate.
+
+    Sized for ``capacity`` items at ``error_rate``: about 2.4 bytes per URL at 1e-4, against
+    well over 100 bytes for a URL string in a Python set. Uses double hashing over one BLAKE2b
+    digest to derive the bit positions.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 1e-4):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> List[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def to_dict(self) -> Dict:
+        return {"capacity": self.capacity, "error_rate": self.error_rate, "count": self.count,
+                "bits": base64.b64encode(bytes(self.bits)).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "BloomFilter":
+        bloom = cls(data["capacity"], data["error_rate"])
+        bloom.bits = bytearray(base64.b64decode(data["bits"]))
+        bloom.count = data["count"]
+        return bloom
+
+
+class CrawlFrontier:
+    """
+    FIFO crawl queue in which every URL is enqueued at most once.
+
+    ``seen`` holds every URL ever pushed (queued, in progress or done), so a link found on many
+    pages costs one membership test instead of a queue entry per occurrence; BFS order is the
+    same as deduplicating at pop time. ``seen`` is an exact set, or with ``bloom=True`` a Bloom
+    filter of fixed memory (a false positive skips a URL that was never crawled, at
+    ``error_rate``). URLs handed out by ``pop`` stay in progress until ``done``, and a
+    checkpoint puts them back at the head of the queue, so a crash cannot drop them.
+    """
+
+    def __init__(self, bloom: bool = False, expected_urls: int = 1_000_000, error_rate: float = 1e-4):
+        self.seen = BloomFilter(expected_urls, error_rate) if bloom else set()
+        self.queue: deque = deque()
+        self.in_progress: Dict[str, None] = {}
+
+    def push(self, url: str) -> bool:
+        """Queue a URL unless it was queued before; returns whether it was added."""
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        self.queue.append(url)
+        return True
+
+    def extend(self, urls: Iterable[str]) -> int:
+        """Queue the URLs not queued before; returns how many were added."""
+        seen, queue, added = self.seen, self.queue, 0
+        for url in urls:
+            if url not in seen:
+                seen.add(url)
+                queue.append(url)
+                added += 1
+        return added
+
+    def pop(self) -> Optional[str]:
+        if not self.queue:
+            return None
+        url = self.queue.popleft()
+        self.in_progress[url] = None
+        return url
+
+    def done(self, url: str):
+        self.in_progress.pop(url, None)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.seen
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def replay(self, pages: List[Dict]):
+        """Apply logged page records (``url`` and ``links``) made after this frontier's checkpoint."""
+        finished = {page["url"] for page in pages}
+        self.queue = deque(url for url in self.queue if url not in finished)
+        # Mark every finished page first, so a link to one logged later is not queued again
+        for url in finished:
+            if url not in self.seen:
+                self.seen.add(url)
+        for page in pages:
+            self.extend(page["links"])
+
+    def checkpoint(self, path: str, pages_logged: int):
+        """Save the frontier atomically, with in-progress URLs re-queued first."""
+        data = {
+            "pages_logged": pages_logged,
+            "queue": list(self.in_progress) + list(self.queue),
+        }
+        if isinstance(self.seen, BloomFilter):
+            data["bloom"] = self.seen.to_dict()
+        else:
+            data["seen"] = sorted(self.seen)
+        write_json_atomic(path, data)
+
+    @classmethod
+    def from_checkpoint(cls, data: Dict) -> "CrawlFrontier":
+        """A frontier restored from the data of ``read_checkpoint``."""
+        frontier = cls()
+        if "bloom" in data:
+            frontier.seen = BloomFilter.from_dict(data["bloom"])
+        else:
+            frontier.seen = set(data["seen"])
+        frontier.queue = deque(data["queue"])
+        return frontier
+
+    def get_stats(self) -> Dict:
+        stats = {"queued": len(self.queue), "in_progress": len(self.in_progress), "seen": len(self.seen)}
+        if isinstance(self.seen, BloomFilter):
+            stats["bloom_bytes"] = len(self.seen.bits)
+        return stats
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+def faq_key(question: str) -> str:
+    """Stable FAQ id: the crawler treats questions that differ only in case or outer whitespace as one FAQ."""
+    return hashlib.sha1(question.lower().strip().encode("utf-8")).hexdigest()[:16]
+
+
+def faq_fingerprint(faq: Dict) -> str:
+    """Hash of what downstream consumers use from a FAQ, to tell an edited answer from an unchanged one."""
+    return hashlib.sha256(f"{faq['question'].strip()}\x1f{faq['answer'].strip()}".encode("utf-8")).hexdigest()
+
+
+class CrawlStateStore:
+    """
+    Per-URL crawl state that survives between runs, for incremental re-crawls.
+
+    For every fetched page it keeps the ETag and Last-Modified validators (sent back as
+    If-None-Match / If-Modified-Since), a SHA-256 of the body, the ids of the FAQs extracted
+    from it and its outgoing links, so an unchanged page can be skipped without parsing while
+    its links still feed the crawl frontier. A second table fingerprints every FAQ seen, so
+    only new or edited FAQs are reported as changes. Backed by one SQLite file.
+    """
+
+    def __init__(self, path: str = "crawl_state.sqlite3"):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_hash TEXT, "
+            "faq_ids TEXT NOT NULL DEFAULT '[]', links TEXT NOT NULL DEFAULT '[]', fetched_at REAL);"
+            "CREATE TABLE IF NOT EXISTS faqs (faq_id TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, url TEXT);"
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_hash, faq_ids, links, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, content_hash, faq_ids, links, fetched_at = row
+        return {"etag": etag, "last_modified": last_modified, "content_hash": content_hash,
+                "faq_ids": json.loads(faq_ids), "links": json.loads(links), "fetched_at": fetched_at}
+
+    @staticmethod
+    def conditional_headers(page: Optional[Dict]) -> Dict[str, str]:
+        """Request headers that let the server answer 304 Not Modified for a page fetched before."""
+        headers = {}
+        if page and page["etag"]:
+            headers["If-None-Match"] = page["etag"]
+        if page and page["last_modified"]:
+            headers["If-Modified-Since"] = page["last_modified"]
+        return headers
+
+    def record_page(self, url: str, etag: Optional[str], last_modified: Optional[str], content_hash: str,
+                    faq_ids: List[str], links: List[str]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, content_hash, faq_ids, links, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, content_hash, json.dumps(faq_ids), json.dumps(links), time.time())
+            )
+            self._conn.commit()
+
+    def touch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Mark an unchanged page as re-checked, keeping its stored validators unless the server sent new ones."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (time.time(), etag, last_modified, url)
+            )
+            self._conn.commit()
+
+    def changed_faqs(self, faqs: List[Dict], url: str) -> Dict[str, List[Dict]]:
+        """Split FAQs into those never seen and those whose answer changed, and record their fingerprints."""
+        changes = {"new": [], "changed": []}
+        with self._lock:
+            for faq in faqs:
+                faq_id, fingerprint = faq_key(faq["question"]), faq_fingerprint(faq)
+                row = self._conn.execute("SELECT fingerprint FROM faqs WHERE faq_id = ?", (faq_id,)).fetchone()
+                if row is None:
+                    changes["new"].append(faq)
+                elif row[0] != fingerprint:
+                    changes["changed"].append(faq)
+                else:
+                    continue
+                self._conn.execute("INSERT OR REPLACE INTO faqs (faq_id, fingerprint, url) VALUES (?, ?, ?)",
+                                   (faq_id, fingerprint, url))
+            self._conn.commit()
+        return changes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
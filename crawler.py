@@ -1,17 +1,184 @@
-import requests
-from bs4 import BeautifulSoup
+import aiohttp
+import asyncio
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+from bs4.builder import HTMLTreeBuilder
 import json
 import time
 import os
+import random
 from urllib.parse import urljoin, urlparse, urlunparse
 from urllib.robotparser import RobotFileParser
-from typing import List, Dict, Set
+from typing import List, Dict, Mapping, Optional, Tuple
 import logging
-from collections import deque
+import hashlib
 import re
 
+from crawl_frontier import CrawlFrontier, read_checkpoint
+from crawl_state import CrawlStateStore, faq_key
+from faq_sink import FAQSink, fold, write_json_atomic
+
+# Responses worth retrying: rate limiting and transient server errors.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# lxml tokenizes in C, so BeautifulSoup builds its tree faster than with the pure-Python html.parser
+try:
+    import lxml  # noqa: F401
+    DEFAULT_HTML_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_HTML_PARSER = 'html.parser'
+
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+ACCORDION_KEYWORDS = ['accordion', 'collapse', 'toggle', 'expandable']
+# The strings get_text() includes for ordinary tags; script, style and template contents are left out
+TEXT_STRING_TYPES = {NavigableString, CData}
+STRING_CONTAINER_TAGS = set(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+
+# Selectors tried in order by the generic strategy: tag names, classes and one attribute
+GENERIC_QUESTION_SELECTORS = [
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    '.question', '.title', '.header',
+    '[data-toggle]', '.accordion-header',
+    'summary', '.faq-question'
+]
+GENERIC_ANSWER_SELECTORS = [
+    '.answer', '.content', '.body', '.description',
+    '.accordion-body', '.collapse', '.faq-answer',
+    'p', '.text'
+]
+
+
+class PageScan:
+    """
+    One traversal of a parsed page that collects the elements every FAQ strategy and the
+    link extractor would otherwise find with a separate ``find_all`` over the whole tree.
+    
+    ``text(tag)`` equals ``tag.get_text(strip=True)``. On first use the text of every tag is
+    built bottom-up from its children's, so nested elements do not re-walk their subtrees.
+    """
+    
+    def __init__(self, soup: BeautifulSoup):
+        self.faq_items: List[Tag] = []
+        self.faq_toggles: List[Tag] = []
+        self.accordion_items: List[Tag] = []
+        self.text_elements: List[Tag] = []
+        self.headings: List[Tag] = []
+        self.anchors: List[Tag] = []
+        self.tags = soup.find_all(True)
+        self._text: Optional[Dict[int, str]] = None
+        for tag in self.tags:
+            name = tag.name
+            if name == 'a':
+                if tag.get('href') is not None:
+                    self.anchors.append(tag)
+                continue
+            if name in HEADING_TAGS:
+                self.headings.append(tag)
+                continue
+            if name in ('p', 'div', 'li'):
+                self.text_elements.append(tag)
+            if name in ('div', 'section'):
+                classes = tag.get('class') or []
+                if name == 'div' and 'faq-item' in classes:
+                    self.faq_items.append(tag)
+                if any(keyword in cls.lower() for cls in classes for keyword in ACCORDION_KEYWORDS):
+                    self.accordion_items.append(tag)
+                if name == 'div' and tag.get('data-controller') == 'faq-toggle':
+                    self.faq_toggles.append(tag)
+    
+    def text(self, tag: Tag) -> str:
+        if tag.name in STRING_CONTAINER_TAGS:
+            return tag.get_text(strip=True)  # script, style, template: only their own string type counts
+        if self._text is None:
+            # Reverse document order visits every child before its parent
+            self._text = text = {}
+            for element in reversed(self.tags):
+                text[id(element)] = ''.join(
+                    text[id(child)] if isinstance(child, Tag)
+                    else child.strip() if type(child) in TEXT_STRING_TYPES else ''
+                    for child in element.contents
+                )
+        return self._text[id(tag)]
+    
+    @staticmethod
+    def first_matches(item: Tag, selectors: List[str]) -> Dict[str, Tag]:
+        """
+        The first descendant of ``item`` matching each simple selector (``tag``, ``.class`` or
+        ``[attr]``), as ``item.select_one`` would return it, from one walk of the subtree
+        """
+        pending = list(selectors)
+        matches = {}
+        for element in item.descendants:
+            if not isinstance(element, Tag):
+                continue
+            classes = element.get('class') or ()
+            for selector in list(pending):
+                if selector[0] == '.':
+                    matched = selector[1:] in classes
+                elif selector[0] == '[':
+                    matched = element.get(selector[1:-1]) is not None
+                else:
+                    matched = element.name == selector
+                if matched:
+                    matches[selector] = element
+                    pending.remove(selector)
+            if not pending:
+                break
+        return matches
+
+
+class HostRateLimiter:
+    """
+    Per-host token bucket for asyncio tasks.
+
+    Each host gets ``requests_per_second`` tokens per second with bursts of up to ``burst``.
+    A robots.txt crawl-delay for a host lowers its rate to one request per delay and turns off
+    bursting. Waiters for the same host are served in arrival order.
+    """
+
+    def __init__(self, requests_per_second: float = 4.0, burst: int = 1):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self._buckets: Dict[str, List[float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._crawl_delays: Dict[str, float] = {}
+
+    def set_crawl_delay(self, host: str, seconds: float):
+        self._crawl_delays[host] = seconds
+
+    def interval(self, host: str) -> float:
+        return max(1.0 / self.requests_per_second, self._crawl_delays.get(host, 0.0))
+
+    async def acquire(self, host: str):
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            interval = self.interval(host)
+            capacity = 1.0 if host in self._crawl_delays else float(self.burst)
+            now = time.monotonic()
+            bucket = self._buckets.setdefault(host, [capacity, now])
+            while True:
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) / interval)
+                bucket[1] = now
+                if bucket[0] >= 1.0:
+                    bucket[0] -= 1.0
+                    return
+                await asyncio.sleep((1.0 - bucket[0]) * interval)
+                now = time.monotonic()
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, status: int, retry_after: Optional[float]):
+        super().__init__(f"HTTP {status}")
+        self.retry_after = retry_after
+
+
 class FAQCrawler:
-    def __init__(self, base_url: str, output_file: str = "faqs_2.json", max_pages: int = 50):
+    def __init__(self, base_url: str, output_file: str = "faqs_2.json", max_pages: int = 50,
+                 concurrency: int = 8, requests_per_second: float = 4.0, max_retries: int = 3,
+                 backoff: float = 0.5, timeout: float = 15.0, state_file: Optional[str] = None,
+                 changes_file: Optional[str] = None, log_file: Optional[str] = None,
+                 frontier_file: Optional[str] = None, checkpoint_every: int = 100,
+                 bloom_filter: bool = False, expected_urls: int = 1_000_000,
+                 html_parser: Optional[str] = None, single_pass: bool = True):
         """
         Initialize the FAQ crawler
         
@@ -19,24 +186,58 @@ class FAQCrawler:
             base_url: The base URL of the website to crawl
             output_file: JSON file to save FAQs
             max_pages: Maximum number of pages to crawl
+            concurrency: Number of pages fetched at the same time
+            requests_per_second: Per-host request rate (lowered by a robots.txt crawl-delay)
+            max_retries: Retries for connection errors, timeouts, 429 and 5xx responses
+            backoff: Base delay in seconds of the exponential retry backoff
+            timeout: Per-request timeout in seconds
+            state_file: SQLite crawl-state store enabling incremental re-crawls (None: full crawl)
+            changes_file: JSON file listing the FAQs that were new, changed or removed in this run
+            log_file: Append-only JSONL crawl log (default: output_file with a .jsonl extension);
+                an interrupted crawl resumes from it
+            frontier_file: Checkpoint of the crawl queue (default: output_file with a .frontier.json
+                extension), so resuming replays only the pages logged since the last checkpoint
+            checkpoint_every: Pages crawled between frontier checkpoints
+            bloom_filter: Remember queued URLs in a fixed-size Bloom filter instead of a set, for
+                crawls of millions of URLs (a false positive, about 1 in 10,000, skips a page)
+            expected_urls: Number of URLs the Bloom filter is sized for
+            html_parser: BeautifulSoup tree builder (default: 'lxml' if installed, else 'html.parser')
+            single_pass: Collect FAQ candidates and links in one traversal with cached text,
+                instead of one tree search per strategy
         """
         self.base_url = base_url.rstrip('/')
         self.domain = urlparse(base_url).netloc
         self.output_file = output_file
         self.max_pages = max_pages
-        self.visited_urls: Set[str] = set()
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.rate_limiter = HostRateLimiter(requests_per_second, burst=concurrency)
+        self.robots: Optional[RobotFileParser] = None
+        self.state = CrawlStateStore(state_file) if state_file else None
+        self.changes_file = changes_file
+        self.changes: Dict[str, List] = {'new': [], 'changed': [], 'removed': []}
+        self.log_file = log_file or os.path.splitext(output_file)[0] + '.jsonl'
+        self.frontier_file = frontier_file or os.path.splitext(output_file)[0] + '.frontier.json'
+        self.checkpoint_every = checkpoint_every
+        self.bloom_filter = bloom_filter
+        self.expected_urls = expected_urls
+        self.frontier = self.new_frontier()
         self.faqs: List[Dict] = []
-        self.session = requests.Session()
+        self.faq_index: Dict[str, int] = {}  # faq_key -> position in self.faqs
+        self.html_parser = html_parser or DEFAULT_HTML_PARSER
+        self.single_pass = single_pass
         
-        # Set up headers to mimic a real browser
-        self.session.headers.update({
+        # Request headers that mimic a real browser, sent on every fetch
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
+            'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
-        })
+        }
         
         # Set up logging
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -44,8 +245,10 @@ class FAQCrawler:
         
         # Load existing FAQs if file exists
         self.load_existing_faqs()
+        self.sink = FAQSink(self.log_file)
         
         # URL patterns to avoid
+        self._skip_source: Optional[Tuple[str, ...]] = None
         self.skip_patterns = [
             r'\.pdf$', r'\.jpg$', r'\.jpeg$', r'\.png$', r'\.gif$', r'\.css$', r'\.js$',
             r'\.zip$', r'\.exe$', r'\.doc$', r'\.docx$', r'\.xml$', r'\.rss$',
@@ -63,12 +266,19 @@ class FAQCrawler:
             except Exception as e:
                 self.logger.error(f"Error loading existing FAQs: {e}")
                 self.faqs = []
+        self.index_faqs()
+    
+    def index_faqs(self):
+        """Rebuild the FAQ-key index used to deduplicate extracted FAQs in constant time"""
+        self.faq_index = {faq_key(faq['question']): i for i, faq in enumerate(self.faqs)}
+    
+    def new_frontier(self) -> CrawlFrontier:
+        return CrawlFrontier(bloom=self.bloom_filter, expected_urls=self.expected_urls)
     
     def save_faqs(self):
-        """Save FAQs to JSON file in real-time"""
+        """Write the consolidated FAQ list to the JSON file (atomically, so a crash leaves the old file intact)"""
         try:
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                json.dump(self.faqs, f, indent=2, ensure_ascii=False)
+            write_json_atomic(self.output_file, self.faqs)
             self.logger.info(f"Saved {len(self.faqs)} FAQs to {self.output_file}")
         except Exception as e:
             self.logger.error(f"Error saving FAQs: {e}")
@@ -83,9 +293,8 @@ class FAQCrawler:
                 return False
             
             # Check skip patterns
-            for pattern in self.skip_patterns:
-                if re.search(pattern, url, re.IGNORECASE):
-                    return False
+            if self.skip_regex().search(url):
+                return False
             
             # Must be HTTP/HTTPS
             if parsed.scheme not in ['http', 'https']:
@@ -95,6 +304,14 @@ class FAQCrawler:
         except:
             return False
     
+    def skip_regex(self) -> re.Pattern:
+        """``skip_patterns`` compiled into one alternation, recompiled if the list changes"""
+        patterns = tuple(self.skip_patterns)
+        if patterns != self._skip_source:
+            self._skip_source = patterns
+            self._skip_regex = re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE)
+        return self._skip_regex
+    
     def normalize_url(self, url: str) -> str:
         """Normalize URL to avoid duplicates"""
         parsed = urlparse(url)
@@ -102,46 +319,22 @@ class FAQCrawler:
         normalized = urlunparse((
             parsed.scheme,
             parsed.netloc,
-            parsed.path.rstrip('/') if parsed.path != '/' else '/',
+            parsed.path.rstrip('/') or '/',
             parsed.params,
             parsed.query,
             ''  # Remove fragment
         ))
         return normalized
     
-    def get_page_content(self, url: str) -> BeautifulSoup:
-        """
-        Fetch and parse page content
-        
-        Args:
-            url: URL to fetch
-            
-        Returns:
-            BeautifulSoup object or None if failed
-        """
-        try:
-            self.logger.info(f"Fetching: {url}")
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            
-            # Check content type
-            content_type = response.headers.get('content-type', '').lower()
-            if 'text/html' not in content_type:
-                self.logger.warning(f"Skipping non-HTML content: {url}")
-                return None
-                
-            return BeautifulSoup(response.content, 'html.parser')
-        except Exception as e:
-            self.logger.error(f"Error fetching {url}: {e}")
-            return None
-    
-    def extract_faqs_from_page(self, soup: BeautifulSoup, url: str) -> List[Dict]:
+    def extract_faqs_from_page(self, soup: BeautifulSoup, url: str, scan: Optional[PageScan] = None) -> List[Dict]:
         """
         Extract FAQ question-answer pairs from a page using multiple strategies
         
         Args:
             soup: BeautifulSoup object of the page
             url: URL of the page
+            scan: Single traversal of the page supplying each strategy's elements and their text
+                (None: every strategy searches the tree itself)
             
         Returns:
             List of FAQ dictionaries
@@ -149,7 +342,7 @@ class FAQCrawler:
         faqs = []
         
         # Strategy 1: Look for the exact format from your example
-        faq_items = soup.find_all('div', class_='faq-item')
+        faq_items = scan.faq_items if scan else soup.find_all('div', class_='faq-item')
         
         if faq_items:
             self.logger.info(f"Found {len(faq_items)} FAQ items using Strategy 1")
@@ -160,7 +353,8 @@ class FAQCrawler:
         
         # Strategy 2: Look for FAQ containers with toggle functionality
         if not faqs:
-            faq_containers = soup.find_all('div', attrs={'data-controller': 'faq-toggle'})
+            faq_containers = scan.faq_toggles if scan else \
+                soup.find_all('div', attrs={'data-controller': 'faq-toggle'})
             for container in faq_containers:
                 items = container.find_all('div', class_='faq-item')
                 self.logger.info(f"Found {len(items)} FAQ items using Strategy 2")
@@ -171,24 +365,24 @@ class FAQCrawler:
         
         # Strategy 3: Look for accordion-style FAQs
         if not faqs:
-            accordion_items = soup.find_all(['div', 'section'], class_=lambda x: x and any(
-                keyword in str(x).lower() for keyword in ['accordion', 'collapse', 'toggle', 'expandable']
+            accordion_items = scan.accordion_items if scan else soup.find_all(['div', 'section'], class_=lambda x: x and any(
+                keyword in str(x).lower() for keyword in ACCORDION_KEYWORDS
             ))
             
             if accordion_items:
                 self.logger.info(f"Found {len(accordion_items)} accordion items using Strategy 3")
                 for item in accordion_items:
-                    faq = self.extract_faq_generic(item, url)
+                    faq = self.extract_faq_generic(item, url, scan)
                     if faq:
                         faqs.append(faq)
         
         # Strategy 4: Look for question-answer patterns in text
         if not faqs:
-            faqs.extend(self.extract_faqs_by_text_pattern(soup, url))
+            faqs.extend(self.extract_faqs_by_text_pattern(soup, url, scan))
         
         # Strategy 5: Look for FAQ sections by headings
         if not faqs:
-            faqs.extend(self.extract_faqs_by_headings(soup, url))
+            faqs.extend(self.extract_faqs_by_headings(soup, url, scan))
         
         return faqs
     
@@ -237,38 +431,32 @@ class FAQCrawler:
         
         return None
     
-    def extract_faq_generic(self, item: BeautifulSoup, url: str) -> Dict:
+    def extract_faq_generic(self, item: BeautifulSoup, url: str, scan: Optional[PageScan] = None) -> Dict:
         """Generic FAQ extraction for various formats"""
         try:
-            # Look for question - usually the first prominent text
-            question_selectors = [
-                'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
-                '.question', '.title', '.header',
-                '[data-toggle]', '.accordion-header',
-                'summary', '.faq-question'
-            ]
+            if scan:
+                # One walk of the item instead of a CSS selector search per selector
+                matches = scan.first_matches(item, GENERIC_QUESTION_SELECTORS + GENERIC_ANSWER_SELECTORS)
+                select_one, get_text = matches.get, scan.text
+            else:
+                select_one, get_text = item.select_one, lambda elem: elem.get_text(strip=True)
             
+            # Look for question - usually the first prominent text
             question = None
-            for selector in question_selectors:
-                elem = item.select_one(selector)
+            for selector in GENERIC_QUESTION_SELECTORS:
+                elem = select_one(selector)
                 if elem:
-                    text = elem.get_text(strip=True)
+                    text = get_text(elem)
                     if len(text) > 5 and '?' in text:
                         question = text
                         break
             
             # Look for answer - usually in a separate div or paragraph
-            answer_selectors = [
-                '.answer', '.content', '.body', '.description',
-                '.accordion-body', '.collapse', '.faq-answer',
-                'p', '.text'
-            ]
-            
             answer = None
-            for selector in answer_selectors:
-                elem = item.select_one(selector)
+            for selector in GENERIC_ANSWER_SELECTORS:
+                elem = select_one(selector)
                 if elem:
-                    text = elem.get_text(strip=True)
+                    text = get_text(elem)
                     if len(text) > 10 and text != question:
                         answer = text
                         break
@@ -287,18 +475,19 @@ class FAQCrawler:
         
         return None
     
-    def extract_faqs_by_text_pattern(self, soup: BeautifulSoup, url: str) -> List[Dict]:
+    def extract_faqs_by_text_pattern(self, soup: BeautifulSoup, url: str, scan: Optional[PageScan] = None) -> List[Dict]:
         """Extract FAQs by looking for Q&A text patterns"""
         faqs = []
+        get_text = scan.text if scan else lambda elem: elem.get_text(strip=True)
         
         try:
             # Look for text that starts with Q: or Question:
-            text_elements = soup.find_all(['p', 'div', 'li'])
+            text_elements = scan.text_elements if scan else soup.find_all(['p', 'div', 'li'])
             
             i = 0
             while i < len(text_elements) - 1:
                 elem = text_elements[i]
-                text = elem.get_text(strip=True)
+                text = get_text(elem)
                 
                 # Check if this looks like a question
                 if (text.lower().startswith(('q:', 'question:', 'q.')) or 
@@ -307,7 +496,7 @@ class FAQCrawler:
                     # Look for answer in next element(s)
                     for j in range(i + 1, min(i + 3, len(text_elements))):
                         next_elem = text_elements[j]
-                        next_text = next_elem.get_text(strip=True)
+                        next_text = get_text(next_elem)
                         
                         if (next_text.lower().startswith(('a:', 'answer:', 'a.')) or 
                             (len(next_text) > 20 and not next_text.endswith('?'))):
@@ -332,15 +521,16 @@ class FAQCrawler:
         
         return faqs
     
-    def extract_faqs_by_headings(self, soup: BeautifulSoup, url: str) -> List[Dict]:
+    def extract_faqs_by_headings(self, soup: BeautifulSoup, url: str, scan: Optional[PageScan] = None) -> List[Dict]:
         """Extract FAQs by looking for question headings followed by content"""
         faqs = []
+        get_text = scan.text if scan else lambda elem: elem.get_text(strip=True)
         
         try:
-            headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+            headings = scan.headings if scan else soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
             
             for heading in headings:
-                question = heading.get_text(strip=True)
+                question = get_text(heading)
                 
                 # Check if heading looks like a question
                 if '?' in question and len(question) > 10:
@@ -348,7 +538,7 @@ class FAQCrawler:
                     answer_elem = heading.find_next_sibling(['p', 'div', 'ul', 'ol'])
                     
                     if answer_elem:
-                        answer = answer_elem.get_text(strip=True)
+                        answer = get_text(answer_elem)
                         
                         if len(answer) > 20:
                             faqs.append({
@@ -362,12 +552,13 @@ class FAQCrawler:
         
         return faqs
     
-    def get_all_links(self, soup: BeautifulSoup, current_url: str) -> List[str]:
+    def get_all_links(self, soup: BeautifulSoup, current_url: str, skip_visited: bool = True,
+                      scan: Optional[PageScan] = None) -> List[str]:
         """Extract all valid internal links from a page"""
         links = []
         
         try:
-            for link in soup.find_all('a', href=True):
+            for link in (scan.anchors if scan else soup.find_all('a', href=True)):
                 href = link['href'].strip()
                 if not href:
                     continue
@@ -376,7 +567,7 @@ class FAQCrawler:
                 full_url = urljoin(current_url, href)
                 full_url = self.normalize_url(full_url)
                 
-                if self.is_valid_url(full_url) and full_url not in self.visited_urls:
+                if self.is_valid_url(full_url) and not (skip_visited and full_url in self.frontier):
                     links.append(full_url)
                     
         except Exception as e:
@@ -384,76 +575,320 @@ class FAQCrawler:
         
         return links
     
-    def crawl_all_pages(self):
+    def add_page_faqs(self, page_faqs: List[Dict]) -> List[Dict]:
+        """Add the FAQs not already known (by question text) and return the ones that were new"""
+        new_faqs = []
+        for faq in page_faqs:
+            key = faq_key(faq['question'])
+            if key not in self.faq_index:
+                self.faq_index[key] = len(self.faqs)
+                self.faqs.append(faq)
+                new_faqs.append(faq)
+                self.logger.info(f"New FAQ: {faq['question'][:60]}...")
+        return new_faqs
+    
+    def resume_from_log(self, progress: Dict):
         """
-        Crawl all pages on the website and extract FAQs
+        Restore an interrupted run from its crawl log: its FAQs, and the frontier from the last
+        checkpoint plus the pages logged after it (or from the whole log without a checkpoint)
+        """
+        records = self.sink.records
+        if not records:
+            self.discard_checkpoint()
+            return
+        self.faqs = fold(self.faqs, records)
+        self.index_faqs()
+        pages = []
+        for record in records:
+            if record['type'] == 'faq' and record.get('change'):
+                self.changes[record['change']].append(record['faq'])
+            elif record['type'] == 'removed':
+                self.changes['removed'].extend(record['ids'])
+            elif record['type'] == 'page':
+                pages.append(record)
+        if not pages:
+            self.discard_checkpoint()
+            return
+        progress['pages_crawled'] = len(pages)
+        checkpoint = read_checkpoint(self.frontier_file)
+        # A checkpoint is only taken after the log is synced, so it cannot be ahead of the log
+        if checkpoint is not None and checkpoint['pages_logged'] <= len(pages):
+            self.frontier = CrawlFrontier.from_checkpoint(checkpoint)
+            replayed = pages[checkpoint['pages_logged']:]
+        else:
+            replayed = pages
+        self.frontier.replay(replayed)
+        self.logger.info(f"Resuming from {self.log_file}: {len(pages)} pages already crawled "
+                         f"({len(replayed)} replayed after the frontier checkpoint), "
+                         f"{len(self.faqs)} FAQs, {len(self.frontier)} URLs queued")
+    
+    def discard_checkpoint(self):
+        """Remove a frontier checkpoint left without the log it refers to"""
+        if os.path.exists(self.frontier_file):
+            os.remove(self.frontier_file)
+    
+    def checkpoint_frontier(self, pages_logged: int):
+        """Sync the log, then save the frontier with the number of page records it reflects"""
+        try:
+            self.sink.sync()
+            self.frontier.checkpoint(self.frontier_file, pages_logged)
+        except Exception as e:
+            self.logger.error(f"Error saving frontier checkpoint: {e}")
+    
+    async def load_robots(self, http: aiohttp.ClientSession):
+        """Fetch robots.txt for the crawled host and apply its crawl-delay to the rate limiter"""
+        parsed = urlparse(self.base_url)
+        robots_url = f"{parsed.scheme}://{self.domain}/robots.txt"
+        self.robots = RobotFileParser(robots_url)
+        try:
+            await self.rate_limiter.acquire(self.domain)
+            async with http.get(robots_url) as response:
+                if response.status in (401, 403):
+                    self.robots.disallow_all = True
+                elif response.status >= 400:
+                    self.robots.allow_all = True
+                else:
+                    self.robots.parse((await response.text(errors='replace')).splitlines())
+        except Exception as e:
+            self.logger.warning(f"Could not fetch {robots_url}, crawling without it: {e}")
+            self.robots.allow_all = True
+            return
+        
+        user_agent = self.headers['User-Agent']
+        delay = self.robots.crawl_delay(user_agent)
+        rate = self.robots.request_rate(user_agent)
+        if rate:
+            delay = max(float(delay or 0), rate.seconds / rate.requests)
+        if delay:
+            self.rate_limiter.set_crawl_delay(self.domain, float(delay))
+            self.logger.info(f"robots.txt crawl-delay for {self.domain}: {float(delay):.2f}s")
+    
+    def is_allowed(self, url: str) -> bool:
+        """Check robots.txt rules for a URL"""
+        return self.robots is None or self.robots.can_fetch(self.headers['User-Agent'], url)
+    
+    @staticmethod
+    def _retry_after(headers) -> Optional[float]:
+        try:
+            return max(float(headers.get('Retry-After', '')), 0.0)
+        except ValueError:
+            return None  # absent, or an HTTP date
+    
+    async def fetch_page(self, http: aiohttp.ClientSession, url: str,
+                         headers: Optional[Dict[str, str]] = None) -> Optional[Tuple[int, bytes, Mapping[str, str]]]:
+        """
+        Fetch an HTML page under the host's rate limit, retrying transient failures
+        
+        Args:
+            headers: Extra request headers, e.g. the conditional ones from the crawl state
+        
+        Returns:
+            (status, body, case-insensitive response headers), with an empty body for 304 Not Modified;
+            None for non-HTML content and failed requests
+        """
+        host = urlparse(url).netloc
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire(host)
+            try:
+                self.logger.info(f"Fetching: {url}")
+                async with http.get(url, headers=headers) as response:
+                    if response.status == 304:
+                        return 304, b'', response.headers.copy()
+                    if response.status in RETRY_STATUSES:
+                        raise _RetryableStatus(response.status, self._retry_after(response.headers))
+                    response.raise_for_status()
+                    
+                    # Check content type
+                    content_type = response.headers.get('content-type', '').lower()
+                    if 'text/html' not in content_type:
+                        self.logger.warning(f"Skipping non-HTML content: {url}")
+                        return None
+                    return response.status, await response.read(), response.headers.copy()
+            except aiohttp.ClientResponseError as e:
+                self.logger.error(f"Error fetching {url}: {e}")
+                return None
+            except (aiohttp.ClientError, asyncio.TimeoutError, _RetryableStatus) as e:
+                if attempt == self.max_retries:
+                    self.logger.error(f"Error fetching {url} after {attempt + 1} attempts: {e!r}")
+                    return None
+                retry_after = getattr(e, 'retry_after', None)
+                delay = retry_after if retry_after is not None else \
+                    self.backoff * (2 ** attempt) * (0.5 + random.random())
+                self.logger.warning(f"Retrying {url} in {delay:.2f}s after {e!r}")
+                await asyncio.sleep(delay)
+        return None
+    
+    def parse_page(self, content: bytes, url: str) -> Tuple[List[Dict], List[str]]:
+        """Parse a fetched page into its FAQs and all its outgoing links (runs in a worker thread)"""
+        soup = BeautifulSoup(content, self.html_parser)
+        scan = PageScan(soup) if self.single_pass else None
+        return self.extract_faqs_from_page(soup, url, scan), self.get_all_links(soup, url, skip_visited=False, scan=scan)
+    
+    def update_changed_faqs(self, changed: List[Dict]):
+        """Replace the stored copy of FAQs whose answer changed since the last crawl"""
+        for faq in changed:
+            position = self.faq_index.get(faq_key(faq['question']))
+            if position is not None:
+                self.faqs[position] = faq
+    
+    async def crawl_all_pages_async(self):
+        """
+        Crawl the website with ``concurrency`` workers sharing one BFS frontier
+        
+        Pages are taken from the front of the queue and their links appended to the back, as in
+        a sequential BFS; with several workers, pages of one level may finish out of order.
+        Every page taken from the queue counts towards ``max_pages``, whether or not it loads.
+        URLs disallowed by robots.txt are skipped without counting.
         """
         self.logger.info(f"Starting comprehensive crawl of: {self.base_url}")
         
-        # Use BFS to crawl all pages
-        to_visit = deque([self.base_url])
-        pages_crawled = 0
-        total_new_faqs = 0
+        # Normalized like every discovered link, so a link back to the home page is recognized
+        self.frontier = self.new_frontier()
+        self.frontier.push(self.normalize_url(self.base_url))
+        progress = {'pages_crawled': 0, 'in_flight': 0, 'new_faqs': 0,
+                    'parsed': 0, 'not_modified': 0, 'unchanged': 0}
+        self.resume_from_log(progress)
+        pages_logged = progress['pages_crawled']
+        changed = asyncio.Condition()
         
-        while to_visit and pages_crawled < self.max_pages:
-            current_url = to_visit.popleft()
-            
-            if current_url in self.visited_urls:
-                continue
-            
-            self.visited_urls.add(current_url)
-            pages_crawled += 1
-            
-            self.logger.info(f"Crawling page {pages_crawled}/{self.max_pages}: {current_url}")
-            
-            # Get page content
-            soup = self.get_page_content(current_url)
-            if not soup:
-                continue
-            
-            # Extract FAQs from this page
-            page_faqs = self.extract_faqs_from_page(soup, current_url)
+        async def next_url() -> Optional[str]:
+            async with changed:
+                while True:
+                    if progress['pages_crawled'] >= self.max_pages:
+                        return None
+                    while len(self.frontier):
+                        url = self.frontier.pop()
+                        if not self.is_allowed(url):
+                            self.logger.info(f"Disallowed by robots.txt: {url}")
+                            self.frontier.done(url)
+                            continue
+                        progress['pages_crawled'] += 1
+                        progress['in_flight'] += 1
+                        self.logger.info(f"Crawling page {progress['pages_crawled']}/{self.max_pages}: {url}")
+                        return url
+                    if progress['in_flight'] == 0:
+                        return None  # nothing queued and no page left that could add links
+                    await changed.wait()
+        
+        async def worker(http: aiohttp.ClientSession):
+            nonlocal pages_logged
+            while True:
+                current_url = await next_url()
+                if current_url is None:
+                    return
+                links = []
+                try:
+                    links = await self.crawl_page(http, current_url, progress)
+                except Exception as e:
+                    self.logger.error(f"Error crawling {current_url}: {e}")
+                # Logged after the page's FAQs; a page cut short by cancellation is not logged at
+                # all, so a resumed crawl re-visits it instead of treating it as a page without links
+                self.sink.page_done(current_url, links)
+                self.frontier.done(current_url)
+                pages_logged += 1
+                if pages_logged % self.checkpoint_every == 0:
+                    self.checkpoint_frontier(pages_logged)
+                async with changed:
+                    progress['in_flight'] -= 1
+                    changed.notify_all()
+        
+        async with aiohttp.ClientSession(headers=self.headers, timeout=aiohttp.ClientTimeout(total=self.timeout)) as http:
+            await self.load_robots(http)
+            await asyncio.gather(*(worker(http) for _ in range(self.concurrency)))
+        
+        self.logger.info(f"Crawling completed!")
+        self.logger.info(f"Pages crawled: {progress['pages_crawled']}")
+        self.logger.info(f"Total FAQs: {len(self.faqs)}")
+        self.logger.info(f"New FAQs found: {progress['new_faqs']}")
+        if self.state is not None:
+            self.logger.info(f"Pages parsed: {progress['parsed']}, not modified (304): {progress['not_modified']}, "
+                             f"unchanged content: {progress['unchanged']}")
+            self.logger.info(f"FAQ changes: {len(self.changes['new'])} new, {len(self.changes['changed'])} changed, "
+                             f"{len(self.changes['removed'])} removed")
+        
+        # Compact the log into the JSON output; the log then starts empty for the next run,
+        # after the checkpoint that refers to it is gone
+        self.save_faqs()
+        self.discard_checkpoint()
+        self.sink.reset()
+        if self.changes_file:
+            with open(self.changes_file, 'w', encoding='utf-8') as f:
+                json.dump(self.changes, f, indent=2, ensure_ascii=False)
+    
+    async def crawl_page(self, http: aiohttp.ClientSession, current_url: str, progress: Dict) -> List[str]:
+        """
+        Fetch one page, log its new FAQs and queue its unvisited links; returns the page's links
+        
+        With a crawl-state store the request is conditional; a 304 or a body identical to the
+        last crawl skips parsing, and the links stored for the page are queued instead.
+        """
+        page = self.state.get(current_url) if self.state is not None else None
+        fetched = await self.fetch_page(http, current_url, CrawlStateStore.conditional_headers(page))
+        if not fetched:
+            return []
+        status, content, headers = fetched
+        etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+        content_hash = hashlib.sha256(content).hexdigest() if status != 304 else None
+        
+        if page is not None and (status == 304 or content_hash == page['content_hash']):
+            progress['not_modified' if status == 304 else 'unchanged'] += 1
+            self.state.touch(current_url, etag, last_modified)
+            new_links = page['links']
+        elif status == 304:
+            return []  # validators we did not send; nothing to parse
+        else:
+            # Parsing is CPU-bound, so it runs off the event loop
+            page_faqs, new_links = await asyncio.to_thread(self.parse_page, content, current_url)
+            progress['parsed'] += 1
             
+            added = []
             if page_faqs:
                 self.logger.info(f"Found {len(page_faqs)} FAQs on {current_url}")
-                
-                # Add new FAQs (avoid duplicates)
-                for faq in page_faqs:
-                    if not any(existing['question'].lower().strip() == faq['question'].lower().strip() 
-                             for existing in self.faqs):
-                        self.faqs.append(faq)
-                        total_new_faqs += 1
-                        self.logger.info(f"New FAQ: {faq['question'][:60]}...")
-                
-                # Save FAQs in real-time
-                self.save_faqs()
-            
-            # Get all links from this page for further crawling
-            new_links = self.get_all_links(soup, current_url)
+                added = self.add_page_faqs(page_faqs)
+                progress['new_faqs'] += len(added)
             
-            # Add new links to the queue
-            for link in new_links:
-                if link not in self.visited_urls:
-                    to_visit.append(link)
+            change_of = {}
+            if self.state is not None:
+                changes = self.state.changed_faqs(page_faqs, current_url)
+                self.changes['new'].extend(changes['new'])
+                self.changes['changed'].extend(changes['changed'])
+                self.update_changed_faqs(changes['changed'])
+                change_of = {faq_key(faq['question']): kind for kind in ('new', 'changed') for faq in changes[kind]}
+                faq_ids = [faq_key(faq['question']) for faq in page_faqs]
+                if page is not None:
+                    removed = sorted(set(page['faq_ids']) - set(faq_ids))
+                    self.changes['removed'].extend(removed)
+                    self.sink.removed(removed)
+                self.state.record_page(current_url, etag, last_modified, content_hash, faq_ids, new_links)
             
-            self.logger.info(f"Found {len(new_links)} new links. Queue size: {len(to_visit)}")
-            
-            # Be respectful - add delay between requests
-            time.sleep(1)
+            # Append only what changed to the crawl log, instead of rewriting the whole output file
+            added_keys = {faq_key(faq['question']) for faq in added}
+            for faq in page_faqs:
+                key = faq_key(faq['question'])
+                if key in added_keys or key in change_of:
+                    self.sink.add_faq(faq, key in added_keys, change_of.get(key))
         
-        self.logger.info(f"Crawling completed!")
-        self.logger.info(f"Pages crawled: {pages_crawled}")
-        self.logger.info(f"Total FAQs: {len(self.faqs)}")
-        self.logger.info(f"New FAQs found: {total_new_faqs}")
+        # Add new links to the queue; the frontier drops any queued before
+        queued = self.frontier.extend(new_links)
         
-        # Final save
-        self.save_faqs()
+        self.logger.info(f"Found {len(new_links)} links, {queued} new. Queue size: {len(self.frontier)}")
+        return new_links
+    
+    def crawl_all_pages(self):
+        """
+        Crawl all pages on the website and extract FAQs
+        """
+        asyncio.run(self.crawl_all_pages_async())
 
 def main():
     # Configuration
     BASE_URL = "https://jupiter.money"  # Replace with your target website
     OUTPUT_FILE = "faqs_2.json"
+    STATE_FILE = "crawl_state.sqlite3"  # Remembers validators and hashes between runs
+    CHANGES_FILE = "faqs_2.changes.json"  # FAQs new, changed or removed since the last run
     MAX_PAGES = 150  # Adjust as needed
+    CONCURRENCY = 8  # Pages fetched at once
+    REQUESTS_PER_SECOND = 4.0  # Per host; a robots.txt crawl-delay lowers it
     
     print("=== FAQ Website Crawler ===")
     print(f"Target: {BASE_URL}")
@@ -462,7 +897,9 @@ def main():
     print()
     
     # Initialize and run crawler
-    crawler = FAQCrawler(BASE_URL, OUTPUT_FILE, MAX_PAGES)
+    crawler = FAQCrawler(BASE_URL, OUTPUT_FILE, MAX_PAGES, concurrency=CONCURRENCY,
+                         requests_per_second=REQUESTS_PER_SECOND, state_file=STATE_FILE,
+                         changes_file=CHANGES_FILE)
     crawler.crawl_all_pages()
     
     print(f"\nCrawling completed! Check '{OUTPUT_FILE}' for results.")
@@ -8,6 +8,9 @@ from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 import json
 
+# Topic keywords for categorization live in lexical_index so serving code can share them
+from lexical_index import TOPIC_KEYWORDS
+
 # Download required NLTK data
 nltk.download('punkt')
 nltk.download('stopwords')
@@ -17,19 +20,6 @@ nltk.download('wordnet')
 lemmatizer = WordNetLemmatizer()
 stop_words = set(stopwords.words('english'))
 
-# Define topic keywords for categorization
-TOPIC_KEYWORDS = {
-    'KYC': ['kyc', 'know your customer', 'verification', 'identity', 'document', 'address proof'],
-    'Rewards': ['reward', 'cashback', 'points', 'benefit', 'offer', 'discount'],
-    'Payments': ['payment', 'transaction', 'pay', 'upi', 'transfer', 'bill'],
-    'Limits': ['limit', 'maximum', 'minimum', 'cap', 'threshold', 'restriction'],
-    'Card': ['card', 'credit card', 'debit card', 'edge+', 'rupay', 'visa', 'mastercard'],
-    'Fees': ['fee', 'charge', 'cost', 'pricing', 'annual fee', 'joining fee'],
-    'Account': ['account', 'balance', 'deposit', 'withdrawal', 'savings', 'current'],
-    'Security': ['security', 'fraud', 'protection', 'safe', 'authentication', 'otp'],
-    'General': ['general', 'other', 'miscellaneous', 'support', 'help', 'faq']
-}
-
 def clean_text(text):
     """Clean HTML and formatting noise from text."""
     # Remove HTML tags
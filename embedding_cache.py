@@ -0,0 +1,126 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import unicodedata
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for hashing: NFC, trimmed, with runs of whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def content_hash(text: str, metadata: Dict[str, Any]) -> str:
+    """Hash of everything stored for an index entry, so edits to the answer or category are detected too."""
+    parts = [normalize_text(text)] + [f"{key}={normalize_text(str(metadata[key]))}" for key in sorted(metadata)]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent store of embeddings keyed by (model name, normalized text hash).
+
+    Backed by a single SQLite file so it survives restarts and can be shared between the
+    Chroma and NumPy backends. Vectors are stored as raw float32 bytes.
+    """
+
+    def __init__(self, path: str, model_name: str):
+        self.path = path
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, hashes: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [self.model_name, *chunk]
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [(self.model_name, key, np.asarray(vector, dtype=np.float32).tobytes())
+                 for key, vector in items.items()]
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM embeddings WHERE model = ?", (self.model_name,)
+            ).fetchone()[0]
+
+
+class CachedEmbeddings:
+    """
+    LangChain-compatible embeddings wrapper that only encodes texts missing from the cache.
+
+    ``embed_documents`` is what index builds call, so a rebuild after a small FAQ edit only
+    runs the model on the edited entries. ``embed_query`` passes straight through: user
+    queries are too diverse to be worth persisting.
+    """
+
+    def __init__(self, base, cache: EmbeddingCache):
+        self.base = base
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes = [text_hash(text) for text in texts]
+        found = self.cache.get_many(list(set(hashes)))
+        missing: Dict[str, str] = {}
+        for key, text in zip(hashes, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        self.cache.hits += len(texts) - len(missing)
+        self.cache.misses += len(missing)
+
+        if missing:
+            logger.info(f"Embedding {len(missing)} uncached texts ({len(texts) - len(missing)} cache hits)")
+            vectors = self.base.embed_documents(list(missing.values()))
+            computed = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(missing, vectors)}
+            self.cache.put_many(computed)
+            found.update(computed)
+        return [found[key].tolist() for key in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.base.embed_query(text)
+
+    def __getattr__(self, name):
+        return getattr(self.base, name)
+
+
+def open_cached_embeddings(base, model_name: str, path: Optional[str]) -> Any:
+    """Wrap ``base`` with a persistent cache, or return it unchanged if caching is disabled."""
+    if not path:
+        return base
+    return CachedEmbeddings(base, EmbeddingCache(path, model_name))
@@ -1,4 +1,7 @@
-import json, os, time
+import argparse, json, os, threading, time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import google.generativeai as genai
 from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
@@ -10,25 +13,47 @@ with open("cleaned_faq.json", encoding="utf-8") as f:
 
 QUESTIONS = [item["question"] for item in faq]
 ANSWERS   = [item["answer"]   for item in faq]
-QUESTIONS = QUESTIONS[0:100]
-ANSWERS   = ANSWERS[0:100] 
 
 EMBED_MODEL = SentenceTransformer("all-MiniLM-L6-v2")
 load_dotenv()
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 GEMINI = genai.GenerativeModel("gemini-pro")
 
-QUESTION_EMB = EMBED_MODEL.encode(QUESTIONS, normalize_embeddings=True)   # (N, d)
-ANSWER_EMB   = EMBED_MODEL.encode(ANSWERS,   normalize_embeddings=True)   # (N, d)  # for later scoring
-
 # If you already have a Chroma DB with the questions embedded, plug it in here.
 # Otherwise we’ll fall back to plain cosine similarity search.
 CHROMA_DB = None               # ← inject your vector store instance if available
 TOP_K     = 1                  # always take the best hit
+ENCODE_BATCH_SIZE = 256
+SEARCH_CHUNK = 1024            # query rows per matrix product, bounds the (chunk, N) score matrix
+ENCODE_CACHE_SIZE = 20000      # most recently used strings kept encoded (~30 MB at 384 dims)
+_ENCODED  = OrderedDict()      # text -> normalized embedding, least recently used first
+
+
+def encode(texts, batch_size: int = ENCODE_BATCH_SIZE) -> np.ndarray:
+    """Normalized embeddings for texts, encoding only the distinct strings not recently seen."""
+    if not texts:
+        return np.zeros((0, EMBED_MODEL.get_sentence_embedding_dimension()), dtype=np.float32)
+    vectors = {}
+    for text in dict.fromkeys(texts):
+        if text in _ENCODED:
+            _ENCODED.move_to_end(text)
+            vectors[text] = _ENCODED[text]
+    missing = [text for text in dict.fromkeys(texts) if text not in vectors]
+    if missing:
+        vectors.update(zip(missing, EMBED_MODEL.encode(missing, batch_size=batch_size, normalize_embeddings=True)))
+        _ENCODED.update((text, vectors[text]) for text in missing)
+        while len(_ENCODED) > ENCODE_CACHE_SIZE:
+            _ENCODED.popitem(last=False)
+    return np.stack([vectors[text] for text in texts])
 
 
-def retrieve_with_chroma(query: str, top_k: int = 1):
-    """Return [(question, answer, similarity)] using Chroma or in-memory search."""
+def build_corpus(questions, answers):
+    """The searchable FAQ: (questions, answers, question embeddings of shape (N, d))."""
+    return questions, answers, encode(questions)
+
+
+def retrieve_with_chroma(query: str, corpus, top_k: int = 1):
+    """Return [(question, answer, similarity)] using Chroma or in-memory search over corpus."""
     if CHROMA_DB is not None:
         results = CHROMA_DB.similarity_search_with_score(query, k=top_k)
         hits = []
@@ -39,11 +64,37 @@ def retrieve_with_chroma(query: str, top_k: int = 1):
             hits.append((doc.page_content, doc.metadata["answer"], sim))
         return hits[:top_k]
 
-    # ─ fallback: cosine sim against QUESTION_EMB ─
+    # ─ fallback: cosine sim against the corpus question embeddings ─
+    questions, answers, question_emb = corpus
     q_vec = EMBED_MODEL.encode([query], normalize_embeddings=True)
-    sims  = cosine_similarity(q_vec, QUESTION_EMB)[0]          # (N,)
+    sims  = cosine_similarity(q_vec, question_emb)[0]          # (N,)
     best = sims.argsort()[::-1][:top_k]
-    return [(QUESTIONS[i], ANSWERS[i], sims[i]) for i in best]
+    return [(questions[i], answers[i], sims[i]) for i in best]
+
+
+def retrieve_batch(queries, query_emb: np.ndarray, corpus):
+    """Best hit (question, answer, similarity) per query, from already-encoded query vectors."""
+    if CHROMA_DB is not None:
+        hits = []
+        for query, vector in zip(queries, query_emb):
+            docs = CHROMA_DB.similarity_search_by_vector(vector.tolist(), k=TOP_K + 1)
+            docs = [doc for doc in docs if doc.page_content.strip().lower() != query.strip().lower()]
+            hits.append((docs[0].page_content, docs[0].metadata["answer"]) if docs else None)
+        matched = [hit for hit in hits if hit is not None]
+        sims = iter(row_similarity(
+            query_emb[[i for i, hit in enumerate(hits) if hit is not None]],
+            encode([question for question, _ in matched])
+        ))
+        return [(hit[0], hit[1], next(sims)) if hit is not None else None for hit in hits]
+
+    # ─ fallback: one (chunk, N) matrix product against the corpus per chunk of queries ─
+    questions, answers, question_emb = corpus
+    hits = []
+    for start in range(0, len(queries), SEARCH_CHUNK):
+        scores = query_emb[start:start + SEARCH_CHUNK] @ question_emb.T
+        best = scores.argmax(axis=1)
+        hits.extend((questions[i], answers[i], float(row[i])) for i, row in zip(best, scores))
+    return hits
 
 
 def evaluate_similarity(text_a: str, text_b: str) -> float:
@@ -52,6 +103,13 @@ def evaluate_similarity(text_a: str, text_b: str) -> float:
     return cosine_similarity(emb[0:1], emb[1:2])[0, 0]
 
 
+def row_similarity(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Cosine similarity of each row of a with the same row of b (both already normalized)."""
+    if not len(a):
+        return np.zeros(0, dtype=np.float32)
+    return np.einsum("ij,ij->i", a, b)
+
+
 def call_gemini(prompt: str) -> str:
     """Robust Gemini wrapper → plain text string."""
     try:
@@ -61,55 +119,171 @@ def call_gemini(prompt: str) -> str:
         print("Gemini error:", exc)
         return ""
 
-records = []
-
-for q, gt in zip(QUESTIONS, ANSWERS):
-    # ---------- Retrieval ----------
-    t0 = time.time()
-    hits = retrieve_with_chroma(q, top_k=TOP_K)
-    t1 = time.time()
-
-    if hits:
-        _, retrieved_answer, _ = hits[0]
-        retr_acc = evaluate_similarity(retrieved_answer, gt)
-    else:
-        retrieved_answer, retr_acc = "", 0.0
 
-    # ---------- LLM ----------
-    t2 = time.time()
-    llm_answer = call_gemini(
-        f"A user asked: “{q}”. "
+def llm_prompt(question: str) -> str:
+    return (
+        f"A user asked: “{question}”. "
         "Answer in a concise, friendly tone suited for banking FAQs."
     )
-    t3 = time.time()
 
-    llm_acc = evaluate_similarity(llm_answer, gt)
 
-    records.append(
+class RateLimiter:
+    """Token bucket shared by worker threads: at most ``rate`` calls per second, bursts up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def call_llm_batch(questions, concurrency: int, requests_per_minute: float):
+    """Gemini answers and per-call latencies, with at most ``concurrency`` calls in flight."""
+    limiter = RateLimiter(requests_per_minute / 60.0, burst=concurrency) if requests_per_minute > 0 else None
+
+    def timed_call(question):
+        if limiter is not None:
+            limiter.acquire()
+        t0 = time.time()
+        answer = call_gemini(llm_prompt(question))
+        return answer, time.time() - t0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed_call, questions))
+    return [answer for answer, _ in results], [latency for _, latency in results]
+
+
+def evaluate_sequential(questions, answers, corpus=None):
+    """
+    The original per-record loop: one retrieval, two similarity calls and one LLM call at a time.
+    Retrieval searches corpus (see build_corpus), by default the evaluated FAQ entries themselves.
+    """
+    corpus = corpus or build_corpus(questions, answers)
+    records = []
+
+    for q, gt in zip(questions, answers):
+        # ---------- Retrieval ----------
+        t0 = time.time()
+        hits = retrieve_with_chroma(q, corpus, top_k=TOP_K)
+        t1 = time.time()
+
+        if hits:
+            _, retrieved_answer, _ = hits[0]
+            retr_acc = evaluate_similarity(retrieved_answer, gt)
+        else:
+            retrieved_answer, retr_acc = "", 0.0
+
+        # ---------- LLM ----------
+        t2 = time.time()
+        llm_answer = call_gemini(llm_prompt(q))
+        t3 = time.time()
+
+        llm_acc = evaluate_similarity(llm_answer, gt)
+
+        records.append(
+            {
+                "question": q,
+                "ground_truth": gt,
+                "retrieved_answer": retrieved_answer,
+                "retrieval_similarity": retr_acc,
+                "retrieval_latency_sec": t1 - t0,
+                "llm_answer": llm_answer,
+                "llm_similarity": llm_acc,
+                "llm_latency_sec": t3 - t2,
+            }
+        )
+    return records
+
+
+def evaluate_batch(questions, answers, concurrency: int = 8, requests_per_minute: float = 0, corpus=None):
+    """
+    Same records as evaluate_sequential, computed in bulk: queries, retrieved answers, ground
+    truths and LLM answers are each encoded in large batches, similarities are row-wise dot
+    products of normalized matrices, and LLM calls run concurrently, rate limited only when
+    requests_per_minute is positive. Retrieval latency is the batch time divided by the
+    number of queries.
+    """
+    corpus = corpus or build_corpus(questions, answers)
+    t0 = time.time()
+    query_emb = encode(questions)
+    hits = retrieve_batch(questions, query_emb, corpus)
+    retrieval_latency = (time.time() - t0) / max(len(questions), 1)
+
+    # LLM calls wait on the network, so they overlap with encoding the retrieval side.
+    with ThreadPoolExecutor(max_workers=1) as llm_runner:
+        llm_future = llm_runner.submit(call_llm_batch, questions, concurrency, requests_per_minute)
+        retrieved_answers = [hit[1] if hit else "" for hit in hits]
+        gt_emb = encode(answers)
+        retr_acc = row_similarity(encode(retrieved_answers), gt_emb)
+        retr_acc[[i for i, hit in enumerate(hits) if not hit]] = 0.0
+        llm_answers, llm_latencies = llm_future.result()
+    llm_acc = row_similarity(encode(llm_answers), gt_emb)
+
+    return [
         {
             "question": q,
             "ground_truth": gt,
             "retrieved_answer": retrieved_answer,
-            "retrieval_similarity": retr_acc,
-            "retrieval_latency_sec": t1 - t0,
+            "retrieval_similarity": float(r_acc),
+            "retrieval_latency_sec": retrieval_latency,
             "llm_answer": llm_answer,
-            "llm_similarity": llm_acc,
-            "llm_latency_sec": t3 - t2,
+            "llm_similarity": float(l_acc),
+            "llm_latency_sec": llm_latency,
         }
-    )
+        for q, gt, retrieved_answer, r_acc, llm_answer, l_acc, llm_latency in zip(
+            questions, answers, retrieved_answers, retr_acc, llm_answers, llm_acc, llm_latencies
+        )
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare retrieval-based and LLM answers against the FAQ answers.")
+    parser.add_argument("--mode", choices=("batch", "sequential"), default="batch")
+    parser.add_argument("--limit", type=int, default=100, help="FAQ entries to evaluate (0 for all)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent LLM calls in batch mode")
+    parser.add_argument("--rpm", type=float, default=0,
+                        help="Cap on LLM requests per minute in batch mode, e.g. your Gemini quota (default: no cap)")
+    parser.add_argument("--output", default="faq_comparison_report.csv")
+    args = parser.parse_args()
+
+    questions = QUESTIONS[0:args.limit] if args.limit else QUESTIONS
+    answers   = ANSWERS[0:args.limit] if args.limit else ANSWERS
+    corpus = build_corpus(questions, answers)
+
+    started = time.time()
+    if args.mode == "batch":
+        records = evaluate_batch(questions, answers, args.concurrency, args.rpm, corpus=corpus)
+    else:
+        records = evaluate_sequential(questions, answers, corpus=corpus)
+    elapsed = time.time() - started
+
+    df = pd.DataFrame(records)
 
-df = pd.DataFrame(records)
+    # ──────────────────────────────────────────────────────────────────────────────
+    # 4. Aggregate metrics
+    # ──────────────────────────────────────────────────────────────────────────────
+    print(f"\n⏱️  Evaluated {len(df)} questions in {elapsed:.1f}s ({args.mode} mode)")
 
-# ──────────────────────────────────────────────────────────────────────────────
-# 4. Aggregate metrics
-# ──────────────────────────────────────────────────────────────────────────────
-print("\n📊 Retrieval-based:")
-print(f"  • Avg semantic similarity: {df['retrieval_similarity'].mean():.4f}")
-print(f"  • Avg latency:             {df['retrieval_latency_sec'].mean():.2f}s")
+    print("\n📊 Retrieval-based:")
+    print(f"  • Avg semantic similarity: {df['retrieval_similarity'].mean():.4f}")
+    print(f"  • Avg latency:             {df['retrieval_latency_sec'].mean():.2f}s")
 
-print("\n🤖 Gemini LLM:")
-print(f"  • Avg semantic similarity: {df['llm_similarity'].mean():.4f}")
-print(f"  • Avg latency:             {df['llm_latency_sec'].mean():.2f}s")
+    print("\n🤖 Gemini LLM:")
+    print(f"  • Avg semantic similarity: {df['llm_similarity'].mean():.4f}")
+    print(f"  • Avg latency:             {df['llm_latency_sec'].mean():.2f}s")
 
-df.to_csv("faq_comparison_report.csv", index=False)
-print("\n✅ Saved faq_comparison_report.csv")
+    df.to_csv(args.output, index=False)
+    print(f"\n✅ Saved {args.output}")
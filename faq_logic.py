@@ -1,8 +1,16 @@
+import asyncio
 import json
 import os
 import logging
-from typing import List, Dict, Any, Optional
-from langchain_community.vectorstores import Chroma
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Tuple
+import numpy as np
+from langchain_core.documents import Document
 from langchain_google_genai import GoogleGenerativeAI
 from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables import RunnableSequence
@@ -10,6 +18,13 @@ from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_core.output_parsers import StrOutputParser
 from sklearn.metrics.pairwise import cosine_similarity
 from dotenv import load_dotenv
+from vector_index import Batch, ChromaVectorIndex, NumpyVectorIndex, PassageIndex
+from embedding_cache import content_hash, open_cached_embeddings, text_hash
+from response_cache import ResponseCache
+from lexical_index import BM25Index, KeywordMatcher, NearExactIndex
+from query_router import CategoryRouter
+from reranker import CrossEncoderReranker
+from ingest import chunk_text, iter_sources, parse_sources
 
 
 load_dotenv()
@@ -17,51 +32,482 @@ os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 USE_ONNX = os.getenv("USE_ONNX", "false").lower() == "true"
+ONNX_QUANTIZE = os.getenv("ONNX_QUANTIZE", "false").lower() == "true"
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0")) or None
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR") or None
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache/embeddings.sqlite3")
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+ANSWER_MODE = os.getenv("ANSWER_MODE", "live").lower()
+PRECOMPUTED_MIN_SIMILARITY = float(os.getenv("PRECOMPUTED_MIN_SIMILARITY", "0.85"))
+INDEX_DIRS = {"chroma": "chroma_db", "numpy": "numpy_index"}
+KEYWORD_MATCH_THRESHOLD = 0.5
+NEAR_EXACT_THRESHOLD = float(os.getenv("NEAR_EXACT_THRESHOLD", "0.85"))
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "true").lower() == "true"
+RRF_K = 60
+QUERY_ROUTING = os.getenv("QUERY_ROUTING", "false").lower() == "true"
+ROUTER_MARGIN = float(os.getenv("ROUTER_MARGIN", "0.05"))
+# A hit below similarity_threshold still counts as confident when it contains this share of
+# the query's (idf-weighted) terms and its dense similarity is at least LEXICAL_MIN_SIMILARITY.
+LEXICAL_MIN_COVERAGE = float(os.getenv("LEXICAL_MIN_COVERAGE", "0.8"))
+LEXICAL_MIN_SIMILARITY = float(os.getenv("LEXICAL_MIN_SIMILARITY", "0.5"))
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+EMBED_BATCHING = os.getenv("EMBED_BATCHING", "false").lower() == "true"
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", "32"))
+EMBED_BATCH_MAX_WAIT_MS = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", "3"))
+PRECOMPUTED_ANSWERS_FILE = "rephrased_answers.json"
+# Additional corpora to index next to the FAQ file, e.g.
+# "community=help_Q&A.json,website=jupiter_website_data.json" (see ingest.py).
+EXTRA_SOURCES = os.getenv("EXTRA_SOURCES", "")
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+PASSAGE_RETRIEVAL = os.getenv("PASSAGE_RETRIEVAL", "false").lower() == "true"
+PASSAGE_AGGREGATION = os.getenv("PASSAGE_AGGREGATION", "max").lower()
+PASSAGE_MAX_WORDS = int(os.getenv("PASSAGE_MAX_WORDS", "100"))
+PASSAGE_OVERLAP = int(os.getenv("PASSAGE_OVERLAP", "25"))
+PASSAGE_INDEX_DIR = "passage_index"
+RERANKER = os.getenv("RERANKER", "false").lower() == "true"
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_TOP_K = int(os.getenv("RERANK_TOP_K", "8"))
+RERANK_THRESHOLD = float(os.getenv("RERANK_THRESHOLD", "0.5"))
+# Per-request latency budget, in milliseconds, that embedding, search and re-ranking must fit in.
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "150"))
+
+
+def _normalize(vector) -> np.ndarray:
+    vec = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm > 0 else vec
+
+
+class QueryContext:
+    """A user query and its embedding, computed once and shared by every stage of a request."""
+
+    def __init__(self, text: str, embedding: np.ndarray):
+        self.text = text
+        self.embedding = _normalize(embedding)
+
+    def similarity(self, other_embedding) -> float:
+        """Cosine similarity between the query and an already-computed embedding."""
+        return float(np.dot(self.embedding, _normalize(other_embedding)))
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching scheduler for query embeddings.
+
+    Concurrent callers submit single queries; a worker thread collects them for up to
+    ``max_wait_ms`` after the first arrives (or until ``max_batch_size`` are queued), encodes
+    them with one ``embed_documents`` call and resolves each caller's future with its vector.
+    MiniLM's batched matrix multiplies make one batch of N far cheaper than N single encodes.
+    """
+
+    def __init__(self, embedding_model, max_batch_size: int = 32, max_wait_ms: float = 3.0):
+        self.embedding_model = embedding_model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Optional[Tuple[str, Future, float]]]" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._batch_sizes: deque = deque(maxlen=10000)
+        self._queue_delays_ms: deque = deque(maxlen=10000)
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        future: Future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.submit(text).result()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embedding_model.embed_documents(texts)
+
+    def close(self):
+        self._queue.put(None)
+        self._worker.join(timeout=5)
+
+    def _collect(self, first: Tuple[str, Future, float]) -> Tuple[List[Tuple[str, Future, float]], bool]:
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stop = self._collect(first)
+            started = time.perf_counter()
+            try:
+                vectors = self.embedding_model.embed_documents([text for text, _, _ in batch])
+                for (_, future, _), vector in zip(batch, vectors):
+                    future.set_result(vector)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+            with self._stats_lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._batch_sizes.append(len(batch))
+                self._queue_delays_ms.extend((started - enqueued) * 1000 for _, _, enqueued in batch)
+            if stop:
+                return
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            sizes = np.asarray(self._batch_sizes) if self._batch_sizes else np.zeros(1)
+            delays = np.asarray(self._queue_delays_ms) if self._queue_delays_ms else np.zeros(1)
+            return {
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch_size": float(sizes.mean()),
+                "max_batch_size": int(sizes.max()),
+                "queue_delay_p50_ms": float(np.percentile(delays, 50)),
+                "queue_delay_p95_ms": float(np.percentile(delays, 95)),
+                "pending": self._queue.qsize(),
+            }
+
+
+class RetrievalHit:
+    """
+    One retrieved FAQ entry with its stored embedding and similarity to the query.
+
+    ``score`` is the dense cosine similarity (times the entry's source weight); with passage
+    retrieval it is the better of the question's and the best answer passage's similarity.
+    With hybrid retrieval the hit also carries its BM25 score and term coverage, and
+    ``fused_score`` is its reciprocal-rank-fusion score.
+    """
+
+    def __init__(self, question: str, metadata: Dict[str, Any], embedding: np.ndarray, score: float):
+        self.question = question
+        self.metadata = metadata
+        self.embedding = embedding
+        self.score = score
+        self.lexical_score = 0.0
+        self.lexical_coverage = 0.0
+        self.fused_score = 0.0
+        self.passage_score = 0.0
+        self.rerank_score: Optional[float] = None
+        # Best-matching answer passage, set when it matched the query better than the question did.
+        self.passage: Optional[str] = None
+
+    @property
+    def answer(self) -> str:
+        return self.metadata.get('answer', '')
+
+    @property
+    def category(self) -> str:
+        return self.metadata.get('category', 'General')
+
+    @property
+    def faq_id(self) -> Optional[str]:
+        return self.metadata.get('faq_id')
+
+    @classmethod
+    def from_stored(cls, doc: Document, embedding: np.ndarray, context: QueryContext) -> "RetrievalHit":
+        """Hit for a stored entry, scored as its similarity to the query times its source weight."""
+        weight = float(doc.metadata.get('weight', 1.0))
+        return cls(doc.page_content, doc.metadata, embedding, context.similarity(embedding) * weight)
+
+
+class RetrievalResult:
+    """Top-N hits for one query; the answer, threshold decision and related list all derive from it."""
+
+    def __init__(self, context: QueryContext, hits: List[RetrievalHit], similarity_threshold: float):
+        self.context = context
+        self.hits = hits
+        self.similarity_threshold = similarity_threshold
+        # Set by FAQBot.rerank; once set, the cross-encoder score alone decides relevance.
+        self.rerank_threshold: Optional[float] = None
+
+    def apply_rerank(self, scores: List[float], threshold: float):
+        """Order the first len(scores) hits by cross-encoder score, ahead of the rest."""
+        head, tail = self.hits[:len(scores)], self.hits[len(scores):]
+        for hit, score in zip(head, scores):
+            hit.rerank_score = score
+        head.sort(key=lambda hit: hit.rerank_score, reverse=True)
+        self.hits = head + tail
+        self.rerank_threshold = threshold
+
+    def _confident(self, hit: RetrievalHit) -> bool:
+        if self.rerank_threshold is not None:
+            return hit.rerank_score is not None and hit.rerank_score >= self.rerank_threshold
+        if hit.score >= self.similarity_threshold:
+            return True
+        return hit.lexical_coverage >= LEXICAL_MIN_COVERAGE and hit.score >= LEXICAL_MIN_SIMILARITY
+
+    @property
+    def best(self) -> Optional[RetrievalHit]:
+        """Highest-ranked confident hit, or the top hit if none is confident."""
+        for hit in self.hits:
+            if self._confident(hit):
+                return hit
+        return self.hits[0] if self.hits else None
+
+    @property
+    def is_confident(self) -> bool:
+        return self.best is not None and self._confident(self.best)
+
+    def related(self, top_k: int = 3, min_score: float = 0.4) -> List[Dict]:
+        query = self.context.text.strip().lower()
+        related = []
+        for hit in self.hits:
+            if hit.question.strip().lower() == query:
+                continue
+            if hit.score >= min_score:
+                related.append({
+                    "question": hit.question,
+                    "score": hit.score,
+                    "category": hit.category
+                })
+            if len(related) >= top_k:
+                break
+        return related
+
+
+class PendingAnswer:
+    """A confident retrieval hit whose response still has to be generated by the LLM."""
+
+    def __init__(self, question: str, hit: RetrievalHit, context: QueryContext,
+                 categories: Optional[List[str]] = None):
+        self.question = question
+        self.hit = hit
+        self.context = context
+        self.categories = categories
+
+    @property
+    def inputs(self) -> Dict[str, str]:
+        return {
+            "question": self.question,
+            "answer": self.hit.passage or self.hit.answer,
+            "category": self.hit.category
+        }
 
 
 class FAQBot:
-    def __init__(self, faq_file_path: str = 'cleaned_faq.json', similarity_threshold: float = 0.7):
+    def __init__(self, faq_file_path: str = 'cleaned_faq.json', similarity_threshold: float = 0.7,
+                 related_top_k: int = 3, vector_backend: Optional[str] = None,
+                 response_cache: Optional[ResponseCache] = None, llm=None,
+                 answer_mode: Optional[str] = None,
+                 precomputed_min_similarity: float = PRECOMPUTED_MIN_SIMILARITY, lazy: bool = False,
+                 hybrid: Optional[bool] = None, extra_sources: Optional[List[Tuple[str, str]]] = None,
+                 passages: Optional[bool] = None, reranker=None):
         self.similarity_threshold = similarity_threshold
+        self.related_top_k = related_top_k
+        self.vector_backend = (vector_backend or VECTOR_BACKEND).lower()
+        self.index_dir = INDEX_DIRS.get(self.vector_backend, f"{self.vector_backend}_index")
+        self.response_cache = response_cache or self._initialize_response_cache()
+        # "live" rephrases every answer with the LLM; "precomputed" serves the offline
+        # rephrasing for confident hits and only calls the LLM in the gray zone between
+        # similarity_threshold and precomputed_min_similarity.
+        self.answer_mode = (answer_mode or ANSWER_MODE).lower()
+        self.precomputed_min_similarity = precomputed_min_similarity
+        self.hybrid = HYBRID_RETRIEVAL if hybrid is None else hybrid
+        self.passage_retrieval = PASSAGE_RETRIEVAL if passages is None else passages
+        self._reranker_override = reranker
+        self._cpu_executor: Optional[ThreadPoolExecutor] = None
+        self._cpu_executor_lock = threading.Lock()
+        self._llm_override = llm
+        self.embedding_model = None
+        self.index_embeddings = None
+        self.embedding_batcher = None
+        self.vector_index = None
+        self.router: Optional[CategoryRouter] = None
+        self.passage_index: Optional[PassageIndex] = None
+        self.reranker: Optional[CrossEncoderReranker] = None
+        self.precomputed_answers: Dict[str, Dict[str, str]] = {}
+        self.llm = None
+        self.chain = None
+        self.load_error: Optional[str] = None
+        self._load_thread: Optional[threading.Thread] = None
+        self.readiness = {"data": False, "llm": False, "embeddings": False, "index": False}
+
         logger.info("Loading FAQ data...")
-        self.faq_data = self._load_faq_data(faq_file_path)
-        logger.info("Initializing embeddings...")
-        self.embedding_model = self._initialize_embeddings()
-        logger.info("Initializing Chroma DB...")
-        self.chroma_db = self._initialize_chroma_db()
-        logger.info("Chroma DB initialized.")
-        logger.info("Initializing LLM...")
-        self.llm = self._initialize_llm()
-        logger.info("LLM initialized.")
-        logger.info("Creating chain...")
-        self.chain = self._create_chain()
-        logger.info("FAQBot initialized successfully.")
-
-    def _load_faq_data(self, file_path: str) -> List[Dict]:
+        self.sources = [("faq", faq_file_path)] + list(
+            extra_sources if extra_sources is not None else parse_sources(EXTRA_SOURCES)
+        )
+        self._ingest()
+        self._related_by_faq: Dict[str, List[Dict]] = {}
+        self.fast_path_hits = {"exact": 0, "near_exact": 0}
+        self.readiness["data"] = True
+        if not lazy:
+            self._load_components()
+
+    def _load_components(self):
+        """
+        Load the heavy components in dependency order, marking each ready as it finishes.
+
+        The LLM loads last and on its own: if it fails, retrieval still serves confident hits
+        with the stored FAQ answer and the bot reports itself degraded rather than failed.
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            logger.info(f"Loaded {len(data)} FAQ items from {file_path}")
-            return data
-        except FileNotFoundError:
-            logger.error(f"FAQ file not found: {file_path}")
-            return []
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in FAQ file: {e}")
-            return []
+            logger.info("Initializing embeddings...")
+            self.embedding_model = self._initialize_embeddings()
+            self.index_embeddings = open_cached_embeddings(
+                self.embedding_model, self._embedding_model_key(), EMBEDDING_CACHE_PATH
+            )
+            self.embedding_batcher = (
+                EmbeddingBatcher(self.embedding_model, EMBED_BATCH_MAX_SIZE, EMBED_BATCH_MAX_WAIT_MS)
+                if EMBED_BATCHING else None
+            )
+            self.readiness["embeddings"] = True
+
+            logger.info(f"Initializing {self.vector_backend} vector index...")
+            self.precomputed_answers = self._load_precomputed_answers()
+            self.vector_index = self._initialize_vector_index()
+            if QUERY_ROUTING and self.vector_index is not None:
+                self.router = CategoryRouter.from_vectors(*self.vector_index.vectors(), margin=ROUTER_MARGIN)
+                logger.info(f"Query router fitted over {len(self.router.categories)} category partitions.")
+            if self.passage_retrieval and self.vector_index is not None:
+                self.passage_index = self._initialize_passage_index()
+            self.reranker = self._reranker_override or (self._initialize_reranker() if RERANKER else None)
+            self.readiness["index"] = self.vector_index is not None
+            logger.info("Vector index initialized.")
         except Exception as e:
-            logger.error(f"Unexpected error loading FAQ data: {e}")
-            return []
+            self.load_error = str(e)
+            logger.error(f"FAQBot initialization failed: {e}", exc_info=True)
+            raise
+
+        try:
+            logger.info("Initializing LLM...")
+            self.llm = self._llm_override if self._llm_override is not None else self._initialize_llm()
+            logger.info("LLM initialized.")
+            logger.info("Creating chain...")
+            self.chain = self._create_chain()
+            self.readiness["llm"] = True
+            logger.info("FAQBot initialized successfully.")
+        except Exception as e:
+            self.llm = self.chain = None
+            self.load_error = f"LLM unavailable: {e}"
+            logger.error(f"LLM initialization failed, serving stored FAQ answers only: {e}", exc_info=True)
+
+    def start_background_load(self) -> threading.Thread:
+        """Load the heavy components on a daemon thread so the web server can bind immediately."""
+        if self._load_thread is None:
+            def load():
+                try:
+                    self._load_components()
+                except Exception:
+                    pass  # already logged; reported through load_error / get_readiness()
+
+            self._load_thread = threading.Thread(target=load, name="faqbot-loader", daemon=True)
+            self._load_thread.start()
+        return self._load_thread
+
+    @property
+    def is_ready(self) -> bool:
+        return all(self.readiness.values())
+
+    def get_readiness(self) -> Dict[str, Any]:
+        if self.is_ready:
+            status = "ready"
+        elif self.load_error and all(ready for name, ready in self.readiness.items() if name != "llm"):
+            status = "degraded"
+        elif self.load_error:
+            status = "failed"
+        else:
+            status = "loading"
+        return {"status": status, "components": dict(self.readiness), "error": self.load_error}
+
+    def keyword_answer(self, user_question: str) -> Dict[str, Any]:
+        """Degraded answer from keyword overlap alone, used until the vector index is ready."""
+        matches = self.keyword_matcher.search(user_question, k=self.related_top_k + 1)
+        related = [
+            {"question": self.faq_records[faq_id][0], "score": score,
+             "category": self.faq_records[faq_id][1]["category"]}
+            for faq_id, score in matches
+        ]
+        if matches and matches[0][1] >= KEYWORD_MATCH_THRESHOLD:
+            faq_id, score = matches[0]
+            metadata = self.faq_records[faq_id][1]
+            return {
+                "response": metadata["answer"],
+                "related_questions": related[1:],
+                "similarity_score": score,
+                "source": "keyword_match",
+                "category": metadata["category"],
+                "degraded": True
+            }
+        return {
+            "response": "I'm still warming up and couldn't find a close match yet. "
+                        "Please try again in a moment or check the Jupiter Help Centre.",
+            "related_questions": related,
+            "similarity_score": 0.0,
+            "source": "fallback",
+            "degraded": True
+        }
+
+    def _iter_entries(self) -> Iterator[Dict[str, Any]]:
+        """Normalized entries of every source, streamed; a source that fails to parse is logged and cut short."""
+        for source_type, path in self.sources:
+            try:
+                yield from iter_sources([(source_type, path)])
+            except (json.JSONDecodeError, ValueError) as e:
+                logger.error(f"Invalid JSON in {path}: {e}")
+            except Exception as e:
+                logger.error(f"Unexpected error loading {path}: {e}")
+
+    def _ingest(self):
+        """
+        Stream every source once into the structures served before the vector index is ready.
 
-    def _initialize_embeddings(self):
+        Only ``faq_records`` (question and index metadata per entry) outlives the pass: raw
+        entries, such as the full text of website pages, are dropped as soon as they are read,
+        and the vector index is later fed from ``faq_records`` in batches (see _index_batches).
+        """
+        self.faq_records: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self.keyword_matcher = KeywordMatcher()
+        normalized: Dict[str, str] = {}
+        for item in self._iter_entries():
+            record = self._index_record(item)
+            if record is None:
+                continue
+            faq_id, question, metadata = record
+            if faq_id in self.faq_records:
+                logger.warning(f"Skipping duplicate FAQ question: {question[:60]}")
+                continue
+            self.faq_records[faq_id] = (question, metadata)
+            self.keyword_matcher.add(question, item.get('normalized_question', ''), faq_id)
+            if self.hybrid and item.get('normalized_question'):
+                normalized[faq_id] = item['normalized_question']
+        logger.info(f"Loaded {len(self.faq_records)} entries from {len(self.sources)} source(s)")
+
+        ids, questions, metadatas = self._index_records()
+        self.categories = sorted({metadata["category"] for metadata in metadatas})
+        self.near_exact_index = NearExactIndex(ids, questions, NEAR_EXACT_THRESHOLD)
+        self.lexical_index = self._build_lexical_index(normalized) if self.hybrid else None
+
+    @staticmethod
+    def _initialize_embeddings():
         try:
             if USE_ONNX:
-                from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
-                logger.info("Using ONNX embedding model.")
-                return ONNXMiniLM_L6_V2()
+                from onnx_embeddings import OnnxEmbeddings
+                logger.info("Using ONNX Runtime embedding model.")
+                return OnnxEmbeddings(
+                    model_name=EMBEDDING_MODEL,
+                    model_dir=ONNX_MODEL_DIR,
+                    quantize=ONNX_QUANTIZE,
+                    intra_op_threads=ONNX_INTRA_OP_THREADS
+                )
             else:
                 logger.info("Using HuggingFace embedding model.")
                 return HuggingFaceEmbeddings(
-                    model_name="sentence-transformers/all-MiniLM-L6-v2",
+                    model_name=EMBEDDING_MODEL,
                     model_kwargs={'device': 'cpu'},
                     encode_kwargs={'normalize_embeddings': True}
                 )
@@ -69,50 +515,235 @@ class FAQBot:
             logger.error(f"Failed to initialize embeddings: {e}")
             raise
 
-    def _initialize_chroma_db(self) -> Optional[Chroma]:
-        persist_dir = "chroma_db"
-        if not self.faq_data:
+    @staticmethod
+    def _initialize_reranker() -> Optional[CrossEncoderReranker]:
+        """The optional re-ranking stage; if the model cannot be loaded the bot serves without it."""
+        try:
+            logger.info(f"Loading cross-encoder re-ranker {RERANKER_MODEL}...")
+            reranker = CrossEncoderReranker(RERANKER_MODEL)
+            reranker.warm_up()
+            return reranker
+        except Exception as e:
+            logger.error(f"Failed to load re-ranker, continuing without it: {e}")
+            return None
+
+    @staticmethod
+    def _initialize_response_cache() -> Optional[ResponseCache]:
+        if RESPONSE_CACHE_SIZE <= 0:
+            logger.info("Response cache disabled.")
+            return None
+        return ResponseCache(
+            max_size=RESPONSE_CACHE_SIZE,
+            ttl_seconds=RESPONSE_CACHE_TTL,
+            semantic_threshold=SEMANTIC_CACHE_THRESHOLD
+        )
+
+    @staticmethod
+    def _embedding_model_key() -> str:
+        """
+        Identifies the model in embedding cache keys and in the persisted indexes, so switching
+        models (or engines) never reuses stale vectors: a mismatched index is rebuilt.
+        """
+        if USE_ONNX:
+            return f"onnx-int8:{EMBEDDING_MODEL}" if ONNX_QUANTIZE else f"onnx:{EMBEDDING_MODEL}"
+        return f"hf:{EMBEDDING_MODEL}"
+
+    @staticmethod
+    def _index_record(item: Dict[str, Any]) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        """Stable id, question text and index metadata of one entry, or None if it has no question."""
+        question = item.get('question')
+        if not question:
+            return None
+        faq_id = text_hash(question)[:16]
+        metadata = {
+            "faq_id": faq_id,
+            "answer": item.get('answer', ''),
+            "source_url": item.get('source_url', ''),
+            "category": item.get('category', 'General')
+        }
+        if item.get('source_type', 'faq') != 'faq':
+            # Only non-FAQ entries carry these, so official FAQ hashes stay unchanged.
+            metadata["source_type"] = item['source_type']
+            metadata["weight"] = float(item.get('weight', 1.0))
+        metadata["content_hash"] = content_hash(question, metadata)
+        return faq_id, question, metadata
+
+    def _index_records(self) -> Batch:
+        """Stable ids, question texts and metadata for every indexed entry."""
+        return (list(self.faq_records), [question for question, _ in self.faq_records.values()],
+                [metadata for _, metadata in self.faq_records.values()])
+
+    def _index_batches(self) -> Iterator[Batch]:
+        """The indexed entries in batches of INGEST_BATCH_SIZE, for building or syncing a vector index."""
+        records = iter(self.faq_records.items())
+        while True:
+            batch = list(islice(records, INGEST_BATCH_SIZE))
+            if not batch:
+                return
+            yield ([faq_id for faq_id, _ in batch], [question for _, (question, _) in batch],
+                   [metadata for _, (_, metadata) in batch])
+
+    def parse_categories(self, value) -> Optional[List[str]]:
+        """
+        Validate a category filter from a request payload: a category name or a list of them.
+
+        Matching is case-insensitive; returns the canonical names, or None for an empty filter.
+        Raises ValueError for unknown categories.
+        """
+        if value is None or value == "" or value == []:
+            return None
+        names = [value] if isinstance(value, str) else list(value)
+        known = {category.lower(): category for category in self.categories}
+        unknown = [name for name in names if str(name).strip().lower() not in known]
+        if unknown:
+            raise ValueError(f"Unknown category: {', '.join(map(str, unknown))}. "
+                             f"Expected one of: {', '.join(self.categories)}")
+        return list(dict.fromkeys(known[str(name).strip().lower()] for name in names))
+
+    def _build_lexical_index(self, normalized: Optional[Dict[str, str]] = None) -> BM25Index:
+        """
+        BM25 index over question, normalized_question and answer, keyed by the same ids as the vector index.
+
+        ``normalized`` maps faq_id to normalized_question; faq_records does not keep it, so
+        without it the sources are streamed again.
+        """
+        start = time.perf_counter()
+        if normalized is None:
+            normalized = {}
+            for item in self._iter_entries():
+                if item.get('question') and item.get('normalized_question'):
+                    normalized.setdefault(text_hash(item['question'])[:16], item['normalized_question'])
+        index = BM25Index(list(self.faq_records), [
+            {"question": question, "normalized_question": normalized.get(faq_id, ''), "answer": metadata["answer"]}
+            for faq_id, (question, metadata) in self.faq_records.items()
+        ])
+        logger.info(f"Built BM25 index over {len(index)} FAQs with {len(index.postings)} terms "
+                    f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return index
+
+    def _initialize_vector_index(self):
+        if self.vector_backend == "numpy":
+            return self._initialize_numpy_index()
+        if self.vector_backend == "chroma":
+            return self._initialize_chroma_db()
+        raise ValueError(f"Unknown vector backend: {self.vector_backend!r} (expected 'chroma' or 'numpy')")
+
+    def _initialize_chroma_db(self) -> Optional[ChromaVectorIndex]:
+        persist_dir = self.index_dir
+        if not self.faq_records:
             logger.warning("No FAQ data available to create Chroma DB")
             return None
 
         try:
-            # Explicitly pass the embedding_function when loading existing DB
-            if os.path.exists(persist_dir) and os.listdir(persist_dir):
-                logger.info("Existing Chroma DB found, loading from disk...")
-                return Chroma(
-                    collection_name="faq_collection",
-                    embedding_function=self.embedding_model,  # <-- important
-                    persist_directory=persist_dir
-                )
+            # The collection is diffed against the FAQ file on every start, so edits to
+            # cleaned_faq.json are picked up without deleting chroma_db/.
+            index = ChromaVectorIndex.load(self.embedding_model, persist_dir)
+            changes = index.sync_batches(self._index_batches(), self.index_embeddings,
+                                         model_key=self._embedding_model_key())
+            logger.info(f"Chroma DB synced with {len(self.faq_records)} documents: {changes}")
+            return index
+        except Exception as e:
+            logger.error(f"Failed to initialize Chroma DB: {e}", exc_info=True)
+            raise
+
+    def _initialize_numpy_index(self) -> Optional[NumpyVectorIndex]:
+        persist_dir = self.index_dir
+        if not self.faq_records:
+            logger.warning("No FAQ data available to create NumPy index")
+            return None
+
+        try:
+            model_key = self._embedding_model_key()
+            if NumpyVectorIndex.exists(persist_dir):
+                index = NumpyVectorIndex.load(persist_dir)
+                ids, _, metadatas = self._index_records()
+                if index.matches(ids, metadatas, model_key):
+                    logger.info("Existing NumPy index is up to date, memory-mapped from disk.")
+                    return index
+                if index.model_key != model_key:
+                    logger.warning(f"NumPy index was built with embedding model {index.model_key!r}, "
+                                   f"rebuilding it for {model_key!r}")
+                else:
+                    logger.info("FAQ data changed since the NumPy index was built, rebuilding from the embedding cache...")
+
+            index = NumpyVectorIndex.from_batches(self._index_batches(), len(self.faq_records),
+                                                  self.index_embeddings, model_key)
+            index.save(persist_dir)
+            logger.info(f"NumPy index initialized successfully with {len(index)} documents")
+            return index
+        except Exception as e:
+            logger.error(f"Failed to initialize NumPy index: {e}", exc_info=True)
+            raise
 
-            texts = [item.get('question', '') for item in self.faq_data if item.get('question')]
-            metadatas = [
-                {
-                    "answer": item.get('answer', ''),
-                    "source_url": item.get('source_url', ''),
-                    "category": item.get('category', 'General')
-                }
-                for item in self.faq_data if item.get('question')
-            ]
+    def _passage_records(self) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+        """Overlapping answer passages of every indexed entry, each pointing at its parent faq_id."""
+        ids, texts, metadatas = [], [], []
+        chunked = set()
+        # Website pages keep their full text in "content", which faq_records does not hold
+        # (their answer is truncated), so the sources are streamed again.
+        for item in self._iter_entries():
+            faq_id = text_hash(item['question'])[:16] if item.get('question') else None
+            if faq_id not in self.faq_records or faq_id in chunked:
+                continue
+            chunked.add(faq_id)
+            text = item.get('content') or self.faq_records[faq_id][1]["answer"]
+            for n, passage in enumerate(chunk_text(text, PASSAGE_MAX_WORDS, PASSAGE_OVERLAP)):
+                ids.append(f"{faq_id}:{n}")
+                texts.append(passage)
+                metadatas.append({"parent_id": faq_id, "content_hash": text_hash(passage)})
+        return ids, texts, metadatas
 
+    def _initialize_passage_index(self) -> Optional[PassageIndex]:
+        try:
+            ids, texts, metadatas = self._passage_records()
             if not texts:
-                logger.error("No valid questions found in FAQ data")
+                logger.warning("No answer text available to build the passage index")
                 return None
-
-            db = Chroma.from_texts(
-                texts=texts,
-                embedding=self.embedding_model,
-                metadatas=metadatas,
-                collection_name="faq_collection",
-                persist_directory=persist_dir
-            )
-            db.persist()
-            logger.info(f"Chroma DB initialized successfully with {len(texts)} documents")
-            return db
+            model_key = self._embedding_model_key()
+            if NumpyVectorIndex.exists(PASSAGE_INDEX_DIR):
+                index = NumpyVectorIndex.load(PASSAGE_INDEX_DIR)
+                if index.matches(ids, metadatas, model_key):
+                    logger.info(f"Existing passage index with {len(index)} passages is up to date.")
+                    return PassageIndex(index)
+                if index.model_key != model_key:
+                    logger.warning(f"Passage index was built with embedding model {index.model_key!r}, "
+                                   f"rebuilding it for {model_key!r}")
+            index = NumpyVectorIndex.from_texts(texts, metadatas, self.index_embeddings, ids=ids,
+                                                batch_size=INGEST_BATCH_SIZE, model_key=model_key)
+            index.save(PASSAGE_INDEX_DIR)
+            logger.info(f"Passage index built with {len(texts)} passages")
+            return PassageIndex(index)
         except Exception as e:
-            logger.error(f"Failed to initialize Chroma DB: {e}", exc_info=True)
+            logger.error(f"Failed to initialize passage index: {e}", exc_info=True)
             raise
 
+    @property
+    def precomputed_answers_path(self) -> str:
+        return os.path.join(self.index_dir, PRECOMPUTED_ANSWERS_FILE)
+
+    def _load_precomputed_answers(self) -> Dict[str, Dict[str, str]]:
+        """Offline rephrasings keyed by faq_id, as written by precompute_answers.py."""
+        if self.answer_mode != "precomputed":
+            return {}
+        try:
+            with open(self.precomputed_answers_path, 'r', encoding='utf-8') as f:
+                answers = json.load(f)
+            logger.info(f"Loaded {len(answers)} precomputed answers from {self.precomputed_answers_path}")
+            return answers
+        except FileNotFoundError:
+            logger.warning(f"No precomputed answers at {self.precomputed_answers_path}; "
+                           "run precompute_answers.py. Falling back to live LLM calls.")
+            return {}
+        except Exception as e:
+            logger.error(f"Error loading precomputed answers: {e}")
+            return {}
+
+    def get_precomputed_answer(self, hit: RetrievalHit) -> Optional[str]:
+        """The offline rephrasing for a hit, unless the FAQ entry changed after it was generated."""
+        entry = self.precomputed_answers.get(hit.faq_id or "")
+        if entry and entry.get("content_hash") == hit.metadata.get("content_hash"):
+            return entry.get("response")
+        return None
 
     def _initialize_llm(self) -> GoogleGenerativeAI:
         api_key = os.getenv("GOOGLE_API_KEY")
@@ -153,87 +784,275 @@ Response:  For general convo like 'hi' or 'how are you', respond with a friendly
         )
         return RunnableSequence(prompt_template | self.llm | StrOutputParser())
 
+    def _embed_query(self, text: str) -> np.ndarray:
+        embedder = self.embedding_batcher or self.embedding_model
+        return _normalize(embedder.embed_query(text))
+
+    def create_query_context(self, query: str) -> QueryContext:
+        return QueryContext(query, self._embed_query(query))
+
+    async def acreate_query_context(self, query: str) -> QueryContext:
+        """Embed a query without holding a CPU-executor thread while it waits for its batch."""
+        if self.embedding_batcher is not None:
+            vector = await asyncio.wrap_future(self.embedding_batcher.submit(query))
+        else:
+            vector = await asyncio.get_running_loop().run_in_executor(
+                self.cpu_executor, self.embedding_model.embed_query, query
+            )
+        return QueryContext(query, vector)
+
+    def _search_by_vector(self, context: QueryContext, k: int,
+                          categories: Optional[List[str]] = None) -> List[Tuple[Document, np.ndarray]]:
+        """Nearest stored questions for an embedded query, returned with their stored embeddings."""
+        return self.vector_index.search(context.embedding, k, categories=categories)
+
+    def _dense_hits(self, context: QueryContext, k: int, categories: Optional[List[str]]) -> List[RetrievalHit]:
+        hits = [
+            RetrievalHit.from_stored(doc, embedding, context)
+            for doc, embedding in self._search_by_vector(context, k, categories=categories)
+        ]
+        hits.sort(key=lambda hit: hit.score, reverse=True)
+        return hits
+
     def evaluate_similarity(self, query: str, retrieved_question: str) -> float:
         try:
-            q_emb = self.embedding_model.embed_query(query)
-            r_emb = self.embedding_model.embed_query(retrieved_question)
+            q_emb, r_emb = self.embedding_model.embed_documents([query, retrieved_question])
             return float(cosine_similarity([q_emb], [r_emb])[0][0])
         except Exception as e:
             logger.error(f"Error calculating similarity: {e}")
             return 0.0
 
+    def _add_stored_hits(self, hits: Dict[str, RetrievalHit], faq_ids: List[str], context: QueryContext):
+        """Fetch entries that only a non-dense ranking found, so they too carry a stored embedding and score."""
+        missing = [faq_id for faq_id in faq_ids if faq_id not in hits]
+        for doc, embedding in (self.vector_index.get(missing) if missing else []):
+            hit = RetrievalHit.from_stored(doc, embedding, context)
+            hits[hit.faq_id] = hit
+
+    def retrieve(self, query: str, top_n: Optional[int] = None,
+                 context: Optional[QueryContext] = None,
+                 categories: Optional[List[str]] = None) -> RetrievalResult:
+        """
+        Run the single vector-store round trip for a query and score every hit against it.
+
+        With hybrid retrieval the BM25 top-n is fused in by reciprocal rank fusion; lexical
+        hits the dense search missed are fetched from the index by id, so every hit still has
+        its stored embedding and a dense score.
+
+        ``categories`` restricts every hit to those categories. Without it, the query router
+        (if enabled) may restrict the dense search to one or two partitions; when the routed
+        search finds nothing above the similarity threshold, it is repeated globally.
+        """
+        context = context or self.create_query_context(query)
+        top_n = top_n or self.related_top_k + 4
+        hits: Dict[str, RetrievalHit] = {}
+        if categories:
+            dense = self._dense_hits(context, top_n, categories)
+        else:
+            routed = self.router.route(context.embedding) if self.router is not None else None
+            dense = self._dense_hits(context, top_n, routed)
+            if routed and (not dense or dense[0].score < self.similarity_threshold):
+                self.router.record_fallback()
+                dense = self._dense_hits(context, top_n, None)
+        for rank, hit in enumerate(dense):
+            hit.fused_score = 1.0 / (RRF_K + rank + 1)
+            hits[hit.faq_id or hit.question] = hit
+
+        if self.passage_index is not None:
+            passages = self.passage_index.search(context.embedding, top_n if not categories else top_n * 4,
+                                                 aggregation=PASSAGE_AGGREGATION)
+            if categories:
+                passages = [match for match in passages
+                            if self.faq_records[match[0]][1]["category"] in categories][:top_n]
+            self._add_stored_hits(hits, [faq_id for faq_id, _, _, _ in passages], context)
+            for rank, (faq_id, _, best_score, passage) in enumerate(passages):
+                hit = hits.get(faq_id)
+                if hit is None:
+                    continue
+                hit.passage_score = best_score * float(hit.metadata.get('weight', 1.0))
+                if hit.passage_score > hit.score:
+                    hit.score = hit.passage_score
+                    hit.passage = passage
+                hit.fused_score += 1.0 / (RRF_K + rank + 1)
+
+        if self.lexical_index is not None:
+            if categories:
+                lexical = [
+                    match for match in self.lexical_index.search(query, len(self.lexical_index))
+                    if self.faq_records[match[0]][1]["category"] in categories
+                ][:top_n]
+            else:
+                lexical = self.lexical_index.search(query, top_n)
+            self._add_stored_hits(hits, [faq_id for faq_id, _, _ in lexical], context)
+            for rank, (faq_id, score, coverage) in enumerate(lexical):
+                hit = hits.get(faq_id)
+                if hit is not None:
+                    hit.lexical_score = score
+                    hit.lexical_coverage = coverage
+                    hit.fused_score += 1.0 / (RRF_K + rank + 1)
+
+        ranked = sorted(hits.values(), key=lambda hit: (hit.fused_score, hit.score), reverse=True)
+        return RetrievalResult(context, ranked, self.similarity_threshold)
+
     def get_related_questions(self, query: str, top_k: int = 3) -> List[Dict]:
-        if not self.chroma_db:
+        if self.vector_index is None:
             return []
 
         try:
-            results = self.chroma_db.similarity_search_with_score(query, k=top_k + 3)
-            related = []
+            return self.retrieve(query, top_n=top_k + 3).related(top_k)
+        except Exception as e:
+            logger.error(f"Error getting related questions: {e}")
+            return []
 
-            for doc, score in results:
-                if doc.page_content.strip().lower() == query.strip().lower():
-                    continue
-                similarity = self.evaluate_similarity(query, doc.page_content)
-                if similarity >= 0.4:
-                    related.append({
-                        "question": doc.page_content,
-                        "score": similarity,
-                        "category": doc.metadata.get('category', 'General')
-                    })
-                if len(related) >= top_k:
-                    break
+    def fast_path_answer(self, user_question: str,
+                         categories: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Answer an exact or near-exact FAQ question straight from the stored entry.
 
+        Skips embedding, vector search and the LLM; the response is the precomputed rephrasing
+        when one is available and the FAQ answer otherwise. Returns None when no tier matches
+        (or the match lies outside ``categories``).
+        """
+        match = self.near_exact_index.lookup(user_question)
+        if match is None:
+            return None
+        faq_id, score, tier = match
+        question, metadata = self.faq_records[faq_id]
+        if categories and metadata["category"] not in categories:
+            return None
+        hit = RetrievalHit(question, metadata, None, score)
+        precomputed = self.get_precomputed_answer(hit)
+        self.fast_path_hits[tier] += 1
+        return {
+            "response": precomputed if precomputed is not None else hit.answer,
+            "related_questions": self._related_for_faq(faq_id, question),
+            "similarity_score": score,
+            "source": f"{tier}_match",
+            "category": hit.category,
+            "generation": "precomputed" if precomputed is not None else "raw"
+        }
+
+    def _related_for_faq(self, faq_id: str, question: str) -> List[Dict]:
+        """Related questions for a stored FAQ, searched once with its stored embedding and then memoized."""
+        related = self._related_by_faq.get(faq_id)
+        if related is not None:
             return related
+        if self.vector_index is None:
+            return [
+                {"question": self.faq_records[match_id][0], "score": score,
+                 "category": self.faq_records[match_id][1]["category"]}
+                for match_id, score in self.keyword_matcher.search(question, k=self.related_top_k + 1)
+                if match_id != faq_id
+            ][:self.related_top_k]
+
+        try:
+            stored = self.vector_index.get([faq_id])
+            if not stored:
+                return []
+            context = QueryContext(question, stored[0][1])
+            related = self.retrieve(question, context=context).related(self.related_top_k)
         except Exception as e:
             logger.error(f"Error getting related questions: {e}")
             return []
+        self._related_by_faq[faq_id] = related
+        return related
+
+    def rerank(self, retrieval: RetrievalResult, started: Optional[float] = None) -> bool:
+        """
+        Re-score the top RERANK_TOP_K hits with the cross-encoder, if the request's remaining
+        latency budget (RERANK_BUDGET_MS since ``started``) allows it. Returns whether it ran.
+        """
+        candidates = retrieval.hits[:RERANK_TOP_K]
+        if self.reranker is None or not candidates:
+            return False
+        elapsed_ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+        scores = self.reranker.score(
+            retrieval.context.text,
+            [(hit.faq_id or hit.question, f"{hit.question} {hit.passage or hit.answer}") for hit in candidates],
+            budget_ms=RERANK_BUDGET_MS - elapsed_ms
+        )
+        if scores is None:
+            return False
+        retrieval.apply_rerank(scores, RERANK_THRESHOLD)
+        return True
+
+    def _plan_answer(self, user_question: str, context: Optional[QueryContext] = None,
+                     categories: Optional[List[str]] = None, started: Optional[float] = None,
+                     exact_checked: bool = False) -> Tuple[Dict[str, Any], Optional[PendingAnswer]]:
+        """
+        Run every stage up to the LLM call.
 
-    def answer_question(self, user_question: str) -> Dict[str, Any]:
+        Returns the result payload and, when the answer still has to be generated, a
+        PendingAnswer carrying the chain inputs; the payload's response is then left empty.
+        A precomputed query context skips the embedding step. Answers restricted to
+        ``categories`` bypass the response cache, whose keys do not include the filter.
+        ``started`` is when the request began, for the re-ranking latency budget.
+        ``exact_checked`` means the caller already missed the fast path and the exact cache
+        layer for this question, so neither is looked up again.
+        """
+        started = started if started is not None else time.perf_counter()
         if not user_question or not user_question.strip():
             return {
                 "response": "Please enter a question.",
                 "related_questions": [],
                 "similarity_score": 0.0,
                 "source": "validation"
-            }
-        
-        if not self.chroma_db:
+            }, None
+
+        fast = self.fast_path_answer(user_question.strip(), categories) if not exact_checked else None
+        if fast is not None:
+            return fast, None
+
+        if self.vector_index is None:
+            if self.faq_records:
+                return self.keyword_answer(user_question.strip()), None
             return {
                 "response": "FAQ service is currently unavailable. Please contact support.",
                 "related_questions": [],
                 "similarity_score": 0.0,
                 "source": "error"
-            }
+            }, None
 
         try:
             user_question = user_question.strip()
-            results = self.chroma_db.similarity_search_with_score(user_question, k=1)
-            
-            if results:
-                retrieved_doc, _ = results[0]
-                similarity_score = self.evaluate_similarity(user_question, retrieved_doc.page_content)
-
-                if similarity_score >= self.similarity_threshold:
-                    try:
-                        response = self.chain.invoke({
-                            "question": user_question,
-                            "answer": retrieved_doc.metadata['answer'],
-                            "category": retrieved_doc.metadata.get('category', 'General')
-                        }).strip()
-                        print(f"LLM Response: {response} , {user_question}")
-                    except Exception as e:
-                        logger.error(f"Error generating LLM response: {e}")
-                        response = retrieved_doc.metadata['answer']
-
-                    related = self.get_related_questions(user_question)
+            cache = self.response_cache if not categories else None
+            if cache and not exact_checked:
+                cached = cache.get_exact(user_question)
+                if cached is not None:
+                    return dict(cached, cache_hit="exact"), None
 
+            retrieval = self.retrieve(user_question, context=context, categories=categories)
+            self.rerank(retrieval, started)
+            related = retrieval.related(self.related_top_k)
+
+            if retrieval.is_confident:
+                best = retrieval.best
+                precomputed = None
+                if self.answer_mode == "precomputed" and best.score >= self.precomputed_min_similarity:
+                    precomputed = self.get_precomputed_answer(best)
+                if precomputed is not None:
                     return {
-                        "response": response,
+                        "response": precomputed,
                         "related_questions": related,
-                        "similarity_score": similarity_score,
+                        "similarity_score": best.score,
                         "source": "knowledge_base",
-                        "category": retrieved_doc.metadata.get('category', 'General')
-                    }
+                        "category": best.category,
+                        "generation": "precomputed"
+                    }, None
+
+                if cache and best.faq_id:
+                    cached = cache.get_semantic(best.faq_id, retrieval.context.embedding)
+                    if cached is not None:
+                        return dict(cached, related_questions=related, similarity_score=best.score,
+                                    cache_hit="semantic"), None
+
+                return {
+                    "response": "",
+                    "related_questions": related,
+                    "similarity_score": best.score,
+                    "source": "knowledge_base",
+                    "category": best.category
+                }, PendingAnswer(user_question, best, retrieval.context, categories)
 
             fallback = (
                 "I don't have a specific answer for that question. "
@@ -241,23 +1060,190 @@ Response:  For general convo like 'hi' or 'how are you', respond with a friendly
             )
             return {
                 "response": fallback,
-                "related_questions": self.get_related_questions(user_question),
+                "related_questions": related,
                 "similarity_score": 0.0,
                 "source": "fallback"
-            }
+            }, None
 
         except Exception as e:
             logger.error(f"Error answering question '{user_question}': {e}")
-            return {
-                "response": "I'm experiencing technical difficulties. Please try again or contact support.",
-                "related_questions": [],
-                "similarity_score": 0.0,
-                "source": "error"
-            }
+            return self._technical_difficulties(), None
+
+    @staticmethod
+    def _technical_difficulties() -> Dict[str, Any]:
+        return {
+            "response": "I'm experiencing technical difficulties. Please try again or contact support.",
+            "related_questions": [],
+            "similarity_score": 0.0,
+            "source": "error"
+        }
+
+    def _finish_answer(self, result: Dict[str, Any], pending: PendingAnswer,
+                       response: str, llm_ok: bool) -> Dict[str, Any]:
+        result["response"] = response
+        result["generation"] = "live" if llm_ok else "raw"
+        if self.response_cache and llm_ok and not pending.categories:
+            self.response_cache.put(pending.question, dict(result), pending.hit.faq_id, pending.context.embedding)
+        return result
+
+    def answer_question(self, user_question: str, categories: Optional[List[str]] = None) -> Dict[str, Any]:
+        result, pending = self._plan_answer(user_question, categories=categories)
+        if pending is None:
+            return result
+
+        if self.chain is None:
+            return self._finish_answer(result, pending, pending.hit.answer, llm_ok=False)
+
+        llm_ok = True
+        try:
+            response = self.chain.invoke(pending.inputs).strip()
+            print(f"LLM Response: {response} , {pending.question}")
+        except Exception as e:
+            logger.error(f"Error generating LLM response: {e}")
+            response = pending.hit.answer
+            llm_ok = False
+        return self._finish_answer(result, pending, response, llm_ok)
+
+    def stream_answer(self, user_question: str,
+                      categories: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Answer a question as a sequence of events for streaming transports such as SSE.
+
+        Yields a ``retrieval`` event with everything except the response text as soon as
+        retrieval finishes, then ``token`` events as the LLM produces text, then a ``done``
+        event with the complete payload. Answers that need no LLM call (cache hits,
+        precomputed answers, fallbacks) arrive as a single token.
+        """
+        result, pending = self._plan_answer(user_question, categories=categories)
+        yield {"event": "retrieval", "data": {k: v for k, v in result.items() if k != "response"}}
+
+        if pending is None:
+            yield {"event": "token", "data": {"text": result["response"]}}
+            yield {"event": "done", "data": result}
+            return
+        if self.chain is None:
+            yield {"event": "token", "data": {"text": pending.hit.answer}}
+            yield {"event": "done", "data": self._finish_answer(result, pending, pending.hit.answer, llm_ok=False)}
+            return
+
+        chunks: List[str] = []
+        llm_ok = True
+        try:
+            for chunk in self.chain.stream(pending.inputs):
+                if chunk:
+                    chunks.append(chunk)
+                    yield {"event": "token", "data": {"text": chunk}}
+        except Exception as e:
+            logger.error(f"Error streaming LLM response: {e}")
+            llm_ok = False
+            if not chunks:
+                chunks.append(pending.hit.answer)
+                yield {"event": "token", "data": {"text": pending.hit.answer}}
+
+        yield {"event": "done", "data": self._finish_answer(result, pending, "".join(chunks).strip(), llm_ok)}
+
+    @property
+    def cpu_executor(self) -> ThreadPoolExecutor:
+        """Bounded pool for the CPU-bound stages (embedding, search) of the async path."""
+        if self._cpu_executor is None:
+            with self._cpu_executor_lock:
+                if self._cpu_executor is None:
+                    self._cpu_executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="faq-cpu")
+        return self._cpu_executor
+
+    async def _aplan_answer(self, user_question: str,
+                            categories: Optional[List[str]] = None) -> Tuple[Dict[str, Any], Optional[PendingAnswer]]:
+        started = time.perf_counter()
+        context = None
+        exact_checked = False
+        if user_question and user_question.strip() and self.vector_index is not None:
+            fast = self.fast_path_answer(user_question.strip(), categories)
+            if fast is not None:
+                return fast, None
+            cache = self.response_cache if not categories else None
+            cached = cache.get_exact(user_question.strip()) if cache else None
+            if cached is not None:
+                return dict(cached, cache_hit="exact"), None
+            exact_checked = True
+            try:
+                context = await self.acreate_query_context(user_question.strip())
+            except Exception as e:
+                logger.error(f"Error embedding question '{user_question}': {e}")
+                return self._technical_difficulties(), None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.cpu_executor, self._plan_answer, user_question, context, categories, started, exact_checked
+        )
+
+    async def aanswer_question(self, user_question: str, categories: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Async counterpart of answer_question.
+
+        Embedding and search run on the bounded CPU executor and the LLM call uses the chain's
+        async interface, so an event loop can keep many LLM requests in flight while only
+        CPU_WORKERS threads ever do model work.
+        """
+        result, pending = await self._aplan_answer(user_question, categories)
+        if pending is None:
+            return result
+
+        if self.chain is None:
+            return self._finish_answer(result, pending, pending.hit.answer, llm_ok=False)
+
+        llm_ok = True
+        try:
+            response = (await self.chain.ainvoke(pending.inputs)).strip()
+        except Exception as e:
+            logger.error(f"Error generating LLM response: {e}")
+            response = pending.hit.answer
+            llm_ok = False
+        return self._finish_answer(result, pending, response, llm_ok)
+
+    async def astream_answer(self, user_question: str,
+                             categories: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Async counterpart of stream_answer, yielding the same retrieval/token/done events."""
+        result, pending = await self._aplan_answer(user_question, categories)
+        yield {"event": "retrieval", "data": {k: v for k, v in result.items() if k != "response"}}
+
+        if pending is None:
+            yield {"event": "token", "data": {"text": result["response"]}}
+            yield {"event": "done", "data": result}
+            return
+        if self.chain is None:
+            yield {"event": "token", "data": {"text": pending.hit.answer}}
+            yield {"event": "done", "data": self._finish_answer(result, pending, pending.hit.answer, llm_ok=False)}
+            return
+
+        chunks: List[str] = []
+        llm_ok = True
+        try:
+            async for chunk in self.chain.astream(pending.inputs):
+                if chunk:
+                    chunks.append(chunk)
+                    yield {"event": "token", "data": {"text": chunk}}
+        except Exception as e:
+            logger.error(f"Error streaming LLM response: {e}")
+            llm_ok = False
+            if not chunks:
+                chunks.append(pending.hit.answer)
+                yield {"event": "token", "data": {"text": pending.hit.answer}}
+
+        yield {"event": "done", "data": self._finish_answer(result, pending, "".join(chunks).strip(), llm_ok)}
 
     def get_stats(self) -> Dict[str, Any]:
         return {
-            "total_faqs": len(self.faq_data),
+            "total_faqs": len(self.faq_records),
             "similarity_threshold": self.similarity_threshold,
-            "status": "ready" if self.chroma_db else "not_ready"
+            "vector_backend": self.vector_backend,
+            "hybrid_retrieval": self.lexical_index is not None,
+            "fast_path_hits": dict(self.fast_path_hits),
+            "query_router": self.router.get_stats() if self.router else None,
+            "passages": len(self.passage_index) if self.passage_index is not None else 0,
+            "reranker": self.reranker.get_stats() if self.reranker is not None else None,
+            "response_cache": self.response_cache.get_stats() if self.response_cache else None,
+            "answer_mode": self.answer_mode,
+            "embedding_batcher": self.embedding_batcher.get_stats() if self.embedding_batcher else None,
+            "precomputed_answers": len(self.precomputed_answers),
+            "components": dict(self.readiness),
+            "status": "ready" if self.vector_index is not None else "not_ready"
         }
@@ -0,0 +1,169 @@
+"""
+Append-only crawl log for FAQ output.
+
+The crawler appends one JSON line per event instead of rewriting its whole output file:
+
+    {"type": "faq", "faq": {...}, "added": true, "change": "new" | "changed" | null}
+    {"type": "removed", "ids": [...]}
+    {"type": "page", "url": "...", "links": [...]}
+
+A page record is written after the FAQs extracted from that page, so any prefix of the log is
+consistent. ``compact`` folds the log into the consolidated JSON list that ``data.py`` and
+``FAQBot`` read, writing it atomically. Replaying the log restores an interrupted crawl: its
+FAQs, the pages already visited and the links they queued.
+
+Usage:
+    python faq_sink.py faqs_2.jsonl faqs_2.json
+"""
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List
+
+from crawl_state import faq_key
+
+
+logger = logging.getLogger(__name__)
+
+
+def write_json_atomic(path: str, data: Any):
+    """Write JSON to a temporary file, fsync it and rename it over ``path``, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def fold(faqs: List[Dict], records: List[Dict]) -> List[Dict]:
+    """Apply logged FAQ records to a FAQ list: added FAQs are appended once, changed ones replace the stored copy."""
+    faqs = list(faqs)
+    positions = {faq_key(faq["question"]): i for i, faq in enumerate(faqs)}
+    for record in records:
+        if record.get("type") != "faq":
+            continue
+        faq = record["faq"]
+        key = faq_key(faq["question"])
+        if key in positions:
+            if record.get("change") == "changed":
+                faqs[positions[key]] = faq
+        elif record.get("added") or record.get("change"):
+            positions[key] = len(faqs)
+            faqs.append(faq)
+    return faqs
+
+
+class FAQSink:
+    """
+    Writer for the crawl log with batched durability.
+
+    Records are written as they arrive; the file is fsynced once ``fsync_every`` records have
+    accumulated or ``fsync_interval`` seconds have passed since the last sync, whichever comes
+    first. A crash can lose at most that unsynced tail. A line cut short by a crash is dropped
+    when the log is next opened.
+    """
+
+    def __init__(self, path: str, fsync_every: int = 50, fsync_interval: float = 1.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self.records = self._truncate_partial_tail()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _truncate_partial_tail(self) -> List[Dict]:
+        """Read the existing log, cutting off an incomplete last line so appends start on a clean line."""
+        records, good_offset = [], 0
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    break
+                if not line.endswith(b"\n"):
+                    records.pop()  # complete JSON, but the newline never made it to disk
+                    break
+                good_offset += len(line)
+        if good_offset < os.path.getsize(self.path):
+            logger.warning(f"Dropping an incomplete record at the end of {self.path}")
+            with open(self.path, "r+b") as f:
+                f.truncate(good_offset)
+        return records
+
+    def append(self, record: Dict):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def add_faq(self, faq: Dict, added: bool, change: str = None):
+        self.append({"type": "faq", "faq": faq, "added": added, "change": change})
+
+    def removed(self, faq_ids: List[str]):
+        if faq_ids:
+            self.append({"type": "removed", "ids": faq_ids})
+
+    def page_done(self, url: str, links: List[str]):
+        self.append({"type": "page", "url": url, "links": links})
+
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def reset(self):
+        """Empty the log once its contents have been compacted into the output file."""
+        self._file.close()
+        self._file = open(self.path, "w", encoding="utf-8")
+        self.sync()
+        self.records = []
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+
+def read_log(path: str) -> Iterator[Dict]:
+    """Records of a crawl log, stopping at an incomplete last line."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                return
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                return
+
+
+def load_consolidated(output_file: str, log_file: str) -> List[Dict]:
+    """The FAQ list the output file would hold once the log is compacted into it."""
+    faqs = []
+    if os.path.exists(output_file):
+        with open(output_file, "r", encoding="utf-8") as f:
+            faqs = json.load(f)
+    return fold(faqs, list(read_log(log_file)))
+
+
+def compact(log_file: str, output_file: str) -> int:
+    """Fold the log into the output file atomically, then empty the log. Returns the FAQ count."""
+    faqs = load_consolidated(output_file, log_file)
+    write_json_atomic(output_file, faqs)
+    if os.path.exists(log_file):
+        open(log_file, "w").close()
+    return len(faqs)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+    print(f"Wrote {compact(sys.argv[1], sys.argv[2])} FAQs to {sys.argv[2]}")
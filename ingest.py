@@ -0,0 +1,252 @@
+"""
+Multi-source ingestion of FAQ-like documents.
+
+Every source file is streamed element by element with an incremental JSON reader, so a large
+export is never held in memory as one parsed tree, and each element is normalized into the
+entry schema that ``cleaned_faq.json`` already uses:
+
+    question, answer, source_url, category, normalized_question
+
+plus ``source_type`` and ``weight`` for non-FAQ sources. ``weight`` multiplies the dense
+similarity of a hit at query time, so official FAQs (weight 1.0) win ties against community
+posts and website pages, and popular community topics (by ``views``) rank above obscure ones.
+"""
+import json
+import logging
+import math
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from lexical_index import categorize, terms
+
+
+logger = logging.getLogger(__name__)
+
+SOURCE_WEIGHTS = {"faq": 1.0, "community": 0.85, "website": 0.8}
+# Community topics with this many views get the full community weight; unviewed ones get 90% of it.
+VIEWS_SATURATION = 10000
+MAX_COMMUNITY_ANSWERS = 3
+MAX_PAGE_CHARS = 4000
+
+
+class JsonStreamReader:
+    """
+    Incremental reader for a top-level JSON array, or an object whose values are arrays.
+
+    Reads the file in ``chunk_size`` pieces and decodes one element at a time with
+    ``json.JSONDecoder.raw_decode``; consumed text is dropped from the buffer, so memory is
+    bounded by the largest single element rather than the file size.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 1 << 16):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._file = None
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._file.read(self.chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Next non-whitespace character ('' at end of file), without consuming it."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"{self.path}: expected {char!r} but found {found or 'end of file'!r}")
+        self._pos += 1
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A scalar that ends exactly at the buffer edge may continue in the next chunk.
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            if not self._fill():
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                self._pos = end
+                return value
+
+    def _array(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            char = self._peek()
+            self._pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"{self.path}: expected ',' or ']' but found {char or 'end of file'!r}")
+
+    def items(self) -> Iterator[Tuple[Optional[str], Any]]:
+        """Yield (section, element): section is None for a top-level array, else the object key."""
+        with open(self.path, "r", encoding="utf-8") as f:
+            self._file, self._buffer, self._pos, self._eof = f, "", 0, False
+            first = self._peek()
+            if first == "[":
+                for element in self._array():
+                    yield None, element
+                return
+            self._expect("{")
+            if self._peek() == "}":
+                return
+            while True:
+                key = self._value()
+                self._expect(":")
+                if self._peek() == "[":
+                    for element in self._array():
+                        yield key, element
+                else:
+                    yield key, self._value()
+                char = self._peek()
+                self._pos += 1
+                if char == "}":
+                    return
+                if char != ",":
+                    raise ValueError(f"{self.path}: expected ',' or '}}' but found {char or 'end of file'!r}")
+
+
+def _clean(text: Any) -> str:
+    return " ".join(str(text or "").split())
+
+
+def normalize_faq(section: Optional[str], item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Official FAQ entries (``cleaned_faq.json``) are already in the entry schema."""
+    if not isinstance(item, dict) or not item.get("question"):
+        return None
+    return item
+
+
+def normalize_community(section: Optional[str], topic: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """A Discourse topic from ``help_Q&A.json``; topics without replies carry no answer and are skipped."""
+    question = _clean(topic.get("question"))
+    answers = [_clean(answer) for answer in topic.get("answers") or [] if _clean(answer)]
+    if not question or not answers:
+        return None
+    views = max(int(topic.get("views") or 0), 0)
+    view_prior = 0.9 + 0.1 * min(1.0, math.log1p(views) / math.log1p(VIEWS_SATURATION))
+    tags = " ".join(tag.replace("-", " ") for tag in topic.get("tags") or [])
+    return {
+        "question": question,
+        "answer": " ".join(answers[:MAX_COMMUNITY_ANSWERS]),
+        "source_url": topic.get("url", ""),
+        "category": categorize(f"{question} {tags}"),
+        "normalized_question": " ".join(terms(question)),
+        "source_type": "community",
+        "weight": round(SOURCE_WEIGHTS["community"] * view_prior, 4),
+        "views": views,
+    }
+
+
+def normalize_website(section: Optional[str], page: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """A page from ``jupiter_website_data.json``: its title stands in for the question, its text for the answer."""
+    title = _clean(page.get("title"))
+    lines = list(dict.fromkeys(_clean(line) for line in page.get("content") or [] if _clean(line)))
+    if not title or not lines:
+        return None
+    return {
+        "question": title,
+        "answer": " ".join(lines)[:MAX_PAGE_CHARS],
+        # The full text, for passage chunking; the answer above is capped to keep prompts small.
+        "content": " ".join(lines),
+        "source_url": page.get("url", ""),
+        "category": categorize(f"{title} {section or ''}"),
+        "normalized_question": " ".join(terms(title)),
+        "source_type": "website",
+        "weight": SOURCE_WEIGHTS["website"],
+    }
+
+
+def chunk_text(text: str, max_words: int = 100, overlap: int = 25) -> List[str]:
+    """
+    Split text into passages of at most ``max_words`` words, each sharing ``overlap`` words
+    with the previous one, so a sentence cut at a boundary is still whole in one passage.
+    """
+    words = (text or "").split()
+    if not words:
+        return []
+    if len(words) <= max_words:
+        return [" ".join(words)]
+    step = max(max_words - overlap, 1)
+    passages = []
+    for start in range(0, len(words), step):
+        passages.append(" ".join(words[start:start + max_words]))
+        if start + max_words >= len(words):
+            break
+    return passages
+
+
+NORMALIZERS: Dict[str, Callable[[Optional[str], Dict[str, Any]], Optional[Dict[str, Any]]]] = {
+    "faq": normalize_faq,
+    "community": normalize_community,
+    "website": normalize_website,
+}
+
+
+def iter_documents(path: str, source_type: str = "faq", chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """Stream one source file as normalized entries, skipping elements that cannot be normalized."""
+    normalize = NORMALIZERS[source_type]
+    seen_urls = set()
+    for section, element in JsonStreamReader(path, chunk_size).items():
+        if not isinstance(element, dict):
+            continue
+        document = normalize(section, element)
+        if document is None:
+            continue
+        if source_type == "website":
+            # The website export lists some pages once per section that links to them.
+            if document["source_url"] in seen_urls:
+                continue
+            seen_urls.add(document["source_url"])
+        yield document
+
+
+def parse_sources(spec: str) -> List[Tuple[str, str]]:
+    """Parse ``"community=help_Q&A.json,website=jupiter_website_data.json"`` into (source_type, path) pairs."""
+    sources = []
+    for part in filter(None, (piece.strip() for piece in (spec or "").split(","))):
+        source_type, _, path = part.partition("=")
+        if not path or source_type.strip() not in NORMALIZERS:
+            raise ValueError(f"Invalid source {part!r}: expected <{'|'.join(NORMALIZERS)}>=<path>")
+        sources.append((source_type.strip(), path.strip()))
+    return sources
+
+
+def iter_sources(sources: List[Tuple[str, str]]) -> Iterator[Dict[str, Any]]:
+    """Chain several sources; a missing file is logged and skipped rather than failing the load."""
+    for source_type, path in sources:
+        if not os.path.exists(path):
+            logger.error(f"Source file not found: {path}")
+            continue
+        count = 0
+        for document in iter_documents(path, source_type):
+            count += 1
+            yield document
+        logger.info(f"Ingested {count} {source_type} documents from {path}")
@@ -0,0 +1,236 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+import numpy as np
+from response_cache import normalize_question
+
+
+# Small built-in stopword list so serving never needs the NLTK corpora that data.py downloads.
+STOPWORDS = frozenset("""
+a an the and or but if of at by for with about to from in on into over under is are was were be been
+being am do does did doing have has had having i me my we our you your he she it its they them their
+this that these those what which who whom whose when where why how can could should would will shall
+may might must not no so than too very just also there here any some all each s t
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:\+)?")
+
+# Topic keywords for categorization, shared by data.py (offline cleaning) and ingest.py.
+TOPIC_KEYWORDS = {
+    'KYC': ['kyc', 'know your customer', 'verification', 'identity', 'document', 'address proof'],
+    'Rewards': ['reward', 'cashback', 'points', 'benefit', 'offer', 'discount'],
+    'Payments': ['payment', 'transaction', 'pay', 'upi', 'transfer', 'bill'],
+    'Limits': ['limit', 'maximum', 'minimum', 'cap', 'threshold', 'restriction'],
+    'Card': ['card', 'credit card', 'debit card', 'edge+', 'rupay', 'visa', 'mastercard'],
+    'Fees': ['fee', 'charge', 'cost', 'pricing', 'annual fee', 'joining fee'],
+    'Account': ['account', 'balance', 'deposit', 'withdrawal', 'savings', 'current'],
+    'Security': ['security', 'fraud', 'protection', 'safe', 'authentication', 'otp'],
+    'General': ['general', 'other', 'miscellaneous', 'support', 'help', 'faq']
+}
+_TOPIC_PATTERNS = {
+    category: [re.compile(r"(?<![a-z0-9])" + re.escape(keyword)) for keyword in keywords]
+    for category, keywords in TOPIC_KEYWORDS.items()
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens with stopwords removed. Keeps a trailing '+' so 'Edge+' stays distinct."""
+    return [token for token in _TOKEN.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+def _stem(token: str) -> str:
+    # Cheap plural folding ("cards" -> "card") to line queries up with data.py's lemmatized text.
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def terms(text: str) -> List[str]:
+    return [_stem(token) for token in tokenize(text)]
+
+
+def categorize(text: str) -> str:
+    """
+    Category with the most TOPIC_KEYWORDS occurring in the text, first listed on ties.
+
+    A cheap serving-time stand-in for data.py's fuzzy categorize_question, matching keywords
+    at word starts so that 'pay' also covers 'payments' but not 'repay'.
+    """
+    lowered = (text or "").lower()
+    best, best_count = 'General', 0
+    for category, patterns in _TOPIC_PATTERNS.items():
+        count = sum(1 for pattern in patterns if pattern.search(lowered))
+        if count > best_count:
+            best, best_count = category, count
+    return best
+
+
+class KeywordMatcher:
+    """
+    Keyword-overlap matcher over the raw FAQ entries.
+
+    Needs nothing but the FAQ file, so it can answer while the embedding model and vector
+    index are still loading. Scores are cosine similarity between binary term sets.
+    """
+
+    def __init__(self, faq_data: Iterable[Dict[str, Any]] = ()):
+        self.entries: List[Tuple[Set[str], Any]] = []
+        for item in faq_data:
+            if item.get('question'):
+                self.add(item['question'], item.get('normalized_question', ''), item)
+
+    def add(self, question: str, normalized_question: str, value: Any):
+        """Index one entry; ``search`` returns ``value`` for it, e.g. the entry itself or its id."""
+        doc_terms = set(terms(question)) | set(terms(normalized_question))
+        if doc_terms:
+            self.entries.append((doc_terms, value))
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[Any, float]]:
+        query_terms = set(terms(query))
+        if not query_terms:
+            return []
+        scored = []
+        for doc_terms, item in self.entries:
+            overlap = len(query_terms & doc_terms)
+            if overlap:
+                scored.append((item, overlap / math.sqrt(len(query_terms) * len(doc_terms))))
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:k]
+
+
+class BM25Index:
+    """
+    In-memory BM25 inverted index over FAQ entries.
+
+    Each document is a dict of text fields; a term's frequency is the weighted sum of its
+    counts across fields, so question terms can outweigh answer terms. Every posting stores
+    its precomputed BM25 weight, which makes a query a handful of scatter-adds into one score
+    array. Besides the score, ``search`` reports each hit's coverage: the idf-weighted share
+    of the query terms the document contains, a bounded signal that a score alone is not.
+    """
+
+    DEFAULT_FIELD_WEIGHTS = {"question": 1.0, "normalized_question": 1.0, "answer": 0.5}
+
+    def __init__(self, ids: List[str], documents: List[Dict[str, str]],
+                 field_weights: Optional[Dict[str, float]] = None, k1: float = 1.2, b: float = 0.75):
+        if len(ids) != len(documents):
+            raise ValueError("ids and documents must have the same length")
+        self.ids = list(ids)
+        field_weights = field_weights or self.DEFAULT_FIELD_WEIGHTS
+
+        doc_terms: List[Counter] = []
+        for document in documents:
+            weighted = Counter()
+            for field, weight in field_weights.items():
+                for term in terms(document.get(field, '')):
+                    weighted[term] += weight
+            doc_terms.append(weighted)
+
+        n_docs = len(doc_terms)
+        lengths = np.array([sum(counts.values()) for counts in doc_terms], dtype=np.float32)
+        avg_length = float(lengths.mean()) if n_docs and lengths.mean() > 0 else 1.0
+        norm = k1 * (1 - b + b * lengths / avg_length)
+
+        postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for doc, counts in enumerate(doc_terms):
+            for term, tf in counts.items():
+                postings[term].append((doc, tf))
+
+        # Unseen query terms get the idf of a term with df=0, so they lower coverage.
+        self.unknown_idf = math.log(1 + (n_docs + 0.5) / 0.5)
+        self.idf: Dict[str, float] = {}
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, entries in postings.items():
+            docs = np.array([doc for doc, _ in entries], dtype=np.int32)
+            tf = np.array([count for _, count in entries], dtype=np.float32)
+            idf = math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            self.idf[term] = idf
+            self.postings[term] = (docs, (idf * tf * (k1 + 1) / (tf + norm[docs])).astype(np.float32))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float, float]]:
+        """Top-k (id, bm25 score, coverage) for a query, best first."""
+        query_terms = set(terms(query))
+        if not query_terms or not self.ids or k <= 0:
+            return []
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        matched = np.zeros(len(self.ids), dtype=np.float32)
+        total_idf = 0.0
+        for term in query_terms:
+            total_idf += self.idf.get(term, self.unknown_idf)
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            docs, weights = posting
+            scores[docs] += weights
+            matched[docs] += self.idf[term]
+
+        candidates = np.flatnonzero(scores)
+        if not len(candidates):
+            return []
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.ids[i], float(scores[i]), float(matched[i] / total_idf)) for i in candidates]
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NearExactIndex:
+    """
+    Exact and near-exact question lookup that needs no model.
+
+    The exact tier is a dict keyed by ``normalize_question``, so a related-question chip that
+    sends back the stored FAQ text is a single hash lookup. The near-exact tier compares
+    character trigram sets by Jaccard similarity, which absorbs typos, punctuation and spacing
+    differences; candidates are counted with one ``np.bincount`` over the query's posting lists.
+    """
+
+    def __init__(self, ids: List[str], questions: List[str], min_similarity: float = 0.85,
+                 min_length: int = 12):
+        if len(ids) != len(questions):
+            raise ValueError("ids and questions must have the same length")
+        self.ids = list(ids)
+        self.min_similarity = min_similarity
+        self.min_length = min_length
+        self.exact: Dict[str, str] = {}
+        postings: Dict[str, List[int]] = defaultdict(list)
+        sizes = []
+        for i, (faq_id, question) in enumerate(zip(ids, questions)):
+            key = normalize_question(question)
+            self.exact.setdefault(key, faq_id)
+            grams = _trigrams(key)
+            sizes.append(len(grams))
+            for gram in grams:
+                postings[gram].append(i)
+        self.sizes = np.array(sizes, dtype=np.int32)
+        self.postings = {gram: np.array(docs, dtype=np.int32) for gram, docs in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def lookup(self, query: str) -> Optional[Tuple[str, float, str]]:
+        """(id, similarity, tier) for an exact or near-exact match, where tier is "exact" or "near_exact"."""
+        key = normalize_question(query or "")
+        faq_id = self.exact.get(key)
+        if faq_id is not None:
+            return faq_id, 1.0, "exact"
+        if len(key) < self.min_length or not self.ids:
+            return None
+
+        grams = _trigrams(key)
+        lists = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not lists:
+            return None
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.ids))
+        jaccard = shared / (len(grams) + self.sizes - shared)
+        best = int(np.argmax(jaccard))
+        if jaccard[best] >= self.min_similarity:
+            return self.ids[best], float(jaccard[best]), "near_exact"
+        return None
@@ -1,5 +1,7 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 from faq_logic import FAQBot
+from query_log import EvaluationJobs, QueryLog
+import json
 import logging
 import os
 from dotenv import load_dotenv
@@ -11,8 +13,21 @@ logger = logging.getLogger(__name__)
 # import chromadb.config
 # chromadb.config.Settings.anonymized_telemetry = False
 app = Flask(__name__)
-faq_bot = FAQBot()
-test_queries = []
+# Heavy components (embedding model, vector index, LLM) load on a background thread so the
+# server binds immediately; until the index is ready /ask answers from a keyword matcher.
+LAZY_INIT = os.getenv("LAZY_INIT", "true").lower() == "true"
+faq_bot = FAQBot(lazy=LAZY_INIT)
+if LAZY_INIT:
+    faq_bot.start_background_load()
+# Every question asked, kept in a bounded ring buffer and appended to a rotated JSONL file;
+# /evaluate replays a sample of it.
+query_log = QueryLog(
+    path=os.getenv("QUERY_LOG_PATH", "query_log.jsonl"),
+    capacity=int(os.getenv("QUERY_LOG_CAPACITY", "1000")),
+    max_bytes=int(os.getenv("QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+    backups=int(os.getenv("QUERY_LOG_BACKUPS", "3"))
+)
+EVALUATE_PAGE_SIZE = 50
 
 @app.route('/')
 def index():
@@ -34,8 +49,8 @@ def ask():
             user_question = data.get('question', '').strip()
         else:
             user_question = request.form.get('question', '').strip()
-        test_queries.append(user_question)
         result = faq_bot.answer_question(user_question)
+        query_log.record(user_question, "/ask", result)
         print(result)
         return jsonify(result)
     except Exception as e:
@@ -46,6 +61,36 @@ def ask():
             "related_questions": []
         }), 500
 
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route('/ask/stream', methods=['POST'])
+def ask_stream():
+    """Server-Sent Events variant of /ask: retrieval result first, then LLM tokens as they arrive"""
+    if not faq_bot:
+        return jsonify({"error": "Service unavailable"}), 503
+
+    if request.is_json:
+        data = request.get_json(silent=True) or {}
+        user_question = str(data.get('question', '')).strip()
+    else:
+        user_question = request.form.get('question', '').strip()
+    query_log.record(user_question, "/ask/stream")
+
+    def generate():
+        try:
+            for event in faq_bot.stream_answer(user_question):
+                yield _sse(event["event"], event["data"])
+        except Exception as e:
+            logger.error(f"Error in /ask/stream endpoint: {e}")
+            yield _sse("error", {"error": "An error occurred processing your request."})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/ask', methods=['POST'])
 def api_ask():
     if not faq_bot:
@@ -56,54 +101,90 @@ def api_ask():
         if not data or 'question' not in data:
             return jsonify({"error": "Question is required"}), 400
         
+        try:
+            categories = faq_bot.parse_categories(data.get('category'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         user_question = data['question'].strip()
-        test_queries.append(user_question)
-        result = faq_bot.answer_question(user_question)
+        result = faq_bot.answer_question(user_question, categories=categories)
+        query_log.record(user_question, "/api/ask", result)
         return jsonify(result)
     except Exception as e:
         logger.error(f"Error in API endpoint: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
-@app.route('/evaluate', methods=['GET'])
+def _evaluate_query(query: str) -> dict:
+    try:
+        result = faq_bot.answer_question(query)
+        return {
+            "query": query,
+            "response": result["response"],
+            "similarity_score": result["similarity_score"],
+            "related_questions": result["related_questions"]
+        }
+    except Exception as e:
+        logger.error(f"Error evaluating query '{query}': {e}")
+        return {
+            "query": query,
+            "response": "Error occurred",
+            "similarity_score": 0.0,
+            "related_questions": []
+        }
+
+evaluation_jobs = EvaluationJobs(_evaluate_query)
+
+@app.route('/evaluate', methods=['POST'])
 def evaluate():
+    """
+    Start a background evaluation over a sample of logged queries (sample=N&seed=S, as query
+    or form parameters). POST only: every job calls the LLM once per query, so a prefetched
+    or retried GET must not start one.
+    """
     if not faq_bot:
         return jsonify({"error": "FAQ bot not initialized"}), 500
-    
-    # test_queries = [
-    #     "What are the fees for the Edge+ card?",
-    #     "How do I complete KYC?",
-    #     "What rewards can I get?",
-    #     "Random unrelated question"
-    # ]
-    
-    results = []
-    for query in test_queries:
-        try:
-            result = faq_bot.answer_question(query)
-            results.append({
-                "query": query,
-                "response": result["response"],
-                "similarity_score": result["similarity_score"],
-                "related_questions": result["related_questions"]
-            })
-        except Exception as e:
-            logger.error(f"Error evaluating query '{query}': {e}")
-            results.append({
-                "query": query,
-                "response": "Error occurred",
-                "similarity_score": 0.0,
-                "related_questions": []
-            })
-    
-    return jsonify(results)
+
+    try:
+        sample = request.values.get('sample', type=int)
+        seed = request.values.get('seed', type=int)
+        queries = query_log.sample_questions(sample, seed)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    job = evaluation_jobs.submit(queries)
+    job["status_url"] = f"/evaluate/{job['id']}"
+    return jsonify(job), 202
+
+@app.route('/evaluate/<job_id>', methods=['GET'])
+def evaluate_status(job_id):
+    """Progress of an evaluation job and one page of its results (?offset=0&limit=50)"""
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', EVALUATE_PAGE_SIZE, type=int), 1), 500)
+    job = evaluation_jobs.status(job_id, offset, limit)
+    if job is None:
+        return jsonify({"error": "Evaluation job not found"}), 404
+    if offset + limit < job["completed"] or job["status"] in ("queued", "running"):
+        job["next"] = f"/evaluate/{job_id}?offset={offset + limit}&limit={limit}"
+    return jsonify(job)
 
 @app.route('/health', methods=['GET'])
 def health_check():
+    readiness = faq_bot.get_readiness() if faq_bot else {"status": "failed", "components": {}, "error": None}
+    if readiness["status"] == "ready":
+        status = "healthy"
+    elif readiness["status"] == "loading":
+        status = "starting"
+    elif readiness["status"] == "degraded":
+        status = "degraded"
+    else:
+        status = "unhealthy"
     return jsonify({
-        "status": "healthy" if faq_bot else "unhealthy",
-        "faq_count": len(faq_bot.faq_data) if faq_bot else 0,
+        "status": status,
+        "ready": readiness["status"] == "ready",
+        "components": readiness["components"],
+        "error": readiness["error"],
+        "faq_count": len(faq_bot.faq_records) if faq_bot else 0,
         "service": "Jupiter FAQ Bot"
-    })
+    }), 503 if status == "unhealthy" else 200
 
 @app.errorhandler(404)
 def not_found(error):
@@ -0,0 +1,156 @@
+import inspect
+import logging
+import os
+from typing import List, Optional
+import numpy as np
+import onnxruntime as ort
+
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxEmbeddings:
+    """
+    Sentence-transformer encoder running on ONNX Runtime, with the LangChain embeddings interface.
+
+    On first use the HuggingFace model is exported to ``<model_dir>/model.onnx`` (this step needs
+    torch and transformers); later runs only need onnxruntime and the saved tokenizer. With
+    ``quantize=True`` the graph is additionally converted to int8 with dynamic quantization
+    (``model.int8.onnx``), which roughly halves latency and memory on CPU at a small cost in
+    cosine parity. Pooling and normalization match sentence-transformers/all-MiniLM-L6-v2:
+    attention-masked mean pooling followed by L2 normalization.
+    """
+
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 model_dir: Optional[str] = None, quantize: bool = False,
+                 intra_op_threads: Optional[int] = None, max_length: int = 256, batch_size: int = 32):
+        self.model_name = model_name
+        self.model_dir = model_dir or os.path.join("onnx_models", model_name.replace("/", "__"))
+        self.quantize = quantize
+        self.max_length = max_length
+        self.batch_size = batch_size
+
+        model_path = self._ensure_model()
+        self.tokenizer = self._load_tokenizer()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        logger.info(f"Loaded ONNX embedding model from {model_path} "
+                    f"(quantized={quantize}, intra_op_threads={intra_op_threads or 'default'})")
+
+    @property
+    def fp32_path(self) -> str:
+        return os.path.join(self.model_dir, "model.onnx")
+
+    @property
+    def int8_path(self) -> str:
+        return os.path.join(self.model_dir, "model.int8.onnx")
+
+    def _ensure_model(self) -> str:
+        if not os.path.exists(self.fp32_path):
+            self.export()
+        if not self.quantize:
+            return self.fp32_path
+        if not os.path.exists(self.int8_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            logger.info(f"Quantizing {self.fp32_path} to int8...")
+            quantize_dynamic(self.fp32_path, self.int8_path, weight_type=QuantType.QInt8)
+        return self.int8_path
+
+    def export(self):
+        """Export the HuggingFace transformer to ONNX and save its tokenizer next to it."""
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        logger.info(f"Exporting {self.model_name} to ONNX in {self.model_dir}...")
+        os.makedirs(self.model_dir, exist_ok=True)
+        tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        model = AutoModel.from_pretrained(self.model_name)
+        model.eval()
+        tokenizer.save_pretrained(self.model_dir)
+
+        sample = tokenizer(["export sample"], return_tensors="pt")
+        input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+        export_kwargs = {}
+        if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+            # Newer torch defaults to the dynamo exporter, which needs onnxscript; the
+            # TorchScript exporter handles BERT-style encoders with dynamic axes fine.
+            export_kwargs["dynamo"] = False
+
+        class _Encoder(torch.nn.Module):
+            # Fixes the traced signature to the tokenizer inputs; transformers' forward() takes
+            # many optional positional arguments whose order differs between releases.
+            def __init__(self, transformer):
+                super().__init__()
+                self.transformer = transformer
+
+            def forward(self, *inputs):
+                return self.transformer(**dict(zip(input_names, inputs)), return_dict=True).last_hidden_state
+
+        with torch.no_grad():
+            torch.onnx.export(
+                _Encoder(model),
+                tuple(sample[name] for name in input_names),
+                self.fp32_path,
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+                do_constant_folding=True,
+                **export_kwargs
+            )
+
+    def _load_tokenizer(self):
+        tokenizer_file = os.path.join(self.model_dir, "tokenizer.json")
+        if os.path.exists(tokenizer_file):
+            # The standalone Rust tokenizer keeps torch/transformers out of the serving process.
+            from tokenizers import Tokenizer
+            tokenizer = Tokenizer.from_file(tokenizer_file)
+            tokenizer.enable_truncation(max_length=self.max_length)
+            tokenizer.enable_padding()
+            return tokenizer
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(self.model_dir)
+
+    def _tokenize(self, texts: List[str]):
+        if hasattr(self.tokenizer, "encode_batch"):
+            encodings = self.tokenizer.encode_batch(texts)
+            features = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+        else:
+            encoded = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_length,
+                                     return_tensors="np")
+            features = {name: np.asarray(value, dtype=np.int64) for name, value in encoded.items()}
+        return {name: value for name, value in features.items() if name in self.input_names}
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        features = self._tokenize(texts)
+        token_embeddings = self.session.run(None, features)[0]
+        mask = features["attention_mask"][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.session.get_outputs()[0].shape[-1] or 0), dtype=np.float32)
+        return np.vstack([
+            self._encode_batch(texts[start:start + self.batch_size])
+            for start in range(0, len(texts), self.batch_size)
+        ])
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.encode(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode_batch([text])[0].tolist()
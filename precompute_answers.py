@@ -0,0 +1,89 @@
+import json
+import os
+import logging
+from typing import Dict, Optional
+from faq_logic import FAQBot
+
+
+logger = logging.getLogger(__name__)
+
+
+def precompute_answers(bot: FAQBot, output_path: Optional[str] = None, batch_size: int = 16,
+                       max_concurrency: int = 4, force: bool = False) -> Dict[str, Dict[str, str]]:
+    """
+    Generate the LLM rephrasing of every FAQ answer and store it next to the index.
+
+    Each entry is keyed by faq_id and records the content_hash it was generated from, so
+    re-running the job only regenerates entries that are new or whose question, answer or
+    category changed. Progress is written after every batch, so an interrupted run resumes.
+
+    Args:
+        bot: Initialized FAQBot whose chain and index records are used
+        output_path: Where to write the answers (defaults to the bot's index directory)
+        batch_size: FAQ entries per chain.batch call
+        max_concurrency: Concurrent LLM calls within a batch
+        force: Regenerate every entry even if it is up to date
+
+    Returns:
+        Mapping of faq_id to {"content_hash", "question", "response"}
+    """
+    output_path = output_path or bot.precomputed_answers_path
+    answers: Dict[str, Dict[str, str]] = {}
+    if os.path.exists(output_path) and not force:
+        with open(output_path, 'r', encoding='utf-8') as f:
+            answers = json.load(f)
+
+    ids, texts, metadatas = bot._index_records()
+    current = set(ids)
+    answers = {faq_id: entry for faq_id, entry in answers.items() if faq_id in current}
+    pending = [
+        i for i, faq_id in enumerate(ids)
+        if answers.get(faq_id, {}).get("content_hash") != metadatas[i]["content_hash"]
+    ]
+    logger.info(f"{len(ids) - len(pending)} precomputed answers up to date, {len(pending)} to generate")
+
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        inputs = [
+            {"question": texts[i], "answer": metadatas[i]["answer"], "category": metadatas[i]["category"]}
+            for i in batch
+        ]
+        outputs = bot.chain.batch(inputs, config={"max_concurrency": max_concurrency}, return_exceptions=True)
+        for i, output in zip(batch, outputs):
+            if isinstance(output, Exception):
+                logger.error(f"Failed to rephrase '{texts[i][:60]}': {output}")
+                continue
+            answers[ids[i]] = {
+                "content_hash": metadatas[i]["content_hash"],
+                "question": texts[i],
+                "response": output.strip(),
+            }
+        _write_answers(answers, output_path)
+        logger.info(f"Generated {min(start + batch_size, len(pending))}/{len(pending)} answers")
+
+    _write_answers(answers, output_path)
+    return answers
+
+
+def _write_answers(answers: Dict[str, Dict[str, str]], output_path: str):
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(answers, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, output_path)
+
+
+def main():
+    # Configuration
+    FAQ_FILE = os.getenv("FAQ_FILE_PATH", "cleaned_faq.json")
+    FORCE = os.getenv("FORCE_REGENERATE", "false").lower() == "true"
+
+    bot = FAQBot(FAQ_FILE, answer_mode="live")
+    answers = precompute_answers(bot, force=FORCE)
+    print(f"Saved {len(answers)} precomputed answers to {bot.precomputed_answers_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryLog:
+    """
+    Bounded record of incoming questions: a ring buffer of the latest ``capacity`` entries in
+    memory, persisted to an append-only JSONL file.
+
+    ``record`` never touches the disk. Entries are handed to a background thread that appends
+    them every ``flush_interval`` seconds and rotates the file once it exceeds ``max_bytes``
+    (``query_log.jsonl`` -> ``query_log.jsonl.1`` ... ``.<backups>``). If the writer falls
+    behind by ``max_pending`` entries, new entries are still kept in memory but dropped from
+    the file, and counted. On start the ring buffer is refilled from the tail of the current
+    file, so sampling survives a restart.
+    """
+
+    def __init__(self, path: str = "query_log.jsonl", capacity: int = 1000, max_bytes: int = 10 * 1024 * 1024,
+                 backups: int = 3, flush_interval: float = 1.0, max_pending: int = 10000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self._entries: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # serializes the writer thread with explicit flush() calls
+        self._pending: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self.stats = {"recorded": 0, "written": 0, "dropped": 0, "rotations": 0, "write_errors": 0}
+        self._load_tail()
+        self._writer = threading.Thread(target=self._run, name="query-log-writer", daemon=True)
+        self._writer.start()
+
+    def _load_tail(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in deque(f, maxlen=self._entries.maxlen):
+                    try:
+                        self._entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # a line cut short by a crash
+            logger.info(f"Loaded {len(self._entries)} logged queries from {self.path}")
+        except OSError as e:
+            logger.error(f"Failed to read query log {self.path}: {e}")
+
+    def record(self, question: str, endpoint: str, result: Optional[Dict[str, Any]] = None):
+        if not question:
+            return
+        entry = {"ts": time.time(), "question": question, "endpoint": endpoint}
+        if result:
+            entry.update(
+                source=result.get("source"),
+                similarity_score=result.get("similarity_score"),
+                category=result.get("category"),
+            )
+        with self._lock:
+            self._entries.append(entry)
+            self.stats["recorded"] += 1
+        try:
+            self._pending.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self.stats["dropped"] += 1
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The latest entries, newest last."""
+        with self._lock:
+            entries = list(self._entries)
+        return entries[-limit:] if limit else entries
+
+    def sample_questions(self, size: Optional[int] = None, seed: Optional[int] = None) -> List[str]:
+        """Up to ``size`` distinct logged questions, sampled at random (all of them, oldest first, without ``size``)."""
+        questions = list(dict.fromkeys(entry["question"] for entry in self.recent()))
+        if size is None or size >= len(questions):
+            return questions
+        return random.Random(seed).sample(questions, size)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """Append every pending entry to the file, rotating it first if it has grown past max_bytes."""
+        with self._write_lock:
+            self._flush()
+
+    def _flush(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._pending.get_nowait())
+            except queue.Empty:
+                break
+        if not batch:
+            return
+        try:
+            self._rotate_if_needed()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in batch))
+            with self._lock:
+                self.stats["written"] += len(batch)
+        except OSError as e:
+            logger.error(f"Failed to write query log {self.path}: {e}")
+            with self._lock:
+                self.stats["write_errors"] += 1
+
+    def _rotate_if_needed(self):
+        try:
+            if os.path.getsize(self.path) < self.max_bytes:
+                return
+        except OSError:
+            return  # no file yet
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        with self._lock:
+            self.stats["rotations"] += 1
+
+    def close(self):
+        """Stop the writer after a final flush."""
+        self._stop.set()
+        self._writer.join(timeout=5)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "in_memory": len(self._entries), "pending": self._pending.qsize(), "path": self.path}
+
+
+class EvaluationJobs:
+    """
+    Runs evaluations over a list of questions on a single background thread, one job at a time.
+
+    Results accumulate on the job as each question is answered, so a client can page through
+    them while the job is still running. Only the ``max_jobs`` most recent jobs are kept.
+    """
+
+    def __init__(self, evaluate_one: Callable[[str], Dict[str, Any]], max_jobs: int = 10):
+        self.evaluate_one = evaluate_one
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, questions: List[str]) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex[:12]
+        job = {"id": job_id, "status": "queued", "total": len(questions), "questions": list(questions),
+               "results": [], "created": time.time(), "started": None, "finished": None, "error": None}
+        with self._lock:
+            self._jobs[job_id] = job
+            while len(self._jobs) > self.max_jobs:
+                oldest = next(iter(self._jobs))
+                if self._jobs[oldest]["status"] in ("queued", "running"):
+                    break
+                self._jobs.pop(oldest)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="evaluation-jobs", daemon=True)
+                self._worker.start()
+        self._queue.put(job_id)
+        return self.status(job_id)
+
+    def _run(self):
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                job["status"], job["started"] = "running", time.time()
+            try:
+                for question in job["questions"]:
+                    result = self.evaluate_one(question)
+                    with self._lock:
+                        job["results"].append(result)
+                status, error = "completed", None
+            except Exception as e:
+                logger.error(f"Evaluation job {job_id} failed: {e}")
+                status, error = "failed", str(e)
+            with self._lock:
+                job["status"], job["finished"], job["error"] = status, time.time(), error
+
+    def status(self, job_id: str, offset: int = 0, limit: int = 0) -> Optional[Dict[str, Any]]:
+        """Job progress and, when ``limit`` is given, the page of results starting at ``offset``."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            status = {key: job[key] for key in ("id", "status", "total", "created", "started", "finished", "error")}
+            status["completed"] = len(job["results"])
+            if limit:
+                status["offset"] = offset
+                status["results"] = job["results"][offset:offset + limit]
+            return status
@@ -0,0 +1,65 @@
+import threading
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+
+class CategoryRouter:
+    """
+    Nearest-centroid router from a query embedding to the category partitions worth searching.
+
+    Each category's centroid is the normalized mean of its FAQ embeddings. A query goes to the
+    closest category when it leads the runner-up by at least ``margin``, to the top two when
+    those two together lead the third by ``margin``, and otherwise to a global search (None).
+    """
+
+    def __init__(self, categories: List[str], centroids: np.ndarray, sizes: List[int], margin: float = 0.05):
+        if len(categories) != len(centroids) or len(categories) != len(sizes):
+            raise ValueError("categories, centroids and sizes must have the same length")
+        self.categories = list(categories)
+        self.centroids = centroids
+        self.sizes = dict(zip(categories, sizes))
+        self.margin = margin
+        self._lock = threading.Lock()
+        self.routed = {"single": 0, "pair": 0, "global": 0, "fallback": 0}
+
+    @classmethod
+    def from_vectors(cls, embeddings: np.ndarray, metadatas: List[Dict[str, Any]],
+                     margin: float = 0.05) -> "CategoryRouter":
+        labels = [metadata.get("category", "General") for metadata in metadatas]
+        categories = sorted(set(labels))
+        label_array = np.array(labels)
+        centroids, sizes = [], []
+        for category in categories:
+            members = np.asarray(embeddings)[label_array == category]
+            centroid = members.mean(axis=0)
+            centroids.append(centroid / (np.linalg.norm(centroid) or 1.0))
+            sizes.append(len(members))
+        return cls(categories, np.asarray(centroids, dtype=np.float32).reshape(len(categories), -1), sizes, margin)
+
+    def route(self, query_embedding: np.ndarray) -> Optional[List[str]]:
+        """One or two categories to search, or None when the query should be searched globally."""
+        if len(self.categories) < 3:
+            self._count("global")
+            return None
+        scores = self.centroids @ np.asarray(query_embedding, dtype=np.float32)
+        first, second, third = np.argsort(-scores)[:3]
+        if scores[first] - scores[second] >= self.margin:
+            self._count("single")
+            return [self.categories[first]]
+        if scores[second] - scores[third] >= self.margin:
+            self._count("pair")
+            return [self.categories[first], self.categories[second]]
+        self._count("global")
+        return None
+
+    def record_fallback(self):
+        """Count a routed search that was retried globally because its best hit was not confident."""
+        self._count("fallback")
+
+    def _count(self, key: str):
+        with self._lock:
+            self.routed[key] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"partitions": dict(self.sizes), "margin": self.margin, "routed": dict(self.routed)}
@@ -0,0 +1,124 @@
+import inspect
+import logging
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+
+from embedding_cache import text_hash
+from response_cache import LRUTTLCache, normalize_question
+
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """
+    Re-scores retrieval candidates with a small CPU cross-encoder in one batched forward pass.
+
+    Scores are the model's logits passed through a sigmoid, so they are comparable to a fixed
+    relevance threshold. Each (query, faq_id) score is cached. Before running the model, the
+    cost of the uncached pairs is estimated from a moving average of past batches, and the
+    stage is skipped when that estimate exceeds the request's remaining latency budget.
+    """
+
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2", model=None,
+                 max_length: int = 256, cache_size: int = 4096, cache_ttl: float = 3600.0):
+        if model is None:
+            from sentence_transformers import CrossEncoder
+            model = CrossEncoder(model_name, max_length=max_length, device="cpu")
+        self.model = model
+        self.model_name = model_name
+        # Ask for raw logits: the default activation depends on the model's config, and the
+        # keyword for overriding it was renamed between sentence-transformers releases.
+        self._predict_kwargs = {}
+        parameters = inspect.signature(model.predict).parameters
+        for keyword in ("activation_fn", "activation_fct"):
+            if keyword in parameters:
+                import torch
+                self._predict_kwargs[keyword] = torch.nn.Identity()
+                break
+        self._cache = LRUTTLCache(cache_size, cache_ttl)
+        self._lock = threading.Lock()
+        # Exponential moving averages of [n, ms, n*n, n*ms] over past forward passes, from which
+        # cost(n) = overhead + per_pair * n is fitted by least squares.
+        self._moments: Optional[np.ndarray] = None
+        self.stats = {"reranked": 0, "skipped_budget": 0, "cache_hits": 0, "pairs_scored": 0, "total_ms": 0.0}
+
+    def warm_up(self):
+        """Run forward passes so the first request neither pays model warm-up nor lacks a cost estimate."""
+        self.model.predict([("warm up", "warm up")], show_progress_bar=False)  # cold start, not timed
+        self._predict([("warm up", "warm up")])
+        self._predict([("warm up", "warm up")] * 4)
+
+    def _cost_model(self) -> Tuple[float, float]:
+        """(overhead_ms, per_pair_ms) fitted to the recent forward passes."""
+        if self._moments is None:
+            return 0.0, 0.0  # unknown until the first batch has been timed
+        mean_n, mean_ms, mean_nn, mean_nms = self._moments
+        variance = mean_nn - mean_n * mean_n
+        if variance > 1e-6:
+            per_pair = max((mean_nms - mean_n * mean_ms) / variance, 0.0)
+            return float(max(mean_ms - per_pair * mean_n, 0.0)), float(per_pair)
+        return 0.0, float(mean_ms / mean_n)
+
+    def estimate_ms(self, n_pairs: int) -> float:
+        if n_pairs == 0:
+            return 0.0
+        with self._lock:
+            overhead, per_pair = self._cost_model()
+        return overhead + per_pair * n_pairs
+
+    def _predict(self, pairs: List[Tuple[str, str]]) -> np.ndarray:
+        start = time.perf_counter()
+        logits = np.asarray(
+            self.model.predict(pairs, batch_size=len(pairs), show_progress_bar=False, **self._predict_kwargs),
+            dtype=np.float32
+        ).reshape(len(pairs), -1)[:, -1]
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        n = len(pairs)
+        sample = np.array([n, elapsed_ms, n * n, n * elapsed_ms], dtype=np.float64)
+        with self._lock:
+            self._moments = sample if self._moments is None else 0.9 * self._moments + 0.1 * sample
+            self.stats["pairs_scored"] += len(pairs)
+            self.stats["total_ms"] += elapsed_ms
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def score(self, query: str, candidates: List[Tuple[str, str]],
+              budget_ms: Optional[float] = None) -> Optional[List[float]]:
+        """
+        Relevance of each (faq_id, passage) candidate to the query.
+
+        Returns None, without running the model, when scoring the uncached candidates is
+        expected to take longer than ``budget_ms``.
+        """
+        query_key = text_hash(normalize_question(query))
+        now = time.monotonic()
+        with self._lock:
+            cached = [self._cache.get((query_key, faq_id), now) for faq_id, _ in candidates]
+        missing = [i for i, score in enumerate(cached) if score is None]
+        with self._lock:
+            self.stats["cache_hits"] += len(candidates) - len(missing)
+
+        if missing:
+            if budget_ms is not None and self.estimate_ms(len(missing)) > budget_ms:
+                with self._lock:
+                    self.stats["skipped_budget"] += 1
+                return None
+            scores = self._predict([(query, candidates[i][1]) for i in missing])
+            now = time.monotonic()
+            with self._lock:
+                for i, score in zip(missing, scores):
+                    cached[i] = float(score)
+                    self._cache.put((query_key, candidates[i][0]), cached[i], now)
+        with self._lock:
+            self.stats["reranked"] += 1
+        return cached
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["mean_ms_per_pair"] = stats["total_ms"] / stats["pairs_scored"] if stats["pairs_scored"] else 0.0
+            stats["estimated_overhead_ms"], stats["estimated_ms_per_pair"] = self._cost_model()
+            stats["cached_scores"] = len(self._cache)
+            return stats
@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import numpy as np
+
+
+def normalize_question(question: str) -> str:
+    """Key for the exact-match layer: case-folded, trimmed, whitespace collapsed, trailing punctuation dropped."""
+    return " ".join(question.casefold().split()).rstrip(" ?!.")
+
+
+class LRUTTLCache:
+    """Bounded mapping with least-recently-used eviction and a per-entry time to live; not thread-safe."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, now: float):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if now - stored_at > self.ttl_seconds:
+            del self._data[key]
+            self.expirations += 1
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value, now: float):
+        self._data[key] = (now, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ResponseCache:
+    """
+    Two-layer cache of answer payloads for ``FAQBot.answer_question``.
+
+    The exact layer is keyed by the normalized question string and is checked before any
+    model work. The semantic layer is consulted after retrieval: it returns a cached answer
+    when the new query's embedding has cosine >= ``semantic_threshold`` to a cached query
+    that resolved to the same FAQ entry, which skips the LLM call for paraphrases of head
+    questions. Both layers are bounded, LRU-evicted and expire entries after ``ttl_seconds``.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600.0,
+                 semantic_threshold: float = 0.92, max_per_faq: int = 16):
+        self.semantic_threshold = semantic_threshold
+        self.max_per_faq = max_per_faq
+        self._exact = LRUTTLCache(max_size, ttl_seconds)
+        self._semantic = LRUTTLCache(max_size, ttl_seconds)
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.exact_misses = 0
+        self.semantic_hits = 0
+        self.semantic_misses = 0
+
+    def get_exact(self, question: str) -> Optional[Dict[str, Any]]:
+        """Cached payload for this exact (normalized) question; call it once per request."""
+        with self._lock:
+            value = self._exact.get(normalize_question(question), time.monotonic())
+            if value is not None:
+                self.exact_hits += 1
+            else:
+                self.exact_misses += 1
+            return value
+
+    def get_semantic(self, faq_id: str, query_embedding: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Best cached answer for ``faq_id`` whose query is close enough to ``query_embedding``."""
+        with self._lock:
+            now = time.monotonic()
+            entries = self._semantic.get(faq_id, now)
+            if entries:
+                # entries: normalized question -> (query embedding, stored_at, payload)
+                live = [entry for entry in entries.values() if now - entry[1] <= self._semantic.ttl_seconds]
+                if live:
+                    matrix = np.stack([embedding for embedding, _, _ in live])
+                    scores = matrix @ np.asarray(query_embedding, dtype=np.float32)
+                    best = int(np.argmax(scores))
+                    if scores[best] >= self.semantic_threshold:
+                        self.semantic_hits += 1
+                        return live[best][2]
+            self.semantic_misses += 1
+            return None
+
+    def put(self, question: str, value: Dict[str, Any], faq_id: Optional[str] = None,
+            query_embedding: Optional[np.ndarray] = None):
+        with self._lock:
+            now = time.monotonic()
+            key = normalize_question(question)
+            self._exact.put(key, value, now)
+            if faq_id is None or query_embedding is None:
+                return
+            entries = self._semantic.get(faq_id, now)
+            if entries is None:
+                entries = OrderedDict()
+            entries[key] = (np.asarray(query_embedding, dtype=np.float32), now, value)
+            entries.move_to_end(key)
+            while len(entries) > self.max_per_faq:
+                entries.popitem(last=False)
+            self._semantic.put(faq_id, entries, now)
+
+    def clear(self):
+        with self._lock:
+            self._exact.clear()
+            self._semantic.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            # Every request that uses the cache does one exact lookup, so those count requests
+            requests = self.exact_hits + self.exact_misses
+            hits = self.exact_hits + self.semantic_hits
+            return {
+                "exact_hits": self.exact_hits,
+                "exact_misses": self.exact_misses,
+                "semantic_hits": self.semantic_hits,
+                "semantic_misses": self.semantic_misses,
+                "misses": requests - hits,
+                "hit_rate": hits / requests if requests else 0.0,
+                "exact_entries": len(self._exact),
+                "semantic_faqs": len(self._semantic),
+                "evictions": self._exact.evictions + self._semantic.evictions,
+                "expirations": self._exact.expirations + self._semantic.expirations,
+            }
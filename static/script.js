@@ -30,7 +30,7 @@ document.addEventListener('DOMContentLoaded', function() {
         showLoading(true);
         
         try {
-            const response = await fetch('/ask', {
+            const response = await fetch('/ask/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/x-www-form-urlencoded',
@@ -38,21 +38,11 @@ document.addEventListener('DOMContentLoaded', function() {
                 body: `question=${encodeURIComponent(question)}`
             });
 
-            const data = await response.json();
-            
-            if (data.error) {
-                addMessage(`Error: ${data.error}`, 'bot', true);
-            } else {
-                addMessage(data.response, 'bot');
-                
-                // Show similarity score if available
-                if (data.similarity_score > 0) {
-                    addSimilarityScore(data.similarity_score);
-                }
-                
-                // Show related questions
-                showRelatedQuestions(data.related_questions || []);
+            if (!response.ok || !response.body) {
+                throw new Error(`Streaming request failed with status ${response.status}`);
             }
+
+            await renderStream(response);
         } catch (error) {
             console.error('Error:', error);
             addMessage('Sorry, I encountered an error. Please try again.', 'bot', true);
@@ -61,6 +51,70 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
+    // Read Server-Sent Events from /ask/stream and render them as they arrive
+    async function renderStream(response) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let messageText = null;
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                const { event, data } = parseEvent(frame);
+                if (!event) continue;
+
+                if (event === 'retrieval') {
+                    // Retrieval is done: drop the spinner and show related questions straight away
+                    showLoading(false);
+                    messageText = startBotMessage();
+                    showRelatedQuestions(data.related_questions || []);
+                } else if (event === 'token') {
+                    if (!messageText) {
+                        messageText = startBotMessage();
+                    }
+                    messageText.textContent += data.text;
+                    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+                } else if (event === 'done') {
+                    if (messageText) {
+                        messageText.textContent = data.response;
+                    }
+                    if (data.similarity_score > 0) {
+                        addSimilarityScore(data.similarity_score);
+                    }
+                } else if (event === 'error') {
+                    addMessage(`Error: ${data.error}`, 'bot', true);
+                }
+            }
+        }
+    }
+
+    function startBotMessage() {
+        const messageText = addMessage('', 'bot').querySelector('.message-text');
+        messageText.textContent = '';
+        return messageText;
+    }
+
+    function parseEvent(frame) {
+        let event = null;
+        const dataLines = [];
+        frame.split('\n').forEach(line => {
+            if (line.startsWith('event:')) {
+                event = line.slice(6).trim();
+            } else if (line.startsWith('data:')) {
+                dataLines.push(line.slice(5).trim());
+            }
+        });
+        return { event, data: dataLines.length ? JSON.parse(dataLines.join('\n')) : {} };
+    }
+
     // Handle Enter key (Shift+Enter for new line)
     input.addEventListener('keydown', function(e) {
         if (e.key === 'Enter' && !e.shiftKey) {
@@ -86,6 +140,7 @@ document.addEventListener('DOMContentLoaded', function() {
         
         messagesContainer.appendChild(messageDiv);
         messagesContainer.scrollTop = messagesContainer.scrollHeight;
+        return messageDiv;
     }
 
     function addSimilarityScore(score) {
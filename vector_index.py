@@ -0,0 +1,360 @@
+import json
+import os
+import logging
+from collections import defaultdict
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+import numpy as np
+from langchain_community.vectorstores import Chroma
+from langchain_core.documents import Document
+
+
+logger = logging.getLogger(__name__)
+
+SearchResults = List[Tuple[Document, np.ndarray]]
+# (ids, texts, metadatas) of consecutive index entries
+Batch = Tuple[List[str], List[str], List[Dict[str, Any]]]
+
+
+def batched(ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]], batch_size: int) -> Iterable[Batch]:
+    """Slice parallel entry lists into batches of at most ``batch_size``."""
+    for start in range(0, len(ids), batch_size):
+        end = start + batch_size
+        yield ids[start:end], texts[start:end], metadatas[start:end]
+
+
+class ChromaVectorIndex:
+    """Chroma-backed index; searches by vector and returns the stored embeddings with each hit."""
+
+    def __init__(self, db: Chroma):
+        self.db = db
+
+    @classmethod
+    def from_texts(cls, texts: List[str], metadatas: List[Dict[str, Any]], embedding_model,
+                   persist_dir: str, collection_name: str = "faq_collection") -> "ChromaVectorIndex":
+        db = Chroma.from_texts(
+            texts=texts,
+            embedding=embedding_model,
+            metadatas=metadatas,
+            collection_name=collection_name,
+            persist_directory=persist_dir
+        )
+        db.persist()
+        return cls(db)
+
+    @classmethod
+    def load(cls, embedding_model, persist_dir: str,
+             collection_name: str = "faq_collection") -> "ChromaVectorIndex":
+        # Explicitly pass the embedding_function when loading existing DB
+        return cls(Chroma(
+            collection_name=collection_name,
+            embedding_function=embedding_model,
+            persist_directory=persist_dir
+        ))
+
+    def sync(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]],
+             embedding_model, batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Bring the collection in line with the given entries.
+
+        Entries are matched by id and compared by the ``content_hash`` in their metadata: only
+        added or changed entries are embedded and upserted, and ids no longer present are deleted.
+        """
+        return self.sync_batches(batched(ids, texts, metadatas, batch_size), embedding_model, batch_size)
+
+    MODEL_KEY = "embedding_model"
+
+    @property
+    def model_key(self) -> Optional[str]:
+        """The embedding model recorded in the collection metadata, if any."""
+        return (self.db._collection.metadata or {}).get(self.MODEL_KEY)
+
+    def reset(self, model_key: Optional[str] = None):
+        """Drop every entry by recreating the collection, which also forgets its embedding dimension."""
+        name = self.db._collection.name
+        self.db._client.delete_collection(name)
+        self.db._collection = self.db._client.get_or_create_collection(
+            name=name, embedding_function=None, metadata={self.MODEL_KEY: model_key} if model_key else None
+        )
+
+    def sync_batches(self, batches: Iterable[Batch], embedding_model, delete_batch_size: int = 1000,
+                     model_key: Optional[str] = None) -> Dict[str, int]:
+        """
+        ``sync`` over entries that arrive in batches, so the full entry lists never need to exist.
+
+        With ``model_key``, a collection recorded for another embedding model (or for none) is
+        emptied first, so every entry is embedded again with the current model.
+        """
+        if model_key is not None and self.model_key != model_key:
+            if len(self):
+                logger.warning(f"Chroma collection was built with embedding model {self.model_key!r}, "
+                               f"rebuilding it for {model_key!r}")
+            self.reset(model_key)
+        collection = self.db._collection
+        existing = collection.get(include=["metadatas"])
+        current = {
+            id_: (metadata or {}).get("content_hash")
+            for id_, metadata in zip(existing["ids"], existing["metadatas"])
+        }
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        for ids, texts, metadatas in batches:
+            changed = [i for i, id_ in enumerate(ids) if current.get(id_) != metadatas[i].get("content_hash")]
+            added = sum(1 for i in changed if ids[i] not in current)
+            stats["added"] += added
+            stats["updated"] += len(changed) - added
+            stats["unchanged"] += len(ids) - len(changed)
+            for id_ in ids:
+                # Whatever is left in current once every batch is seen is no longer wanted
+                current.pop(id_, None)
+            if changed:
+                collection.upsert(
+                    ids=[ids[i] for i in changed],
+                    embeddings=embedding_model.embed_documents([texts[i] for i in changed]),
+                    documents=[texts[i] for i in changed],
+                    metadatas=[metadatas[i] for i in changed]
+                )
+
+        removed = list(current)
+        for start in range(0, len(removed), delete_batch_size):
+            collection.delete(ids=removed[start:start + delete_batch_size])
+        stats["removed"] = len(removed)
+        return stats
+
+    def search(self, query_embedding: np.ndarray, k: int,
+               categories: Optional[List[str]] = None) -> SearchResults:
+        """Nearest entries to the query, optionally restricted to the given category partitions."""
+        where = None
+        if categories:
+            where = {"category": categories[0]} if len(categories) == 1 else {"category": {"$in": list(categories)}}
+        results = self.db._collection.query(
+            query_embeddings=[np.asarray(query_embedding).tolist()],
+            n_results=k,
+            where=where,
+            include=["documents", "metadatas", "embeddings"]
+        )
+        documents = results["documents"][0]
+        metadatas = results["metadatas"][0]
+        embeddings = results["embeddings"][0]
+        return [
+            (Document(page_content=text, metadata=metadata or {}), np.asarray(embedding, dtype=np.float32))
+            for text, metadata, embedding in zip(documents, metadatas, embeddings)
+        ]
+
+    def get(self, ids: List[str]) -> SearchResults:
+        """Stored entries for the given ids, in the given order; unknown ids are skipped."""
+        if not ids:
+            return []
+        results = self.db._collection.get(ids=list(ids), include=["documents", "metadatas", "embeddings"])
+        by_id = {
+            id_: (Document(page_content=text, metadata=metadata or {}), np.asarray(embedding, dtype=np.float32))
+            for id_, text, metadata, embedding in zip(
+                results["ids"], results["documents"], results["metadatas"], results["embeddings"]
+            )
+        }
+        return [by_id[id_] for id_ in ids if id_ in by_id]
+
+    def vectors(self) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """Every stored embedding with its metadata, e.g. to fit a query router."""
+        results = self.db._collection.get(include=["metadatas", "embeddings"])
+        embeddings = results["embeddings"]
+        if embeddings is None or not len(embeddings):
+            return np.zeros((0, 0), dtype=np.float32), []
+        return np.asarray(embeddings, dtype=np.float32), [m or {} for m in results["metadatas"]]
+
+    def __len__(self) -> int:
+        return self.db._collection.count()
+
+
+class NumpyVectorIndex:
+    """
+    In-process dense index: one contiguous float32 matrix of L2-normalized question embeddings.
+
+    Search is a single matrix-vector product followed by argpartition, which for a corpus of a
+    few thousand FAQs is far cheaper than a round trip through Chroma and SQLite. The matrix is
+    persisted as ``embeddings.npy`` (memory-mapped on load) with a ``metadata.json`` sidecar that
+    holds the entry ids, question texts and their metadata in row order.
+    """
+
+    EMBEDDINGS_FILE = "embeddings.npy"
+    METADATA_FILE = "metadata.json"
+
+    def __init__(self, embeddings: np.ndarray, texts: List[str], metadatas: List[Dict[str, Any]],
+                 ids: Optional[List[str]] = None, model_key: Optional[str] = None):
+        if len(embeddings) != len(texts) or len(texts) != len(metadatas):
+            raise ValueError("embeddings, texts and metadatas must have the same length")
+        self.embeddings = embeddings
+        # The embedding model the vectors came from; vectors of another model are not comparable
+        self.model_key = model_key
+        self.texts = texts
+        self.metadatas = metadatas
+        self.ids = ids if ids is not None else [str(i) for i in range(len(texts))]
+        self._rows = {id_: i for i, id_ in enumerate(self.ids)}
+        self._partitions: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    @classmethod
+    def from_texts(cls, texts: List[str], metadatas: List[Dict[str, Any]], embedding_model,
+                   ids: Optional[List[str]] = None, batch_size: int = 256,
+                   model_key: Optional[str] = None) -> "NumpyVectorIndex":
+        ids = list(ids) if ids is not None else [str(i) for i in range(len(texts))]
+        return cls.from_batches(batched(ids, texts, metadatas, batch_size), len(texts), embedding_model, model_key)
+
+    @classmethod
+    def from_batches(cls, batches: Iterable[Batch], count: int, embedding_model,
+                     model_key: Optional[str] = None) -> "NumpyVectorIndex":
+        """Build an index of ``count`` entries, embedding each batch as it arrives."""
+        # Embed in batches straight into one preallocated float32 matrix; a single
+        # embed_documents call over a large corpus would hold every vector as Python floats.
+        embeddings = None
+        all_ids, all_texts, all_metadatas = [], [], []
+        for ids, texts, metadatas in batches:
+            batch = cls._normalize_rows(np.asarray(embedding_model.embed_documents(texts)))
+            if embeddings is None:
+                embeddings = np.empty((count, batch.shape[1]), dtype=np.float32)
+            embeddings[len(all_ids):len(all_ids) + len(batch)] = batch
+            all_ids.extend(ids)
+            all_texts.extend(texts)
+            all_metadatas.extend(metadatas)
+        if embeddings is None:
+            embeddings = np.zeros((0, 0), dtype=np.float32)
+        return cls(embeddings, all_texts, all_metadatas, all_ids, model_key)
+
+    @classmethod
+    def load(cls, persist_dir: str) -> "NumpyVectorIndex":
+        embeddings = np.load(os.path.join(persist_dir, cls.EMBEDDINGS_FILE), mmap_mode='r')
+        with open(os.path.join(persist_dir, cls.METADATA_FILE), 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+        return cls(embeddings, sidecar["texts"], sidecar["metadatas"], sidecar.get("ids"), sidecar.get("model_key"))
+
+    @classmethod
+    def exists(cls, persist_dir: str) -> bool:
+        return all(os.path.exists(os.path.join(persist_dir, name))
+                   for name in (cls.EMBEDDINGS_FILE, cls.METADATA_FILE))
+
+    def matches(self, ids: List[str], metadatas: List[Dict[str, Any]], model_key: Optional[str] = None) -> bool:
+        """
+        True if this index holds exactly these entries, compared by id and content hash, and
+        (when ``model_key`` is given) its vectors came from that embedding model.
+        """
+        return (
+            (model_key is None or self.model_key == model_key)
+            and self.ids == list(ids)
+            and [m.get("content_hash") for m in self.metadatas] == [m.get("content_hash") for m in metadatas]
+        )
+
+    def save(self, persist_dir: str):
+        os.makedirs(persist_dir, exist_ok=True)
+        # Write to temporary files and swap them in, so a previously memory-mapped
+        # embeddings.npy is never truncated underneath a live index.
+        embeddings_path = os.path.join(persist_dir, self.EMBEDDINGS_FILE)
+        metadata_path = os.path.join(persist_dir, self.METADATA_FILE)
+        with open(embeddings_path + ".tmp", 'wb') as f:
+            np.save(f, np.asarray(self.embeddings))
+        with open(metadata_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump({"model_key": self.model_key, "ids": self.ids, "texts": self.texts, "metadatas": self.metadatas},
+                      f, ensure_ascii=False)
+        os.replace(embeddings_path + ".tmp", embeddings_path)
+        os.replace(metadata_path + ".tmp", metadata_path)
+        logger.info(f"Saved NumPy index with {len(self)} vectors to {persist_dir}")
+
+    def _partition(self, category: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Row numbers and a contiguous copy of the embeddings of one category, built on first use."""
+        if self._partitions is None:
+            rows_by_category = defaultdict(list)
+            for i, metadata in enumerate(self.metadatas):
+                rows_by_category[metadata.get("category", "General")].append(i)
+            self._partitions = {
+                category: (np.array(rows, dtype=np.int64), np.ascontiguousarray(self.embeddings[rows]))
+                for category, rows in rows_by_category.items()
+            }
+        return self._partitions.get(category)
+
+    def search(self, query_embedding: np.ndarray, k: int,
+               categories: Optional[List[str]] = None) -> SearchResults:
+        """Nearest entries to the query, optionally restricted to the given category partitions."""
+        if not len(self) or k <= 0:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32)
+        rows = None
+        if categories:
+            partitions = [p for p in (self._partition(category) for category in categories) if p is not None]
+            if not partitions:
+                return []
+            rows = np.concatenate([part_rows for part_rows, _ in partitions])
+            scores = np.concatenate([matrix @ query for _, matrix in partitions])
+        else:
+            scores = self.embeddings @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        if rows is not None:
+            top = rows[top]
+        return [
+            (Document(page_content=self.texts[i], metadata=self.metadatas[i]), np.asarray(self.embeddings[i]))
+            for i in top
+        ]
+
+    def get(self, ids: List[str]) -> SearchResults:
+        """Stored entries for the given ids, in the given order; unknown ids are skipped."""
+        rows = [self._rows[id_] for id_ in ids if id_ in self._rows]
+        return [
+            (Document(page_content=self.texts[i], metadata=self.metadatas[i]), np.asarray(self.embeddings[i]))
+            for i in rows
+        ]
+
+    def vectors(self) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+        """Every stored embedding with its metadata, e.g. to fit a query router."""
+        return np.asarray(self.embeddings), self.metadatas
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+
+class PassageIndex:
+    """
+    Dense index over answer passages whose hits are aggregated to their parent entries.
+
+    Wraps a NumpyVectorIndex whose metadata names each passage's ``parent_id``. A search
+    scores every passage with one matrix-vector product, keeps the top ``candidates`` with
+    argpartition, and aggregates those per parent by max or sum, so its cost grows linearly
+    with the passage count and never materializes per-parent arrays for the whole corpus.
+    """
+
+    def __init__(self, index: NumpyVectorIndex):
+        self.index = index
+        parents = [metadata["parent_id"] for metadata in index.metadatas]
+        self.parent_ids = list(dict.fromkeys(parents))
+        position = {parent_id: i for i, parent_id in enumerate(self.parent_ids)}
+        self.parent_of = np.array([position[parent_id] for parent_id in parents], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def search(self, query_embedding: np.ndarray, k: int, aggregation: str = "max",
+               candidates: Optional[int] = None) -> List[Tuple[str, float, float, str]]:
+        """Top-k parents as (parent_id, aggregated score, best passage score, best passage), best first."""
+        if not len(self.index) or k <= 0:
+            return []
+        scores = self.index.embeddings @ np.asarray(query_embedding, dtype=np.float32)
+        m = min(candidates or k * 4, len(scores))
+        top = np.argpartition(-scores, m - 1)[:m]
+        top = top[np.argsort(-scores[top])]
+        # With candidates sorted best first, each parent's first occurrence is its best passage.
+        parents, first, inverse = np.unique(self.parent_of[top], return_index=True, return_inverse=True)
+        best = scores[top[first]]
+        if aggregation == "sum":
+            aggregated = np.bincount(inverse, weights=scores[top], minlength=len(parents))
+        elif aggregation == "max":
+            aggregated = best
+        else:
+            raise ValueError(f"Unknown passage aggregation: {aggregation!r} (expected 'max' or 'sum')")
+        order = np.argsort(-aggregated, kind="stable")[:k]
+        return [
+            (self.parent_ids[parents[i]], float(aggregated[i]), float(best[i]), self.index.texts[top[first[i]]])
+            for i in order
+        ]